@@ -1,11 +1,15 @@
 # api.py
 from __future__ import annotations
-import os, json, time, base64
+import os, re, json, time, base64
 from dataclasses import dataclass
 from typing import Any, Optional
 import requests
 
+import metrics
 from config import API_BASE
+from paths import user_data_dir as _user_data_dir
+
+_RE_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
 
 class ApiError(Exception):
     def __init__(self, status: int, message: str, payload: Any | None = None):
@@ -20,16 +24,6 @@ class _TokenBox:
     access_exp: Optional[int] = None   # epoch seconds
     refresh_exp: Optional[int] = None
 
-def _user_data_dir(app_name: str = "WaitDocs") -> str:
-    if os.name == "nt":
-        base = os.getenv("APPDATA") or os.path.expanduser("~")
-        path = os.path.join(base, app_name)
-    else:
-        base = os.getenv("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
-        path = os.path.join(base, app_name)
-    os.makedirs(path, exist_ok=True)
-    return path
-
 def _tokens_path() -> str:
     return os.path.join(_user_data_dir(), "tokens.json")
 
@@ -47,6 +41,13 @@ def _jwt_payload(token: str) -> dict:
 def _jwt_exp(token: str) -> Optional[int]:
     return _jwt_payload(token).get("exp")
 
+def _path_key(url: str, base_url: str) -> str:
+    """Eticheta de metrici pentru un URL: fără host / query, cu id-urile numerice -> :id."""
+    if not url.startswith(base_url):
+        return "(extern)"
+    path = url[len(base_url):]
+    return _RE_ID_SEGMENT.sub("/:id", path.split("?", 1)[0]) or "/"
+
 class ApiClient:
     """
     Client API cu token persistence + refresh automat.
@@ -64,14 +65,38 @@ class ApiClient:
 
     def login(self, username: str, password: str) -> dict:
         """Face POST /rest_api/token/ și salvează token-urile."""
+        data = self.request_tokens(username, password)
+        self.use_tokens(data)
+        return data
+
+    def request_tokens(self, username: str, password: str) -> dict:
+        """POST /rest_api/token/ fără să schimbe starea clientului (login anulabil din UI)."""
         url = self._abs("/rest_api/token/")
-        resp = self.session.post(url, json={"username": username, "password": password}, timeout=self.timeout)
-        data = self._json_or_raise(resp)
+        resp = self._send("POST", url, json={"username": username, "password": password})
+        return self._json_or_raise(resp)
+
+    def use_tokens(self, data: dict):
+        """Adoptă și salvează token-urile întoarse de request_tokens()."""
         self._set_tokens(data.get("access"), data.get("refresh"))
-        return data
+
+    def prewarm(self, timeout: float = 5.0) -> bool:
+        """
+        Deschide din timp conexiunea către server (DNS + TCP + TLS) și o lasă în pool-ul
+        sesiunii, ca POST-ul cu credențialele să nu mai plătească handshake-ul.
+        Orice status e bun (ex: 405 la HEAD); False doar dacă serverul e inaccesibil.
+        """
+        try:
+            self.session.head(self._abs("/rest_api/token/"), timeout=timeout, allow_redirects=False)
+            return True
+        except requests.RequestException:
+            return False
 
     def try_auto_login(self) -> bool:
-        """Încercă să folosească tokenurile salvate; face refresh dacă e nevoie."""
+        """
+        Încercă să folosească tokenurile salvate; face refresh dacă e nevoie.
+        False = nu avem token-uri sau serverul a respins refresh-ul (token-urile locale se șterg).
+        Erorile de rețea la refresh se propagă: token-urile pot fi încă bune.
+        """
         if not self.tokens.access and not self.tokens.refresh:
             return False
         # dacă access e valid pentru încă 60s, suntem ok
@@ -81,7 +106,7 @@ class ApiClient:
         try:
             self._refresh_tokens()
             return True
-        except Exception:
+        except (ApiError, RuntimeError):
             self.logout()  # invalidează local
             return False
 
@@ -104,6 +129,16 @@ class ApiClient:
         Dacă răspunsul e 401 sau `access` e expirat, încearcă refresh o singură dată și reia cererea.
         Întoarce JSON dacă se poate, altfel text.
         """
+        return self.request_with_headers(method, path, params=params, data=data, json=json,
+                                         headers=headers, **kwargs)[0]
+
+    def request_with_headers(self, method: str, path: str, *,
+                             params: dict | None = None,
+                             data: dict | None = None,
+                             json: dict | None = None,
+                             headers: dict | None = None,
+                             **kwargs) -> tuple[Any, dict]:
+        """Ca request(), dar întoarce și header-ele răspunsului (ex: ETag pentru If-Match)."""
         url = self._abs(path)
         headers = dict(headers or {})
 
@@ -117,23 +152,35 @@ class ApiClient:
         if self.tokens.access:
             headers["Authorization"] = f"Bearer {self.tokens.access}"
 
-        resp = self.session.request(method.upper(), url, params=params, data=data, json=json,
-                                    headers=headers, timeout=self.timeout, **kwargs)
+        resp = self._send(method.upper(), url, params=params, data=data, json=json,
+                          headers=headers, **kwargs)
 
         # dacă primim 401 și avem refresh, încercăm o dată refresh și reluăm
         if resp.status_code == 401 and self.tokens.refresh:
             try:
                 self._refresh_tokens()
                 headers["Authorization"] = f"Bearer {self.tokens.access}" if self.tokens.access else ""
-                resp = self.session.request(method.upper(), url, params=params, data=data, json=json,
-                                            headers=headers, timeout=self.timeout, **kwargs)
+                resp = self._send(method.upper(), url, params=params, data=data, json=json,
+                                  headers=headers, **kwargs)
             except Exception:
                 pass
 
-        return self._json_or_raise(resp)
+        return self._json_or_raise(resp), resp.headers
 
     # --------------- intern ---------------
 
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """session.request + durata în metrici ('api.request', etichete method / path / status)."""
+        t0 = time.perf_counter()
+        status = 0   # 0 = eroare de rețea / timeout
+        try:
+            resp = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            status = resp.status_code
+            return resp
+        finally:
+            metrics.observe("api.request", (time.perf_counter() - t0) * 1000.0,
+                            method=method, path=_path_key(url, self.base_url), status=status)
+
     def _abs(self, path: str) -> str:
         if path.startswith("http://") or path.startswith("https://"):
             return path
@@ -170,7 +217,8 @@ class ApiClient:
         if not self.tokens.refresh:
             raise RuntimeError("Nu există refresh token.")
         url = self._abs("/rest_api/token/refresh/")
-        resp = self.session.post(url, json={"refresh": self.tokens.refresh}, timeout=self.timeout)
+        metrics.incr("api.refresh")
+        resp = self._send("POST", url, json={"refresh": self.tokens.refresh})
         data = self._json_or_raise(resp)
         # backend-ul tău întoarce ambele câmpuri
         self._set_tokens(data.get("access") or self.tokens.access,
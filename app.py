@@ -1,20 +1,25 @@
 # app.py
 import os
+import sys
+import importlib
+import threading
 import tkinter as tk
 from tkinter import ttk
 from pathlib import Path
 import ctypes  # <- pentru AppUserModelID (taskbar)
 
-from config import API_BASE
+from config import API_BASE, PREWARM_IMPORTS, UI_WATCHDOG, STALL_THRESHOLD_MS
 from api import ApiClient
 from login_window import LoginWindow
-from waitdocs_window import WaitDocsWindow
 from modern_theme import apply_modern_style
 from paths import resource_path
 
 BASE_DIR = Path(__file__).resolve().parent
 ICON_PATH = BASE_DIR / "assets" / "waitdocs.ico"
 
+# încărcate în fundal după primul frame, nu înainte de fereastra de login
+PREWARM_MODULES = ("waitdocs_window", "PIL.Image", "PIL.ImageTk", "cie_reader_core", "pypdfium2")
+
 # spune Windows-ului că aplicația e „WaitDocs” (icon corect în taskbar / pin)
 try:
     ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID("ro.waitdocs.app")
@@ -37,24 +42,49 @@ class App(tk.Tk):
 
         apply_modern_style(self)
 
+        # blocajele buclei Tk (handler + stivă) -> stalls.jsonl, vezi ui_watchdog
+        self._watchdog = None
+        if UI_WATCHDOG:
+            try:
+                from ui_watchdog import StallWatchdog
+                self._watchdog = StallWatchdog(self, threshold_ms=STALL_THRESHOLD_MS).start()
+            except Exception:
+                self._watchdog = None
+
         # client API (va încărca automat token-urile salvate dacă există)
         self.api = ApiClient(API_BASE)
 
-        # dacă avem tokenuri valide, sari direct în aplicație
-        if self.api.tokens:
-            self.after(50, lambda: self.open_main(self.api))
+        # token-uri salvate -> fereastra principală imediat; sesiunea se verifică în background
+        if self.api.tokens.access or self.api.tokens.refresh:
+            self.open_main(self.api, check_session=True)
         else:
             self.after(50, lambda: LoginWindow(self, self.api, on_success=self.open_main))
 
-    def open_main(self, client: ApiClient):
-        """Desenează fereastra principală."""
+        if PREWARM_IMPORTS:
+            self.after(300, self._prewarm_imports)
+
+    def _prewarm_imports(self):
+        """Importurile grele (PIL, PyKCS11/cryptography/smartcard, pypdfium2) pe un thread, după primul frame."""
+        def worker():
+            for name in PREWARM_MODULES:
+                try:
+                    importlib.import_module(name)
+                except Exception:
+                    pass   # ex: stiva CIE lipsește pe o stație fără cititor
+
+        threading.Thread(target=worker, daemon=True, name="prewarm").start()
+
+    def open_main(self, client: ApiClient, check_session: bool = False):
+        """Desenează fereastra principală (check_session: token-uri nevalidate încă)."""
         for w in self.winfo_children():
             w.destroy()
         self.geometry("1100x650")
         self.title("WaitDocs – Documente în așteptare")
 
+        from waitdocs_window import WaitDocsWindow   # deja încărcat de _prewarm_imports, de obicei
+
         # IMPORTANT: pasăm callback-ul care readuce login-ul după logout
-        WaitDocsWindow(self, client, on_logged_out=self.show_login_again)
+        WaitDocsWindow(self, client, on_logged_out=self.show_login_again, check_session=check_session)
 
     def show_login_again(self):
         """Cheamă acest callback la logout: curăță UI-ul și arată login-ul."""
@@ -82,4 +112,10 @@ class App(tk.Tk):
 
 
 if __name__ == "__main__":
+    if "--startup-probe" in sys.argv[1:]:
+        # build_exe.py: timpul până la primul frame, apoi ieșire
+        app = App()
+        app.update()
+        app.destroy()
+        sys.exit(0)
     App().mainloop()
@@ -0,0 +1,336 @@
+# benchmarks/bench_cie_mapping.py
+"""
+Benchmark: cie_mapping.map_raw / map_many față de cele două mapări vechi
+(EditDialog._map_raw_to_fields și cie_integration.scan_cie_and_map), păstrate mai jos
+ca referință, exact cum erau înainte de unificare.
+
+Rulare (din rădăcina proiectului):
+    python -m benchmarks.bench_cie_mapping [--n 20000]
+"""
+from __future__ import annotations
+import re
+import argparse
+import random
+import timeit
+from typing import Tuple
+
+from cie_mapping import map_raw, map_many
+
+
+# --------------- mapările vechi (referință) ---------------
+
+def _dmy_to_iso(dmy: str | None) -> str | None:
+    if not dmy:
+        return None
+    m = re.match(r"^\s*(\d{2})[.\-\/](\d{2})[.\-\/](\d{4})\s*$", str(dmy))
+    if not m:
+        return dmy
+    return f"{m.group(3)}-{m.group(2)}-{m.group(1)}"
+
+def _iso_to_dmy(iso: str | None) -> str:
+    if not iso:
+        return ""
+    m = re.match(r"^\s*(\d{4})-(\d{2})-(\d{2})", str(iso))
+    return f"{m.group(3)}.{m.group(2)}.{m.group(1)}" if m else str(iso or "")
+
+def _digits(s: str | None) -> str:
+    return "".join(ch for ch in (s or "") if ch.isdigit())
+
+def _birth_from_cnp(cnp: str) -> Tuple[str, str, str, str]:
+    """
+    din CNP -> (sex(H/F), YYYY, MM, DD) sau gol.
+    Sex: 1/3/5/7 -> H; 2/4/6/8 -> F.
+    """
+    cnp = _digits(cnp)
+    if len(cnp) != 13:
+        return "", "", "", ""
+    s = int(cnp[0])
+    yy = int(cnp[1:3]); mm = cnp[3:5]; dd = cnp[5:7]
+    if s in (1, 2): century = 1900
+    elif s in (3, 4): century = 1800
+    else: century = 2000
+    year_full = f"{century + yy}"
+    sex = "H" if s in (1,3,5,7) else "F" if s in (2,4,6,8) else ""
+    return sex, year_full, mm, dd
+
+def _split_series_number(doc_number: str) -> Tuple[str, str]:
+    """VN1007098 -> ('VN','1007098'); 'VN 1007098' -> idem; '123456' -> ('','123456')."""
+    if not doc_number:
+        return "", ""
+    m = re.match(r"^\s*([A-Za-z]{1,3})?\s*([0-9]{3,})\s*$", str(doc_number))
+    if m:
+        return (m.group(1) or "").upper(), m.group(2)
+    letters = "".join(ch for ch in doc_number if ch.isalpha()).upper()
+    digits = "".join(ch for ch in doc_number if ch.isdigit())
+    return letters, digits
+
+
+def legacy_integration(raw: dict) -> dict:
+    """Copia din cie_integration.scan_cie_and_map (fără PIN / citire)."""
+    # --- nume/prenume ---
+    surname = (raw.get("surname") or "").strip()
+    given   = (raw.get("givenName") or "").strip()
+
+    # --- CNP / sex / naștere ---
+    cnp = (raw.get("personal_identification_number") or "").strip()
+    sex_raw = (raw.get("sex") or "").strip().upper()  # 'M' / 'F'
+    sex_conv = {"M": "H", "F": "F"}.get(sex_raw, "")
+
+    birth_dmy = (raw.get("birthdate") or "").strip()  # DD.MM.YYYY din parser
+    birth_iso = _dmy_to_iso(birth_dmy) or ""
+    if birth_iso:
+        y_b, m_b, d_b = birth_iso.split("-")
+    else:
+        # fallback din CNP
+        sex_cnp, y_b, m_b, d_b = _birth_from_cnp(cnp)
+        if not sex_conv:
+            sex_conv = sex_cnp
+
+    # --- document ---
+    issuer   = (raw.get("issuer") or "").strip()
+    doc_no   = (raw.get("document_number") or "").strip()
+    serie, numar = _split_series_number(doc_no)
+
+    issuing_dmy  = (raw.get("issuing_date") or "").strip()      # DD.MM.YYYY
+    expiry_dmy   = (raw.get("expiration_date") or "").strip()   # DD.MM.YYYY
+    issuing_iso  = _dmy_to_iso(issuing_dmy) or ""
+    expiry_iso   = _dmy_to_iso(expiry_dmy) or ""
+
+    ex_y = ex_m = ex_d = ""
+    if expiry_iso:
+        ex_y, ex_m, ex_d = expiry_iso.split("-")
+
+    # --- domiciliu / adresă ---
+    doms = raw.get("domiciliu_struct") or {}
+    dom  = raw.get("domicile") or {}
+
+    judet       = (doms.get("judet") or dom.get("county") or "").strip().upper()
+    localitate  = (doms.get("localitate") or dom.get("locality") or "").strip().upper()
+    # preferă 'rest' (structurat) ; dacă lipsește, încearcă 'street' sau 'text'
+    adresa2     = (doms.get("rest") or dom.get("street") or dom.get("text") or "").strip()
+
+    # --- observații simple ---
+    name_line = " ".join(p for p in [surname, given] if p).strip()
+    observatii = f"Nume: {name_line}" if name_line else ""
+
+    # --- payload 'date' exact pe schema ta ---
+    date_payload = {
+        "nume": surname,
+        "prenume": given,
+        "cnp": cnp,
+        "sex": sex_conv,        # 'H' / 'F'
+        "an": y_b or "",
+        "luna": m_b or "",
+        "zi": d_b or "",
+        "ci": {
+            "seria": serie,
+            "numarul": numar,
+            "id": f"{serie}{numar}",
+            "an_ex": ex_y,
+            "luna_ex": ex_m,
+            "zi_ex": ex_d,
+            "data_emiterii": issuing_iso or "",   # ISO
+            "eliberat": issuer
+        },
+        "judet": judet,
+        "localitatea": localitate,
+        "adresa2": adresa2
+    }
+
+    # --- mapare pentru UI ---
+    mapped = {
+        "emis": issuer,
+        "expira": expiry_dmy if expiry_dmy else _iso_to_dmy(expiry_iso),
+        "serie": serie,
+        "numar": numar,
+        "data": issuing_dmy if issuing_dmy else _iso_to_dmy(issuing_iso),
+        "observatii": observatii,
+        "date_payload": date_payload,
+    }
+    return mapped
+
+
+def legacy_edit_dialog(raw: dict) -> dict:
+    """Copia din EditDialog._map_raw_to_fields (helper-e redefinite la fiecare apel)."""
+    # --- helpers ---
+    def _split_series_number(doc_number: str):
+        if not doc_number:
+            return "", ""
+        m = re.match(r"^\s*([A-Za-z]{1,3})?\s*([0-9]{3,})\s*$", str(doc_number))
+        if m:
+            return (m.group(1) or "").upper(), m.group(2)
+        letters = "".join(ch for ch in str(doc_number) if ch.isalpha()).upper()
+        digits  = "".join(ch for ch in str(doc_number) if ch.isdigit())
+        return letters, digits
+
+    def _birth_from_cnp(cnp: str):
+        cnp = "".join(ch for ch in (cnp or "") if ch.isdigit())
+        if len(cnp) != 13:
+            return "", "", "", ""
+        s = int(cnp[0])
+        yy = int(cnp[1:3]); mm = cnp[3:5]; dd = cnp[5:7]
+        if s in (1,2): century = 1900
+        elif s in (3,4): century = 1800
+        else: century = 2000
+        sex = "H" if s in (1,3,5,7) else "F" if s in (2,4,6,8) else ""
+        return sex, f"{century+yy}", mm, dd
+
+    # --- nume/cnp/sex/naștere (cheile din read_all) ---
+    surname = (raw.get("surname") or "").strip()
+    given   = (raw.get("givenName") or "").strip()
+
+    cnp = (raw.get("personal_identification_number") or "").strip()
+
+    sex_raw  = (raw.get("sex") or "").strip().upper()  # 'M'/'F'
+    sex_conv = {"M": "H", "F": "F"}.get(sex_raw, "")
+
+    birth_dmy = (raw.get("birthdate") or "").strip()   # DD.MM.YYYY
+    an = luna = zi = ""
+    if birth_dmy:
+        birth_iso = _dmy_to_iso(birth_dmy) or ""
+        if birth_iso and len(birth_iso.split("-")) == 3:
+            an, luna, zi = birth_iso.split("-")
+    if not an:
+        sex_cnp, an, luna, zi = _birth_from_cnp(cnp)
+        if not sex_conv and sex_cnp:
+            sex_conv = sex_cnp
+
+    # --- document ---
+    issuer  = (raw.get("issuer") or "").strip()
+    doc_no  = (raw.get("document_number") or "").strip()
+    serie, numar = _split_series_number(doc_no)
+
+    issuing_dmy = (raw.get("issuing_date") or "").strip()      # DD.MM.YYYY
+    expiry_dmy  = (raw.get("expiration_date") or "").strip()   # DD.MM.YYYY
+    issuing_iso = _dmy_to_iso(issuing_dmy) or ""
+    expiry_iso  = _dmy_to_iso(expiry_dmy) or ""
+
+    an_ex = luna_ex = zi_ex = ""
+    if expiry_iso and len(expiry_iso.split("-")) == 3:
+        an_ex, luna_ex, zi_ex = expiry_iso.split("-")
+
+    # --- adresă ---
+    doms = raw.get("domiciliu_struct") or {}
+    dom  = raw.get("domicile") or {}
+
+    judet      = (doms.get("judet") or dom.get("county") or "").strip().upper()
+    localitate = (doms.get("localitate") or dom.get("locality") or "").strip().upper()
+    adresa2    = (doms.get("rest") or dom.get("street") or dom.get("text") or "").strip()
+
+    # --- observatii ---
+    observatii = f"Nume:  {surname}  {given}".strip()
+
+    # --- payload 'date' ---
+    date_payload = {
+        "nume": surname,
+        "prenume": given,
+        "cnp": cnp,
+        "sex": sex_conv,       # 'H' / 'F'
+        "an": an,
+        "luna": luna,
+        "zi": zi,
+        "ci": {
+            "seria": serie,
+            "numarul": numar,
+            "id": f"{serie}{numar}".strip(),
+            "an_ex": an_ex,
+            "luna_ex": luna_ex,
+            "zi_ex": zi_ex,
+            "data_emiterii": issuing_iso or "",
+            "eliberat": issuer,
+        },
+        "judet": judet,
+        "localitatea": localitate,
+        "adresa2": adresa2,
+    }
+
+    # --- valori pentru UI ---
+    return {
+        "emis": issuer,
+        "expira": expiry_dmy or (expiry_iso and _iso_to_dmy(expiry_iso)) or "",
+        "serie": serie,
+        "numar": numar,
+        "data": issuing_dmy or (issuing_iso and _iso_to_dmy(issuing_iso)) or "",
+        "observatii": observatii,
+        "date_payload": date_payload,
+    }
+
+
+# --------------- date de test ---------------
+
+_NAMES = ("POPESCU", "IONESCU", "ȘTEFĂNESCU", "DUMITRU", "CONSTANTIN")
+_GIVEN = ("ION", "MARIA", "ANA-MARIA", "GHEORGHE", "ELENA")
+
+
+def sample_raw(i: int) -> dict:
+    """O citire read_all() plauzibilă; variantele acoperă căile de fallback."""
+    rnd = random.Random(i)
+    s = rnd.choice("125678")
+    yy, mm, dd = rnd.randint(0, 99), rnd.randint(1, 12), rnd.randint(1, 28)
+    cnp = f"{s}{yy:02d}{mm:02d}{dd:02d}{rnd.randint(0, 999999):06d}"
+    year = (1900 if s in "12" else 2000) + yy
+    return {
+        "surname": rnd.choice(_NAMES),
+        "givenName": rnd.choice(_GIVEN),
+        "personal_identification_number": cnp,
+        "sex": "" if i % 5 == 0 else ("M" if s in "157" else "F"),
+        "birthdate": "" if i % 3 == 0 else f"{dd:02d}.{mm:02d}.{year}",   # fallback din CNP
+        "issuer": "SPCLEP Adjud",
+        "document_number": rnd.choice(("VN1007098", "VN 1007098", "1007098", "X-12/34")),
+        "issuing_date": f"{dd:02d}.{mm:02d}.2021",
+        "expiration_date": f"{dd:02d}.{mm:02d}.2031",
+        "domicile": {"county": "VN", "locality": "Adjud", "street": "Str. Republicii", "text": None},
+        "domiciliu_struct": {} if i % 4 == 0 else {"judet": "VN", "localitate": "Adjud", "rest": "Str.Republicii, nr.261"},
+    }
+
+
+# --------------- rulare ---------------
+
+def _check(raws):
+    """Câmpurile în care maparea nouă diferă de cele vechi (doar diferențe intenționate)."""
+    diffs = set()
+    for raw in raws:
+        new = map_raw(raw)
+        for name, old in (("EditDialog", legacy_edit_dialog(raw)), ("cie_integration", legacy_integration(raw))):
+            for k in ("emis", "expira", "serie", "numar", "data"):
+                if new[k] != old[k]:
+                    diffs.add((name, k))
+            for k, v in new["date_payload"].items():
+                if k == "ci":
+                    for g, w in v.items():
+                        if old["date_payload"]["ci"].get(g) != w:
+                            diffs.add((name, f"ci.{g}"))
+                elif old["date_payload"].get(k) != v:
+                    diffs.add((name, k))
+    return sorted(diffs)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--n", type=int, default=20000, help="câte citiri per rundă")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    raws = [sample_raw(i) for i in range(args.n)]
+    diffs = _check(raws[:500])
+    if diffs:
+        print("diferențe față de mapările vechi:", ", ".join(f"{a}.{b}" for a, b in diffs))
+
+    cases = (
+        ("EditDialog._map_raw_to_fields (vechi)", lambda: [legacy_edit_dialog(r) for r in raws]),
+        ("cie_integration (vechi)", lambda: [legacy_integration(r) for r in raws]),
+        ("cie_mapping.map_raw", lambda: [map_raw(r) for r in raws]),
+        ("cie_mapping.map_many", lambda: map_many(raws)),
+    )
+    results = []
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        results.append((name, best))
+    base = max(t for _, t in results[:2])
+    print(f"{args.n} citiri, cel mai bun din {args.repeat}:")
+    for name, t in results:
+        print(f"  {name:<40} {t * 1e6 / args.n:7.2f} µs/citire   x{base / t:4.2f}")
+
+
+if __name__ == "__main__":
+    main()
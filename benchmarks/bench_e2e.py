@@ -0,0 +1,210 @@
+# benchmarks/bench_e2e.py
+"""
+Benchmark end-to-end, fără UI, pe un backend local (benchmarks.fake_backend):
+login, paginare, refresh de token (proactiv la exp / la 401), record-uri (RecordCache),
+salvare PATCH + If-Match, preview-uri
+(rece / cache fișiere / cache thumbnail), download-uri (rece / revalidare 304), parcurgere completă.
+Raportează p50/p95/p99 și debitul; --save / --compare pentru regresii între versiuni.
+
+Rulare (din rădăcina proiectului):
+    python -m benchmarks.bench_e2e [--rows 500] [--latency-ms 20] [--file-kb 256] [--n 50] [--token-ttl 300]
+    python -m benchmarks.bench_e2e --save baseline.json
+    python -m benchmarks.bench_e2e --compare baseline.json
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# profil temporar: token-uri / cache-uri / metrici nu ating profilul utilizatorului
+_PROFILE = tempfile.mkdtemp(prefix="waitdocs-bench-")
+os.environ["APPDATA"] = os.environ["XDG_CONFIG_HOME"] = _PROFILE
+os.environ["WAITDOCS_METRICS"] = "0"
+
+from api import ApiClient                                  # noqa: E402
+from metrics import summarize                              # noqa: E402
+from record_cache import RecordCache                       # noqa: E402
+from file_cache import FileCache                           # noqa: E402
+from download_manager import DownloadManager               # noqa: E402
+from benchmarks.fake_backend import FakeBackend, make_jwt  # noqa: E402
+
+REGRESSION = 0.20     # --compare: p95 cu peste 20% mai mare = regresie
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def _run(name: str, fn, n: int, concurrency: int = 1) -> dict:
+    """fn(i) de n ori, pe `concurrency` thread-uri; latențe per apel + debit total."""
+    t0 = time.perf_counter()
+    if concurrency <= 1:
+        lat = [_timed(lambda i=i: fn(i)) for i in range(n)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            lat = list(pool.map(lambda i: _timed(lambda: fn(i)), range(n)))
+    wall = time.perf_counter() - t0
+    res = summarize(lat)
+    res.update({"name": name, "ops_s": n / wall if wall else 0.0, "concurrency": concurrency})
+    return res
+
+
+def run_suite(args) -> list[dict]:
+    from waitdocs_window import WaitDocsClient   # importă tkinter, dar nu creează ferestre
+    try:
+        from previews import load_thumbnail
+        from thumb_cache import ThumbCache
+        import PIL  # noqa: F401
+        have_pil = True
+    except ImportError:
+        have_pil = False
+
+    results = []
+    rnd = random.Random(7)
+    with FakeBackend(rows=args.rows, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                     file_kb=args.file_kb, access_ttl=args.token_ttl) as be:
+        api = ApiClient(be.url)
+        client = WaitDocsClient(api)
+        pages = max(1, args.rows // args.page_size)
+        ids = list(range(1, args.rows + 1))
+
+        results.append(_run("login", lambda i: api.login("operator", "parola"), max(5, args.n // 5)))
+        results.append(_run("pagină (fetch_page)",
+                            lambda i: client.fetch_page(rnd.randrange(pages), args.page_size), args.n))
+        results.append(_run("pagină x%d paralel" % args.concurrency,
+                            lambda i: client.fetch_page(i % pages, args.page_size), args.n, args.concurrency))
+        results.append(_run("căutare", lambda i: client.fetch_page(0, args.page_size, f"popescu{i + 1}"), args.n))
+
+        # token expirat: refresh proactiv (exp citit din JWT) + cererea propriu-zisă
+        def expired_then_page(i):
+            api.use_tokens({"access": make_jwt("operator", -60), "refresh": api.tokens.refresh})
+            client.fetch_page(0, args.page_size)
+
+        results.append(_run("pagină cu refresh (access expirat)", expired_then_page, max(5, args.n // 5)))
+
+        # token revocat pe server (exp încă valid la client): 401 -> refresh -> reluare
+        def revoked_then_page(i):
+            be.revoke_access()
+            time.sleep(0.001)   # token-ul nou trebuie emis după momentul revocării
+            client.fetch_page(0, args.page_size)
+
+        results.append(_run("pagină cu refresh (401)", revoked_then_page, max(5, args.n // 5)))
+
+        # record-uri: rece (request) vs cald (din cache, fără rețea)
+        records = RecordCache(api, workers=2)
+
+        def record_cold(i):
+            done = threading.Event()
+            records.fetch_async(ids[i % len(ids)], lambda rec, err: done.set(), force=True)
+            done.wait(30)
+
+        results.append(_run("record rece (RecordCache)", record_cold, args.n))
+        results.append(_run("record cald (RecordCache.get)", lambda i: records.get(ids[i % len(ids)]), args.n * 20))
+
+        # salvare: PATCH cu If-Match (ETag din cache), ca save_document_async
+        def save(i):
+            doc_id = ids[i % len(ids)]
+            headers = {"If-Match": records.etag(doc_id)} if records.etag(doc_id) else None
+            data, h = api.request_with_headers("PATCH", "/waitdocument/", headers=headers,
+                                               json={"id": doc_id, "observatii": f"bench {i}"})
+            records.put(doc_id, data, h.get("ETag"))
+
+        results.append(_run("salvare PATCH + If-Match", save, args.n))
+        records.shutdown()
+
+        media = [f"{be.url}/images/doc_{i}.jpg" for i in ids]
+        root = tempfile.mkdtemp(dir=_PROFILE)
+        if have_pil:
+            files = FileCache(os.path.join(root, "files"))
+            thumbs = ThumbCache(os.path.join(root, "thumbs"))
+            results.append(_run("preview rece (download + decodare)",
+                                lambda i: load_thumbnail(api, media[i], thumbs, files=files), min(args.n, len(media))))
+            thumbs_fresh = ThumbCache(os.path.join(root, "thumbs2"))
+            results.append(_run("preview din FileCache (doar decodare)",
+                                lambda i: load_thumbnail(api, media[i], thumbs_fresh, files=files),
+                                min(args.n, len(media))))
+            results.append(_run("preview din ThumbCache",
+                                lambda i: load_thumbnail(api, media[i], thumbs, files=files), min(args.n, len(media))))
+
+        dl_files = FileCache(os.path.join(root, "downloads"))
+        downloads = DownloadManager(api, dl_files, max_concurrent=args.concurrency)
+        dl_urls = [u + "?dl=1" for u in media]
+        results.append(_run("download rece (DownloadManager)",
+                            lambda i: downloads.start(dl_urls[i]).wait(60), min(args.n, len(dl_urls))))
+        results.append(_run("download revalidare (304)",
+                            lambda i: downloads.start(dl_urls[i]).wait(60), min(args.n, len(dl_urls))))
+        downloads.shutdown()
+
+        walk = _run("parcurgere completă (iter_rows)", lambda i: sum(1 for _ in client.iter_rows()), 3)
+        walk["rows_s"] = args.rows * walk["ops_s"]
+        results.append(walk)
+
+        print(f"cereri pe server: {json.dumps(be.stats, sort_keys=True)}")
+    return results
+
+
+def print_results(results: list[dict], previous: dict | None = None):
+    prev = {r["name"]: r for r in (previous or {}).get("results", [])}
+    width = max(len(r["name"]) for r in results)
+    print(f"\n{'scenariu':<{width}}  {'nr':>5}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'max ms':>8}  {'op/s':>8}")
+    regressions = []
+    for r in results:
+        line = (f"{r['name']:<{width}}  {r['count']:>5}  {r['p50']:>8.2f}  {r['p95']:>8.2f}"
+                f"  {r['p99']:>8.2f}  {r['max']:>8.2f}  {r['ops_s']:>8.1f}")
+        old = prev.get(r["name"])
+        if old and old.get("p95"):
+            ratio = r["p95"] / old["p95"] - 1
+            line += f"  p95 {ratio:+.0%}"
+            if ratio > REGRESSION:
+                line += "  <-- REGRESIE"
+                regressions.append(r["name"])
+        if "rows_s" in r:
+            line += f"  ({r['rows_s']:.0f} rânduri/s)"
+        print(line)
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=500)
+    ap.add_argument("--page-size", type=int, default=10)
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--jitter-ms", type=float, default=5.0)
+    ap.add_argument("--file-kb", type=int, default=256)
+    ap.add_argument("--n", type=int, default=50, help="repetări per scenariu")
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--token-ttl", type=float, default=300.0,
+                    help="durata token-ului access pe backend (s); mică -> refresh-uri în toate scenariile")
+    ap.add_argument("--save", default="", help="salvează rezultatele (JSON)")
+    ap.add_argument("--compare", default="", help="compară cu un JSON salvat anterior")
+    args = ap.parse_args(argv)
+
+    print(f"backend local: {args.rows} rânduri, latență {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, "
+          f"fișiere ~{args.file_kb} KiB")
+    results = run_suite(args)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    regressions = print_results(results, previous)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\nsalvat: {args.save}")
+    if regressions:
+        print(f"\nregresii p95 > {REGRESSION:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/bench_startup.py
+"""
+Benchmark: timpul de pornire pentru app.py și cie_handler.py.
+- import-uri (python -X importtime): total, modulele cele mai scumpe, ce module grele
+  (PIL, PyKCS11, cryptography, smartcard, pypdfium2) se încarcă deja la import;
+- proces complet (interpretor + import), față de `python -c pass`;
+- timpul până la prima fereastră (App creat + primul update()), doar dacă există display.
+
+Rulare (din rădăcina proiectului):
+    python -m benchmarks.bench_startup [--repeat 5] [--top 12]
+"""
+from __future__ import annotations
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = ("PIL", "PyKCS11", "cryptography", "smartcard", "pypdfium2")
+ENTRIES = ("app", "cie_handler")
+
+_FIRST_WINDOW = """
+import time
+t0 = time.perf_counter()
+import app
+try:
+    a = app.App()
+except Exception as e:
+    print("ERR", e)
+    raise SystemExit(0)
+a.update()
+print("OK", time.perf_counter() - t0)
+a.destroy()
+"""
+
+
+def _run(args: list[str]) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env,
+                          capture_output=True, text=True, encoding="utf-8", errors="replace")
+
+
+def import_profile(module: str) -> tuple[float, list[tuple[int, int, str]], str]:
+    """(ms total, [(self_us, cumulativ_us, modul)], eroare) din -X importtime."""
+    p = _run(["-X", "importtime", "-c", f"import {module}"])
+    rows = []
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((int(self_us), int(cum_us), name.rstrip()))
+        except ValueError:
+            continue
+    total = next((cum for _, cum, name in reversed(rows) if name.strip() == module), 0)
+    err = "" if p.returncode == 0 else (p.stderr.strip().splitlines() or ["?"])[-1]
+    return total / 1000.0, rows, err
+
+
+def process_ms(code: str, repeat: int) -> float:
+    """Mediana timpului de perete pentru `python -c code` (include pornirea interpretorului)."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        _run(["-c", code])
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(times)
+
+
+def first_window_ms(repeat: int) -> str:
+    if os.name != "nt" and not os.environ.get("DISPLAY"):
+        return "n/a (fără display)"
+    times = []
+    for _ in range(repeat):
+        p = _run(["-c", _FIRST_WINDOW])
+        out = p.stdout.strip().split()
+        if len(out) < 2 or out[0] != "OK":
+            return f"n/a ({p.stdout.strip() or p.stderr.strip().splitlines()[-1:]})"
+        times.append(float(out[1]) * 1000.0)
+    return f"{statistics.median(times):.1f} ms"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=12, help="câte module scumpe afișăm")
+    args = ap.parse_args(argv)
+
+    baseline = process_ms("pass", args.repeat)
+    print(f"python -c pass: {baseline:.1f} ms (mediană, {args.repeat} rulări)\n")
+
+    for module in ENTRIES:
+        total, rows, err = import_profile(module)
+        print(f"== import {module}: {total:.1f} ms" + (f"  [EROARE: {err}]" if err else ""))
+        loaded = sorted({name.strip().split(".")[0] for _, _, name in rows} & set(HEAVY))
+        print(f"   module grele încărcate: {', '.join(loaded) or 'niciunul'}")
+        print(f"   proces complet: {process_ms(f'import {module}', args.repeat):.1f} ms")
+        for self_us, cum_us, name in sorted(rows, key=lambda r: r[0], reverse=True)[:args.top]:
+            print(f"   {self_us / 1000:8.2f} ms self {cum_us / 1000:9.2f} ms cum  {name.strip()}")
+        print()
+
+    print(f"prima fereastră (App + update): {first_window_ms(args.repeat)}")
+
+
+if __name__ == "__main__":
+    main()
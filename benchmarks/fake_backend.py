@@ -0,0 +1,289 @@
+# benchmarks/fake_backend.py
+"""
+Server local care imită backend-ul WaitDocs, pentru benchmark-uri reproductibile:
+- POST /rest_api/token/, /rest_api/token/refresh/  -> JWT cu exp (semnătură falsă);
+  access expiră după access_ttl (401 token_not_valid), revoke_access() invalidează imediat
+  token-urile emise până atunci (exp încă valid la client -> refresh pe calea 401);
+- POST /documentescanate/cie/                      -> paginare stil DataTables (start/length/search);
+- GET/PUT/PATCH /waitdocument/                     -> record + ETag, If-Match -> 412;
+- GET /images/<fișier>                             -> JPEG generat (ETag, 304, Range/206).
+Latența, jitter-ul, numărul de rânduri și mărimea fișierelor se configurează la pornire.
+"""
+from __future__ import annotations
+import io, json, time, base64, random, threading, urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+ACCESS_TTL_SEC = 300
+
+
+def make_jwt(sub: str, ttl: float = ACCESS_TTL_SEC) -> str:
+    def part(obj) -> str:
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).decode().rstrip("=")
+    now = time.time()
+    return f"{part({'alg': 'none'})}.{part({'sub': sub, 'iat': now, 'exp': int(now + ttl)})}.x"
+
+
+def jwt_claims(token: str) -> dict:
+    try:
+        payload = token.split(".")[1]
+        return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (IndexError, ValueError):
+        return {}
+
+
+def make_image(kb: int, seed: int = 0) -> bytes:
+    """JPEG de ~kb KiB (zgomot, ca să nu se comprime); fără PIL -> bytes aleatori."""
+    rnd = random.Random(seed)
+    try:
+        from PIL import Image
+    except ImportError:
+        return rnd.randbytes(kb * 1024)
+    side = max(64, int((kb * 1024 / 1.1) ** 0.5))
+    img = Image.frombytes("L", (side, side), rnd.randbytes(side * side)).convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+def _record(doc_id: int) -> dict:
+    date = {
+        "nume": f"POPESCU{doc_id}", "prenume": "ION", "cnp": f"1800101{doc_id:06d}"[:13],
+        "sex": "H", "an": "1980", "luna": "01", "zi": "01",
+        "ci": {"seria": "VN", "numarul": f"{100000 + doc_id}", "id": f"VN{100000 + doc_id}",
+               "an_ex": "2030", "luna_ex": "01", "zi_ex": "01",
+               "data_emiterii": "2020-01-01", "eliberat": "SPCLEP Focșani"},
+        "judet": "VN", "localitatea": "FOCȘANI", "adresa2": f"Str. Republicii, nr. {doc_id}",
+    }
+    return {"id": doc_id, "emis": "SPCLEP Focșani", "expira": "2030-01-01", "data": "2020-01-01",
+            "nr": f"{100000 + doc_id}", "observatii": "", "version": 1,
+            "date": json.dumps(date, ensure_ascii=False, separators=(",", ":"))}
+
+
+class FakeBackend:
+    """
+    with FakeBackend(rows=500, latency_ms=20) as be:
+        api = ApiClient(be.url) ...
+    stats: numărul de cereri per rută (ex: câte GET-uri au fost 304, câte 401 / refresh).
+    access_ttl: durata de viață a token-ului access (secunde); clientul face refresh proactiv
+    cu 10 s înainte de exp, deci valori sub ~10 s înseamnă refresh la fiecare cerere.
+    """
+
+    def __init__(self, *, rows: int = 500, latency_ms: float = 20.0, jitter_ms: float = 5.0,
+                 file_kb: int = 256, pdf_every: int = 0, seed: int = 1,
+                 access_ttl: float = ACCESS_TTL_SEC):
+        self.rows = rows
+        self.access_ttl = access_ttl
+        self.revoked_before = 0.0
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.pdf_every = pdf_every
+        self.image = make_image(file_kb, seed)
+        self.image_etag = f'"img-{len(self.image)}"'
+        self.records = {i: _record(i) for i in range(1, rows + 1)}
+        self.stats: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._rnd = random.Random(seed)
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeBackend":
+        backend = self
+
+        class Handler(_Handler):
+            pass
+
+        Handler.backend = backend
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="fake-backend").start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeBackend":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def revoke_access(self):
+        """Token-urile access emise până acum devin invalide (401), deși exp-ul lor nu a trecut."""
+        with self._lock:
+            self.revoked_before = time.time()
+
+    # --------------- intern ---------------
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def delay(self):
+        with self._lock:
+            extra = self._rnd.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, self.latency + extra))
+
+    def row(self, doc_id: int) -> dict:
+        ext = "pdf" if self.pdf_every and doc_id % self.pdf_every == 0 else "jpg"
+        return {"id": doc_id, "tip": "CI", "subtip": "față", "user_username": "operator",
+                "angajat_username": f"popescu{doc_id}.ion", "file": f"/images/doc_{doc_id}.{ext}",
+                "denumire": f"doc_{doc_id}.{ext}"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    backend: FakeBackend
+    protocol_version = "HTTP/1.1"    # keep-alive, ca un server real
+    # răspuns scris dintr-o bucată (header + corp): altfel Nagle + ACK întârziat adaugă ~40 ms/cerere
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    server_version = "FakeWaitDocs/1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    # --------------- rute ---------------
+
+    def do_POST(self):
+        self.backend.delay()
+        path = self.path.split("?", 1)[0]
+        body = self._body()
+        if path == "/rest_api/token/":
+            self._count("token")
+            self._json(200, {"access": make_jwt("operator", self.backend.access_ttl),
+                             "refresh": make_jwt("operator", 86400)})
+        elif path == "/rest_api/token/refresh/":
+            self._count("refresh")
+            try:
+                refresh = json.loads(body or b"{}").get("refresh") or ""
+            except ValueError:
+                refresh = ""
+            if jwt_claims(refresh).get("exp", 0) <= time.time():
+                self._json(401, {"detail": "refresh invalid", "code": "token_not_valid"})
+            else:
+                self._json(200, {"access": make_jwt("operator", self.backend.access_ttl)})
+        elif path == "/documentescanate/cie/":
+            if self._auth():
+                self._count("page")
+                self._page(urllib.parse.parse_qs(body.decode("utf-8")))
+        else:
+            self._json(404, {"detail": "not found"})
+
+    def do_GET(self):
+        self.backend.delay()
+        url = urllib.parse.urlparse(self.path)
+        if url.path == "/waitdocument/":
+            if self._auth():
+                self._count("record_get")
+                doc_id = int((urllib.parse.parse_qs(url.query).get("id") or ["0"])[0])
+                rec = self.backend.records.get(doc_id)
+                if rec is None:
+                    self._json(404, {"detail": "not found"})
+                else:
+                    self._json(200, rec, etag=f'"v{rec["version"]}"')
+        elif url.path.startswith("/images/"):
+            self._media()
+        else:
+            self._json(404, {"detail": "not found"})
+
+    def do_PUT(self):
+        self._save()
+
+    def do_PATCH(self):
+        self._save()
+
+    # --------------- intern ---------------
+
+    def _count(self, key: str):
+        self.backend.count(key)
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _auth(self) -> bool:
+        auth = self.headers.get("Authorization") or ""
+        if not auth.startswith("Bearer "):
+            self._json(401, {"detail": "auth"})
+            return False
+        claims = jwt_claims(auth[7:])
+        if claims.get("exp", 0) <= time.time() or claims.get("iat", 0) < self.backend.revoked_before:
+            self._count("auth_401")
+            self._json(401, {"detail": "Token is invalid or expired", "code": "token_not_valid"})
+            return False
+        return True
+
+    def _send(self, status: int, body: bytes, ctype: str, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _json(self, status: int, obj, etag: str | None = None):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self._send(status, body, "application/json", {"ETag": etag} if etag else None)
+
+    def _page(self, form: dict):
+        def first(key, default=""):
+            return (form.get(key) or [default])[0]
+        start, length = int(first("start", "0")), int(first("length", "10"))
+        search = first("search[value]").lower()
+        ids = range(1, self.backend.rows + 1)
+        rows = [self.backend.row(i) for i in ids]
+        if search:
+            rows = [r for r in rows if search in r["angajat_username"] or search in r["denumire"]]
+        self._json(200, {"draw": int(first("draw", "1")), "recordsTotal": self.backend.rows,
+                         "recordsFiltered": len(rows), "data": rows[start:start + length]})
+
+    def _save(self):
+        self.backend.delay()
+        if not self._auth():
+            return
+        self._count("save_" + self.command.lower())
+        try:
+            payload = json.loads(self._body() or b"{}")
+        except ValueError:
+            self._json(400, {"detail": "json"})
+            return
+        rec = self.backend.records.get(int(payload.get("id") or 0))
+        if rec is None:
+            self._json(404, {"detail": "not found"})
+            return
+        if_match = self.headers.get("If-Match")
+        if if_match and if_match != f'"v{rec["version"]}"':
+            self._count("save_412")
+            self._json(412, {"detail": "modificat între timp"})
+            return
+        rec.update({k: v for k, v in payload.items() if k not in ("id", "version")})
+        rec["version"] += 1
+        self._json(200, rec, etag=f'"v{rec["version"]}"')
+
+    def _media(self):
+        data, etag = self.backend.image, self.backend.image_etag
+        if self.headers.get("If-None-Match") == etag:
+            self._count("media_304")
+            self._send(304, b"", "image/jpeg", {"ETag": etag})
+            return
+        rng = self.headers.get("Range")
+        if rng and rng.startswith("bytes=") and self.headers.get("If-Range", etag) == etag:
+            start = int(rng[6:].split("-", 1)[0] or 0)
+            if start >= len(data):
+                self._send(416, b"", "image/jpeg", {"Content-Range": f"bytes */{len(data)}"})
+                return
+            self._count("media_206")
+            self._send(206, data[start:], "image/jpeg",
+                       {"ETag": etag, "Content-Range": f"bytes {start}-{len(data) - 1}/{len(data)}"})
+            return
+        self._count("media_200")
+        self._send(200, data, "image/jpeg", {"ETag": etag, "Last-Modified": "Mon, 05 Oct 2026 10:00:00 GMT"})
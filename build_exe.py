@@ -0,0 +1,215 @@
+# build_exe.py — build PyInstaller one-dir pentru aplicație + handler-ul cie:// separat
+# Rezultat: dist/WaitDocs/
+#   WaitDocs.exe      + _internal/   (aplicația)
+#   WaitDocsCIE.exe   + _cie/        (doar ce îi trebuie lui cie_handler: agent, punte, PKCS#11)
+# Apoi: raport de mărime + pornire la rece, comparat cu build-ul anterior (build/build_report.json).
+import argparse, json, os, shutil, statistics, subprocess, sys, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+WORK = ROOT / "build" / "pyinstaller"
+REPORT_PATH = ROOT / "build" / "build_report.json"
+
+APP_NAME = "WaitDocs"
+HANDLER_NAME = "WaitDocsCIE"
+HANDLER_CONTENTS = "_cie"      # != _internal, ca ambele exe să stea în același folder
+
+# module din stdlib / requirements pe care nu le folosește niciun exe
+COMMON_EXCLUDES = (
+    "unittest", "doctest", "pydoc", "pdb", "lib2to3", "test", "tkinter.test", "idlelib",
+    "distutils", "setuptools", "pip", "xmlrpc", "benchmarks",
+    # ZODB & co. sunt în requirements.txt, dar aplicația nu le importă
+    "ZODB", "BTrees", "persistent", "transaction", "zope", "ZConfig", "zodbpickle", "zc",
+)
+# handler-ul: fără UI-ul principal, fără rețea HTTP client, fără preview-uri
+HANDLER_EXCLUDES = COMMON_EXCLUDES + (
+    "PIL", "pypdfium2", "requests", "urllib3", "charset_normalizer", "idna", "certifi", "sqlite3",
+    "api", "waitdocs_window", "login_window", "main_window", "previews", "preview_pool", "thumb_cache",
+    "file_cache", "record_cache", "download_manager", "local_mirror", "queue_sync", "bulk_export",
+)
+
+# regresii semnalate în raport (față de build-ul anterior)
+SIZE_REGRESSION = 0.10         # +10% mărime
+START_REGRESSION = 0.25        # +25% timp de pornire (mediană)
+
+
+def run(cmd):
+    print(f"\n>>> {' '.join(str(c) for c in cmd)}\n")
+    subprocess.check_call([str(c) for c in cmd], cwd=ROOT)
+
+
+def _exe(name: str) -> str:
+    return f"{name}.exe" if os.name == "nt" else name
+
+
+def pyinstaller(entry: str, name: str, distpath: Path, *, excludes, extra=()):
+    cmd = [
+        sys.executable, "-m", "PyInstaller", entry,
+        "--name", name,
+        "--onedir",                 # fără dezarhivare în %TEMP% la fiecare pornire (onefile)
+        "--windowed",
+        "--noconfirm", "--clean",
+        "--optimize", "2",          # bytecode precompilat fără assert-uri / docstring-uri
+        "--noupx",                  # DLL-urile comprimate cu UPX se decomprimă la fiecare pornire
+        "--distpath", distpath,
+        "--workpath", WORK / name,
+        "--specpath", WORK,
+    ]
+    for mod in excludes:
+        cmd += ["--exclude-module", mod]
+    run(cmd + list(extra))
+
+
+# --------------- build ---------------
+
+def build_app(dist: Path) -> Path:
+    icon = ROOT / "assets" / "waitdocs.ico"
+    pyinstaller("app.py", APP_NAME, dist, excludes=COMMON_EXCLUDES, extra=[
+        "--icon", icon,
+        "--add-data", f"{ROOT / 'assets'}{os.pathsep}assets",
+    ])
+    return dist / APP_NAME
+
+
+def build_handler(app_dir: Path) -> Path:
+    tmp = WORK / "handler-dist"
+    pyinstaller("cie_handler.py", HANDLER_NAME, tmp, excludes=HANDLER_EXCLUDES, extra=[
+        "--contents-directory", HANDLER_CONTENTS,
+    ])
+    # exe + _cie/ lângă aplicație (un singur folder de instalare pentru MSI)
+    src = tmp / HANDLER_NAME
+    for item in src.iterdir():
+        dest = app_dir / item.name
+        if dest.is_dir():
+            shutil.rmtree(dest)
+        if item.is_dir():
+            shutil.copytree(item, dest)
+        else:
+            shutil.copy2(item, dest)
+    return app_dir / _exe(HANDLER_NAME)
+
+
+def build_all(dist: Path | None = None) -> Path:
+    app_dir = build_app(dist or ROOT / "dist")
+    build_handler(app_dir)
+    return app_dir
+
+
+# --------------- raport ---------------
+
+def _tree_size(path: Path) -> tuple[int, int]:
+    if path.is_file():
+        return path.stat().st_size, 1
+    total = files = 0
+    for p in path.rglob("*"):
+        if p.is_file():
+            total += p.stat().st_size
+            files += 1
+    return total, files
+
+
+def _largest(contents: Path, top: int) -> list[tuple[str, int]]:
+    if not contents.is_dir():
+        return []
+    sizes = [(p.name, _tree_size(p)[0]) for p in contents.iterdir()]
+    return sorted(sizes, key=lambda x: x[1], reverse=True)[:top]
+
+
+def _start_times(exe: Path, args: list[str], runs: int) -> list[float] | None:
+    """ms per rulare; prima e cea mai apropiată de pornirea la rece (cache-ul OS încă gol)."""
+    if not exe.is_file():
+        return None
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        try:
+            rc = subprocess.run([str(exe), *args], cwd=exe.parent, timeout=60,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if rc != 0:
+            return None
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return times
+
+
+def build_report(app_dir: Path, *, runs: int = 5, top: int = 8) -> dict:
+    app_dir = Path(app_dir)
+    targets = (
+        # (etichetă, exe, argumente, folderul cu dependențe)
+        ("app", APP_NAME, ["--startup-probe"], "_internal"),
+        ("cie-link", HANDLER_NAME, ["--startup-probe"], HANDLER_CONTENTS),
+        ("cie-agent", HANDLER_NAME, ["--startup-probe-agent"], HANDLER_CONTENTS),
+    )
+    total, files = _tree_size(app_dir)
+    report = {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "total_bytes": total, "files": files, "targets": {}}
+    for label, name, args, contents in targets:
+        exe = app_dir / _exe(name)
+        size = _tree_size(exe)[0] + _tree_size(app_dir / contents)[0] if exe.is_file() else 0
+        times = _start_times(exe, args, runs)
+        report["targets"][label] = {
+            "bytes": size,
+            "first_ms": round(times[0], 1) if times else None,
+            "median_ms": round(statistics.median(times), 1) if times else None,
+            "largest": _largest(app_dir / contents, top),
+        }
+    return report
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1048576:.1f} MB"
+
+
+def _delta(new, old, limit: float) -> str:
+    if not new or not old:
+        return ""
+    ratio = new / old - 1
+    flag = "  <-- REGRESIE" if ratio > limit else ""
+    return f" ({ratio:+.0%}){flag}"
+
+
+def print_report(report: dict, previous: dict | None = None):
+    prev_t = (previous or {}).get("targets", {})
+    print("\n=== Raport build ===")
+    print(f"Total: {_mb(report['total_bytes'])} în {report['files']} fișiere"
+          + _delta(report["total_bytes"], (previous or {}).get("total_bytes"), SIZE_REGRESSION))
+    for label, t in report["targets"].items():
+        old = prev_t.get(label, {})
+        print(f"\n[{label}] {_mb(t['bytes'])}" + _delta(t["bytes"], old.get("bytes"), SIZE_REGRESSION))
+        if t["median_ms"] is None:
+            print("  pornire: n/a (exe lipsă sau nu rulează pe acest sistem)")
+        else:
+            print(f"  pornire: prima {t['first_ms']:.0f} ms, mediană {t['median_ms']:.0f} ms"
+                  + _delta(t["median_ms"], old.get("median_ms"), START_REGRESSION))
+        for name, size in t["largest"]:
+            print(f"    {_mb(size):>9}  {name}")
+
+
+def report_and_save(app_dir: Path, *, runs: int = 5) -> dict:
+    previous = None
+    try:
+        previous = json.loads(REPORT_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+    report = build_report(app_dir, runs=runs)
+    print_report(report, previous)
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    REPORT_PATH.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\nRaport salvat: {REPORT_PATH}")
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dist", default=str(ROOT / "dist"))
+    ap.add_argument("--runs", type=int, default=5, help="rulări pentru timpul de pornire")
+    ap.add_argument("--report-only", action="store_true", help="doar raportul pentru un build existent")
+    args = ap.parse_args()
+
+    dist = Path(args.dist).resolve()
+    app_dir = dist / APP_NAME if args.report_only else build_all(dist)
+    report_and_save(app_dir, runs=args.runs)
+
+
+if __name__ == "__main__":
+    main()
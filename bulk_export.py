@@ -0,0 +1,115 @@
+# bulk_export.py
+from __future__ import annotations
+import os, re, csv, io, shutil, zipfile, threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Optional
+
+MANIFEST_COLS = ("id", "tip", "subtip", "user", "angajat", "denumire", "file", "exportat_ca", "status")
+EXPORT_WORKERS = 4
+
+_UNSAFE = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def safe_name(row: dict) -> str:
+    """<id>_<denumire sau nume fișier>, fără caractere interzise în Windows."""
+    base = row.get("denumire") or (row.get("file") or "").split("/")[-1] or "fisier"
+    base = _UNSAFE.sub("_", str(base)).strip(" .") or "fisier"
+    ext = os.path.splitext((row.get("file") or "").split("?")[0])[1]
+    if ext and not base.lower().endswith(ext.lower()):
+        base += ext
+    return f"{row.get('id')}_{base}"
+
+
+def export_documents(rows, fetch_file: Callable[[dict], Optional[str]], dest: str, *,
+                     as_zip: bool = True, workers: int = EXPORT_WORKERS, total: int = 0,
+                     on_progress: Callable[[int, int, str], None] | None = None,
+                     cancel: Optional[threading.Event] = None) -> dict:
+    """
+    Exportă atașamentele rândurilor date într-o arhivă ZIP sau într-un folder.
+    - rows: iterabil de rânduri (ex: WaitDocsClient.iter_rows) – consumat pe măsură ce se paginează;
+    - fetch_file(row) -> cale locală (download pe disc, nu în RAM), rulat pe un pool mărginit;
+    - cel mult 2 x workers descărcări în zbor: fiecare fișier terminat se copiază imediat în
+      ZIP / folder (copyfileobj, pe thread-ul apelant), înainte ca FileCache să-l poată evacua
+      (LRU la FILES_CAP_BYTES) – altfel la exporturi mai mari decât cache-ul s-ar pierde fișiere;
+    - total = numărul estimat de rânduri (doar pentru on_progress);
+    - manifest.csv cu id, tip, subtip, user, angajat, denumire + statusul fiecărui rând.
+    Întoarce {"ok": n, "failed": n, "skipped": n}.
+    """
+    stats = {"ok": 0, "failed": 0, "skipped": 0}
+    manifest: list[dict] = []
+    futures: dict = {}
+    in_flight = max(1, workers) * 2
+    submitted = done = 0
+
+    zf = zipfile.ZipFile(dest, "w", compression=zipfile.ZIP_STORED, allowZip64=True) if as_zip else None
+    if not as_zip:
+        os.makedirs(dest, exist_ok=True)
+
+    def check_cancel():
+        if cancel is not None and cancel.is_set():
+            raise ExportCancelled()
+
+    def write_one(row: dict, local: str):
+        name = safe_name(row)
+        if zf is not None:
+            # scanurile (jpg/pdf) sunt deja comprimate -> ZIP_STORED, fără CPU irosit
+            with open(local, "rb") as src, zf.open(name, "w", force_zip64=True) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        else:
+            shutil.copyfile(local, os.path.join(dest, name))
+        return name
+
+    def drain(block_until: int):
+        """Scrie fișierele terminate până rămân cel mult block_until descărcări în zbor."""
+        nonlocal done
+        while len(futures) > block_until:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                check_cancel()
+                row = futures.pop(fut)
+                try:
+                    local = fut.result()
+                    if not local:
+                        raise RuntimeError("descărcare eșuată")
+                    name = write_one(row, local)
+                    stats["ok"] += 1
+                    manifest.append({**row, "exportat_ca": name, "status": "ok"})
+                except Exception as e:
+                    stats["failed"] += 1
+                    manifest.append({**row, "exportat_ca": "", "status": f"eroare: {e}"})
+                done += 1
+                if on_progress:
+                    on_progress(done, max(total, submitted), row.get("denumire") or str(row.get("id")))
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="export")
+    try:
+        for row in rows:
+            check_cancel()
+            if not row.get("file"):
+                stats["skipped"] += 1
+                manifest.append({**row, "exportat_ca": "", "status": "fără fișier"})
+                continue
+            drain(in_flight - 1)
+            futures[pool.submit(fetch_file, row)] = row
+            submitted += 1
+        drain(0)
+    finally:
+        # la anulare: lucrările încă neîncepute nu mai pornesc
+        pool.shutdown(wait=True, cancel_futures=True)
+        manifest.sort(key=lambda r: int(r.get("id") or 0))
+        buf = io.StringIO()
+        w = csv.DictWriter(buf, fieldnames=MANIFEST_COLS, extrasaction="ignore")
+        w.writeheader()
+        w.writerows(manifest)
+        data = buf.getvalue().encode("utf-8-sig")   # BOM -> Excel citește diacriticele corect
+        if zf is not None:
+            zf.writestr("manifest.csv", data, compress_type=zipfile.ZIP_DEFLATED)
+            zf.close()
+        else:
+            with open(os.path.join(dest, "manifest.csv"), "wb") as f:
+                f.write(data)
+    return stats
@@ -0,0 +1,296 @@
+# cie_agent.py
+from __future__ import annotations
+import os, sys, time, queue, secrets, getpass, threading, subprocess
+from typing import Callable, Optional
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+from paths import user_data_dir
+
+FORWARD_TIMEOUT_SEC = 2.0     # cât așteaptă clientul confirmarea agentului
+SPAWN_WAIT_SEC = 10.0         # cât așteaptă clientul pornirea agentului (prima dată)
+PUMP_MS = 50                  # cât de des verifică Tk coada de cereri
+
+
+# --------------- adresă + autentificare ---------------
+
+def agent_address() -> tuple[str, str]:
+    """(adresă, familie): named pipe per utilizator pe Windows, socket Unix în rest."""
+    if os.name == "nt":
+        return rf"\\.\pipe\waitdocs-cie-{getpass.getuser()}", "AF_PIPE"
+    return os.path.join(user_data_dir(), "cie-agent.sock"), "AF_UNIX"
+
+
+def _authkey() -> bytes:
+    """Cheie HMAC aleatoare, în profilul utilizatorului: doar procesele lui vorbesc cu agentul."""
+    path = os.path.join(user_data_dir(), "cie-agent.key")
+    try:
+        with open(path, "rb") as f:
+            key = f.read()
+        if len(key) >= 32:
+            return key
+    except OSError:
+        pass
+    key = secrets.token_bytes(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+# --------------- client (cie_handler) ---------------
+
+def send(msg: dict, *, timeout: float = FORWARD_TIMEOUT_SEC):
+    """Trimite un mesaj agentului; întoarce răspunsul sau None dacă agentul nu rulează."""
+    address, family = agent_address()
+    try:
+        with Client(address, family=family, authkey=_authkey()) as conn:
+            conn.send(msg)
+            if conn.poll(timeout):
+                return conn.recv()
+    except (OSError, EOFError, AuthenticationError):
+        pass
+    return None
+
+
+def forward(url: str) -> bool:
+    """Predă URL-ul cie:// agentului rezident. False = agentul nu rulează."""
+    return send({"cmd": "url", "url": url}) == "ok"
+
+
+def spawn_agent() -> bool:
+    """Pornește agentul în fundal (același exe / script, cu --agent)."""
+    if getattr(sys, "frozen", False):
+        cmd = [sys.executable, "--agent"]
+    else:
+        cmd = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "cie_handler.py"), "--agent"]
+    kw = {"stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL,
+          "close_fds": True}
+    if os.name == "nt":
+        kw["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kw["start_new_session"] = True
+    try:
+        subprocess.Popen(cmd, **kw)
+        return True
+    except OSError:
+        return False
+
+
+def forward_or_spawn(url: str, wait: float = SPAWN_WAIT_SEC) -> bool:
+    """forward(); dacă agentul nu rulează, îl pornește și reîncearcă până la `wait` secunde."""
+    if forward(url):
+        return True
+    if not spawn_agent():
+        return False
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        if forward(url):
+            return True
+    return False
+
+
+# --------------- agent ---------------
+
+class _Job:
+    """O citire de card: din link cie:// (rezultat prin ret#...) sau din puntea HTTP (flux NDJSON)."""
+
+    __slots__ = ("nonce", "pin", "progress", "done")
+
+    def __init__(self, nonce: str, done: Callable[[Optional[dict], Optional[str]], None],
+                 progress: Callable[[str], None] | None = None, pin: str = ""):
+        self.nonce = nonce
+        self.pin = pin
+        self.progress = progress
+        self.done = done
+
+    def report(self, stage: str):
+        if self.progress:
+            try:
+                self.progress(stage)
+            except Exception:
+                pass
+
+
+class CieAgent:
+    """
+    Proces rezident pentru linkurile cie://:
+    - importurile (PyKCS11, cryptography, smartcard, tkinter), modulul PKCS#11 și
+      cititorul PC/SC rămân încărcate între cereri;
+    - un singur Tk ascuns: dialogul de PIN e un Toplevel, nu un Tk() nou la fiecare link;
+    - cererile vin pe named pipe / socket Unix (autentificate HMAC) sau din puntea HTTP
+      locală (cie_bridge) și se procesează pe rând; citirea cardului rulează pe un thread,
+      ca UI-ul să rămână responsiv.
+    """
+
+    def __init__(self):
+        self._jobs: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._busy = False
+        self._stopping = False
+        self.root = None
+        self._listener: Listener | None = None
+        self._handler = None
+        self._read_all = None
+        self._bridge = None
+
+    # --------------- public ---------------
+
+    def serve(self) -> int:
+        import tkinter as tk
+        import cie_handler                  # dialogul de PIN + întoarcerea rezultatului
+        from cie_reader_core import read_all
+        from cie_core_common import pkcs11_lib
+
+        self._handler = cie_handler
+        self._read_all = read_all
+        try:
+            self._listener = self._listen()
+        except OSError:
+            return 0   # rulează deja un agent (adresa e ocupată)
+        try:
+            pkcs11_lib()                    # încărcare DLL + C_Initialize acum, nu la primul card
+        except Exception:
+            pass
+        self._start_bridge()
+
+        self.root = tk.Tk()
+        self.root.withdraw()
+        threading.Thread(target=self._accept_loop, daemon=True, name="cie-agent").start()
+        self.root.after(PUMP_MS, self._pump)
+        try:
+            self.root.mainloop()
+        finally:
+            self._stopping = True
+            try:
+                self._listener.close()
+            except Exception:
+                pass
+            if self._bridge is not None:
+                self._bridge.stop()
+        return 0
+
+    def submit(self, nonce: str, on_progress: Callable[[str], None],
+               on_done: Callable[[Optional[dict], Optional[str]], None]):
+        """Citire cerută din puntea HTTP (orice thread)."""
+        self._jobs.put(_Job(nonce, on_done, on_progress))
+
+    # --------------- intern ---------------
+
+    def _start_bridge(self):
+        from config import CIE_BRIDGE_PORT, CIE_BRIDGE_ORIGINS
+        if not CIE_BRIDGE_PORT:
+            return
+        from cie_bridge import CieBridge
+        try:
+            self._bridge = CieBridge(self.submit, port=CIE_BRIDGE_PORT, origins=CIE_BRIDGE_ORIGINS)
+            self._bridge.start()
+        except OSError as e:
+            self._bridge = None
+            print(f"Puntea HTTP nu a pornit pe portul {CIE_BRIDGE_PORT}: {e}")
+
+    def _url_job(self, url: str) -> Optional[_Job]:
+        h = self._handler
+        p = h.parse_cie_url(url)
+        problem = h.check_request(p)
+        if problem:
+            print(problem)
+            return None
+        if p["cmd"] == "start":
+            return None   # agentul rulează deja; nimic de citit
+        return _Job(p["nonce"], lambda data, err: h.open_return_url(p["ret"], p["nonce"], data, err),
+                    pin=p["pin"].strip())
+
+    def _listen(self) -> Listener:
+        address, family = agent_address()
+        if family == "AF_UNIX" and os.path.exists(address):
+            if send({"cmd": "ping"}, timeout=0.5) == "pong":
+                raise OSError("agentul rulează deja")
+            os.remove(address)   # socket rămas de la un agent oprit brusc
+        return Listener(address, family=family, authkey=_authkey())
+
+    def _accept_loop(self):
+        while not self._stopping:
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                if self._stopping:
+                    return
+                continue
+            threading.Thread(target=self._serve_conn, args=(conn,), daemon=True).start()
+
+    def _serve_conn(self, conn):
+        with conn:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                return
+            cmd = msg.get("cmd") if isinstance(msg, dict) else None
+            if cmd == "ping":
+                conn.send("pong")
+            elif cmd == "url":
+                job = self._url_job(str(msg.get("url") or ""))
+                if job is not None:
+                    self._jobs.put(job)
+                conn.send("ok")
+            elif cmd == "stop":
+                self._jobs.put(None)
+                conn.send("ok")
+            else:
+                conn.send("unknown")
+
+    def _pump(self):
+        """Pe thread-ul Tk: ia următoarea cerere doar când cea curentă s-a terminat."""
+        if not self._busy:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                job = False
+            if job is None:
+                self.root.quit()
+                return
+            if job:
+                self._busy = True
+                try:
+                    self._start(job)
+                except Exception as e:
+                    self._finish(job, None, f"Eroare: {e}")
+        self.root.after(PUMP_MS, self._pump)
+
+    def _start(self, job: _Job):
+        pin = job.pin
+        if not pin:
+            job.report("pin")
+            pin = self._handler.prompt_pin("", master=self.root)
+        if not pin:
+            self._finish(job, None, "Operațiune anulată sau PIN gol.")
+            return
+        job.report("reading")
+
+        def worker():
+            data, err = None, None
+            try:
+                data = self._read_all(pin)
+            except Exception as e:
+                err = f"Eroare la citire: {e}"
+            self.root.after(0, lambda: self._finish(job, data, err))
+
+        threading.Thread(target=worker, daemon=True, name="cie-read").start()
+
+    def _finish(self, job: _Job, data, err):
+        try:
+            job.done(data, err)
+        except Exception as e:
+            print(f"Rezultatul nu a putut fi trimis: {e}")
+        finally:
+            self._busy = False
+
+
+def run_agent() -> int:
+    return CieAgent().serve()
+
+
+def stop_agent() -> bool:
+    return send({"cmd": "stop"}) == "ok"
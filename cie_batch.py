@@ -0,0 +1,201 @@
+# cie_batch.py
+from __future__ import annotations
+import re, time, threading, unicodedata
+from typing import Any, Callable
+
+from doc_model import DateRecord
+
+# evenimente trimise către UI prin on_event(kind, info)
+EV_READING = "reading"        # card introdus, citirea a început
+EV_MATCHED = "matched"        # un singur document potrivit -> se pune în coada de salvare
+EV_AMBIGUOUS = "ambiguous"    # mai multe documente posibile -> decide operatorul
+EV_UNMATCHED = "unmatched"    # niciun document în așteptare pentru titular
+EV_ERROR = "error"            # citire eșuată
+EV_REMOVED = "removed"        # card scos
+
+_WORD = re.compile(r"[A-Z]{2,}")
+
+
+def name_tokens(*parts: Any) -> frozenset[str]:
+    """Cuvintele dintr-un nume, fără diacritice, cu majuscule ('popescu.ion' -> {POPESCU, ION})."""
+    text = " ".join(str(p) for p in parts if p)
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").upper()
+    return frozenset(_WORD.findall(text))
+
+
+class DocMatcher:
+    """
+    Index local al documentelor în așteptare pentru potrivirea cu un card citit:
+    - după CNP (din câmpul 'date' al record-urilor deja încărcate) – exact;
+    - după nume: toate cuvintele din numele de familie + cel puțin un prenume
+      se regăsesc în angajat / denumire / date.nume+prenume.
+    """
+
+    def __init__(self):
+        self._rows: dict[str, dict] = {}
+        self._tokens: dict[str, frozenset[str]] = {}
+        self._by_cnp: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, row: dict, record: dict | None = None):
+        key = str(row.get("id"))
+        nume = prenume = cnp = ""
+        if record:
+            d = DateRecord.from_server(record.get("date"))
+            nume, prenume, cnp = d.nume, d.prenume, "".join(ch for ch in d.cnp if ch.isdigit())
+        with self._lock:
+            self._rows[key] = row
+            self._tokens[key] = name_tokens(row.get("angajat"), row.get("denumire"), nume, prenume)
+            if len(cnp) == 13:
+                self._by_cnp.setdefault(cnp, set()).add(key)
+
+    def discard(self, doc_id: Any):
+        key = str(doc_id)
+        with self._lock:
+            self._rows.pop(key, None)
+            self._tokens.pop(key, None)
+            for ids in self._by_cnp.values():
+                ids.discard(key)
+
+    def match(self, cnp: str, surname: str, given: str) -> tuple[list[dict], str]:
+        """(candidați, criteriu) – criteriu 'cnp' / 'nume' / ''."""
+        cnp = "".join(ch for ch in (cnp or "") if ch.isdigit())
+        with self._lock:
+            ids = self._by_cnp.get(cnp) if cnp else None
+            if ids:
+                return [self._rows[k] for k in sorted(ids, key=_id_key) if k in self._rows], "cnp"
+            fam, pre = name_tokens(surname), name_tokens(given)
+            if not fam:
+                return [], ""
+            hits = [k for k, toks in self._tokens.items()
+                    if fam <= toks and (not pre or pre & toks)]
+            return [self._rows[k] for k in sorted(hits, key=_id_key)], "nume" if hits else ""
+
+
+class BatchIntake:
+    """
+    Sesiune de citire continuă: fiecare card introdus în cititor e citit o singură dată,
+    mapat (map_raw) și potrivit cu documentele din DocMatcher, fără dialoguri per card.
+    - read_card() -> dict brut (ex: read_all fără PIN), rulat pe un thread separat;
+    - on_event(kind, info) vine din thread-uri worker (UI-ul trebuie să treacă prin after()).
+    Detecția cardului: pyscard CardMonitor (evenimente introdus / scos, după ATR).
+    Citirile se fac pe rând: un card introdus cât timp altul se citește așteaptă; un card
+    scos înainte să-i vină rândul nu mai e citit.
+    """
+
+    def __init__(self, read_card: Callable[[], dict], map_raw: Callable[[dict], dict],
+                 matcher: DocMatcher, on_event: Callable[[str, dict], None]):
+        self.read_card = read_card
+        self.map_raw = map_raw
+        self.matcher = matcher
+        self.on_event = on_event
+        self._monitor = None
+        self._observer = None
+        self._busy = threading.Lock()   # un singur cititor -> o singură citire odată
+        self._stopped = threading.Event()
+        self._state = threading.Lock()
+        self._present: dict[str, int] = {}   # ATR -> introducerea curentă (până la scoatere)
+        self._seq = 0
+
+    # --------------- public ---------------
+
+    def start(self):
+        from smartcard.CardMonitoring import CardMonitor, CardObserver
+
+        intake = self
+
+        class _Observer(CardObserver):
+            def update(self, observable, actions):
+                added, removed = actions
+                for card in removed:
+                    intake._on_removed(_atr_hex(card))
+                for card in added:
+                    intake._on_inserted(_atr_hex(card))
+
+        self._stopped.clear()
+        self._monitor = CardMonitor()
+        self._observer = _Observer()
+        self._monitor.addObserver(self._observer)   # raportează imediat și cardul deja introdus
+
+    def stop(self):
+        self._stopped.set()
+        try:
+            if self._monitor is not None and self._observer is not None:
+                self._monitor.deleteObserver(self._observer)
+        except Exception:
+            pass
+        self._monitor = self._observer = None
+
+    # --------------- intern ---------------
+
+    def _emit(self, kind: str, info: dict):
+        if self._stopped.is_set():
+            return
+        try:
+            self.on_event(kind, info)
+        except Exception:
+            pass
+
+    def _on_inserted(self, atr: str):
+        with self._state:
+            if atr in self._present:
+                return   # CardMonitor a raportat din nou un card încă introdus
+            self._seq += 1
+            token = self._present[atr] = self._seq
+        threading.Thread(target=self._process, args=(atr, token), daemon=True, name="cie-batch").start()
+
+    def _on_removed(self, atr: str):
+        with self._state:
+            self._present.pop(atr, None)
+        self._emit(EV_REMOVED, {"atr": atr})
+
+    def _process(self, atr: str, token: int):
+        # cardurile introduse în timpul unei citiri lente își așteaptă rândul
+        while not self._busy.acquire(timeout=0.5):
+            if self._stopped.is_set():
+                return
+        t0 = time.perf_counter()
+        try:
+            with self._state:
+                current = self._present.get(atr) == token
+            if not current or self._stopped.is_set():
+                return   # scos (sau înlocuit) înainte să-i vină rândul
+            self._emit(EV_READING, {"atr": atr})
+            try:
+                mapped = self.map_raw(self.read_card())
+            except Exception as e:
+                self._emit(EV_ERROR, {"atr": atr, "error": e, "seconds": time.perf_counter() - t0})
+                return
+            d = mapped.get("date_payload") or {}
+            candidates, how = self.matcher.match(d.get("cnp"), d.get("nume"), d.get("prenume"))
+            info = {
+                "atr": atr,
+                "mapped": mapped,
+                "name": f"{d.get('nume', '')} {d.get('prenume', '')}".strip(),
+                "candidates": candidates,
+                "by": how,
+                "seconds": time.perf_counter() - t0,
+            }
+            if len(candidates) == 1:
+                self.matcher.discard(candidates[0].get("id"))   # nu-l mai potrivim a doua oară
+                self._emit(EV_MATCHED, info)
+            elif candidates:
+                self._emit(EV_AMBIGUOUS, info)
+            else:
+                self._emit(EV_UNMATCHED, info)
+        finally:
+            self._busy.release()
+
+
+def _atr_hex(card) -> str:
+    try:
+        return "".join(f"{b:02X}" for b in card.atr)
+    except Exception:
+        return ""
+
+
+def _id_key(key: str):
+    return (0, int(key)) if key.isdigit() else (1, key)
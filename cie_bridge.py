@@ -0,0 +1,198 @@
+# cie_bridge.py
+from __future__ import annotations
+import json, time, queue, secrets, threading, urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterable, Optional
+
+NONCE_TTL_SEC = 120          # cât e valabil un nonce emis de /v1/nonce
+READ_TIMEOUT_SEC = 300       # cât așteaptă o cerere /v1/read (include introducerea PIN-ului)
+MAX_BODY = 4096
+BRIDGE_VERSION = 1
+
+# submit(nonce, on_progress(stage), on_done(data, error)) -> pune citirea în coada agentului
+Submit = Callable[[str, Callable[[str], None], Callable[[Optional[dict], Optional[str]], None]], None]
+
+
+def _origin(url: str) -> str:
+    u = urllib.parse.urlparse(url)
+    return f"{u.scheme}://{u.netloc}".lower() if u.scheme and u.netloc else url.rstrip("/").lower()
+
+
+class CieBridge:
+    """
+    Punte HTTP pe 127.0.0.1 pentru pagina web, în locul redirect-ului cie:// -> ret#payload:
+    - POST /v1/nonce            -> {"nonce": "..."} (de unică folosință, expiră în NONCE_TTL_SEC);
+    - POST /v1/read {"nonce"}   -> flux NDJSON (fetch + ReadableStream), câte un eveniment pe linie:
+        {"event": "progress", "stage": "queued" | "pin" | "reading"}
+        {"event": "result", "nonce": "...", "data": {...}}   sau   {"event": "error", ...};
+    - GET  /v1/hello            -> {"ok": true, "version": 1}.
+    Verificări: Host = localhost (anti DNS-rebinding), Origin în lista permisă (CORS),
+    nonce emis de agent și nefolosit. PIN-ul se cere tot în dialogul agentului, nu trece prin HTTP.
+    """
+
+    def __init__(self, submit: Submit, *, port: int, origins: Iterable[str], host: str = "127.0.0.1"):
+        self.submit = submit
+        self.host = host
+        self.port = port
+        self.origins = frozenset(_origin(o) for o in origins)
+        self._nonces: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    # --------------- public ---------------
+
+    def start(self):
+        bridge = self
+
+        class Handler(_BridgeHandler):
+            pass
+
+        Handler.bridge = bridge
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="cie-bridge").start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def issue_nonce(self) -> str:
+        nonce = secrets.token_urlsafe(24)
+        now = time.monotonic()
+        with self._lock:
+            # curățăm nonce-urile expirate (pagina poate cere multe într-o sesiune)
+            for n in [n for n, exp in self._nonces.items() if exp < now]:
+                del self._nonces[n]
+            self._nonces[nonce] = now + NONCE_TTL_SEC
+        return nonce
+
+    def consume_nonce(self, nonce: str) -> bool:
+        with self._lock:
+            exp = self._nonces.pop(nonce, None)
+        return exp is not None and exp >= time.monotonic()
+
+    def origin_allowed(self, origin: str | None) -> bool:
+        return bool(origin) and _origin(origin) in self.origins
+
+    def host_allowed(self, host: str | None) -> bool:
+        name = (host or "").rsplit(":", 1)[0].strip("[]").lower()
+        return name in ("127.0.0.1", "localhost", "::1")
+
+
+class _BridgeHandler(BaseHTTPRequestHandler):
+    bridge: CieBridge
+    server_version = "WaitDocsCIE/1"
+
+    def log_message(self, fmt, *args):
+        pass   # fără jurnal în consolă pentru fiecare cerere
+
+    # --------------- rute ---------------
+
+    def do_OPTIONS(self):
+        if not self._check():
+            return
+        self.send_response(204)
+        self._cors()
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.send_header("Access-Control-Max-Age", "600")
+        # Chrome (Private Network Access): pagină publică -> localhost
+        if self.headers.get("Access-Control-Request-Private-Network"):
+            self.send_header("Access-Control-Allow-Private-Network", "true")
+        self.end_headers()
+
+    def do_GET(self):
+        if not self._check():
+            return
+        if self.path.split("?")[0] == "/v1/hello":
+            self._json(200, {"ok": True, "version": BRIDGE_VERSION})
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self._check():
+            return
+        route = self.path.split("?")[0]
+        if route == "/v1/nonce":
+            self._json(200, {"nonce": self.bridge.issue_nonce()})
+        elif route == "/v1/read":
+            self._read()
+        else:
+            self._json(404, {"error": "not found"})
+
+    # --------------- intern ---------------
+
+    def _check(self) -> bool:
+        if not self.bridge.host_allowed(self.headers.get("Host")):
+            self._json(421, {"error": "host"}, cors=False)
+            return False
+        if not self.bridge.origin_allowed(self.headers.get("Origin")):
+            self._json(403, {"error": "origin"}, cors=False)
+            return False
+        return True
+
+    def _cors(self):
+        self.send_header("Access-Control-Allow-Origin", self.headers.get("Origin"))
+        self.send_header("Vary", "Origin")
+
+    def _json(self, status: int, obj: Any, cors: bool = True):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        if cors:
+            self._cors()
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_BODY:
+            return {}
+        try:
+            obj = json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+        return obj if isinstance(obj, dict) else {}
+
+    def _read(self):
+        nonce = str(self._body().get("nonce") or "")
+        if not self.bridge.consume_nonce(nonce):
+            self._json(403, {"error": "nonce"})
+            return
+
+        events: "queue.Queue[dict]" = queue.Queue()
+
+        def on_progress(stage: str):
+            events.put({"event": "progress", "stage": stage})
+
+        def on_done(data: Optional[dict], error: Optional[str]):
+            if error:
+                events.put({"event": "error", "nonce": nonce, "error": error})
+            else:
+                events.put({"event": "result", "nonce": nonce, "data": data})
+
+        self.send_response(200)
+        self._cors()
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()   # HTTP/1.0: corpul se termină la închiderea conexiunii
+
+        on_progress("queued")
+        self.bridge.submit(nonce, on_progress, on_done)
+        deadline = time.monotonic() + READ_TIMEOUT_SEC
+        while True:
+            try:
+                ev = events.get(timeout=max(0.1, deadline - time.monotonic()))
+            except queue.Empty:
+                ev = {"event": "error", "nonce": nonce, "error": "timeout"}
+            try:
+                self.wfile.write(json.dumps(ev, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+                self.wfile.flush()
+            except OSError:
+                return   # pagina a închis conexiunea; citirea din agent se termină oricum
+            if ev["event"] != "progress":
+                return
@@ -384,14 +384,26 @@ def parse_ef0104(raw: bytes):
     }
 
 # =================== PC/SC APDU ===================
+_READER = None   # cititorul găsit la prima citire (agentul nu mai enumeră la fiecare card)
+
+
 def connect_pcsc():
-    rlist = readers()
-    if not rlist:
-        raise RuntimeError("Nu am găsit niciun cititor PC/SC.")
-    print(f"Cititor: {rlist[0]}")
-    conn = rlist[0].createConnection()
-    conn.connect()
-    return conn
+    global _READER
+    for attempt in range(2):
+        if _READER is None:
+            rlist = readers()
+            if not rlist:
+                raise RuntimeError("Nu am găsit niciun cititor PC/SC.")
+            _READER = rlist[0]
+            print(f"Cititor: {_READER}")
+        try:
+            conn = _READER.createConnection()
+            conn.connect()
+            return conn
+        except Exception:
+            _READER = None   # cititor scos / schimbat -> reenumerăm o dată
+            if attempt:
+                raise
 
 def tx(conn, apdu, label):
     data, sw1, sw2 = conn.transmit(apdu)
@@ -432,13 +444,24 @@ def read_ef(conn, fid: int):
     return None
 
 # =================== PKCS#11 (certificat) ===================
-def read_identity_cert_via_pkcs11(pin: str):
-    if not Path(MODULE).exists():
-        raise FileNotFoundError(f"Nu găsesc DLL PKCS#11 la: {MODULE}")
-    add_dll_dir(DLL_DIR)
+_PKCS11_LIB = None
 
-    lib = PyKCS11Lib()
-    lib.load(MODULE)
+
+def pkcs11_lib():
+    """Modulul PKCS#11 încărcat o singură dată per proces (agentul CIE îl ține cald)."""
+    global _PKCS11_LIB
+    if _PKCS11_LIB is None:
+        if not Path(MODULE).exists():
+            raise FileNotFoundError(f"Nu găsesc DLL PKCS#11 la: {MODULE}")
+        add_dll_dir(DLL_DIR)
+        lib = PyKCS11Lib()
+        lib.load(MODULE)
+        _PKCS11_LIB = lib
+    return _PKCS11_LIB
+
+
+def read_identity_cert_via_pkcs11(pin: str):
+    lib = pkcs11_lib()
     slots = lib.getSlotList(tokenPresent=True)
     if not slots:
         raise RuntimeError("Nu s-a detectat cardul.")
@@ -1,14 +1,15 @@
 # cie_handler.py — prompt minimal Tkinter doar pentru PIN, apoi continuă rularea
-import sys, json, urllib.parse, webbrowser
-import tkinter as tk
-from tkinter import ttk, messagebox
-from cie_reader_core import read_all
+# Lansat de OS pentru fiecare link cie://: predă URL-ul agentului rezident (cie_agent)
+# și iese imediat. Importurile grele (tkinter, PyKCS11, smartcard) se fac doar în agent
+# sau în modul de rezervă, când agentul nu poate fi pornit.
+import sys, json, urllib.parse
 
 # ---------- util: parsing & return ----------
 def parse_cie_url(arg: str):
     """
     Ex: cie://read?ret=https%3A%2F%2Fsite.tau%2Fcie%2Freturn&nonce=abc123
     (opțional pt. test: &pin=1234 — NU folosi pin în URL în producție)
+    cie://start pornește doar agentul (pentru puntea HTTP locală, vezi cie_bridge).
     """
     u = urllib.parse.urlparse(arg)
     qs = urllib.parse.parse_qs(u.query)
@@ -29,6 +30,16 @@ def b64url_encode_utf8(obj) -> str:
     out = base64.urlsafe_b64encode(b).decode("ascii")
     return out.rstrip("=")
 
+def check_request(p: dict) -> str | None:
+    """Mesajul de eroare pentru o cerere invalidă, sau None."""
+    if p["cmd"] == "start":
+        return None   # doar pornește agentul (pagina folosește apoi puntea HTTP)
+    if p["cmd"] not in ("read", "read_all"):
+        return f"Comandă necunoscută: {p['cmd']}"
+    if not p["nonce"]:
+        return "Lipsește nonce."
+    return None
+
 def is_safe_return_url(ret: str) -> bool:
     try:
         u = urllib.parse.urlparse(ret)
@@ -44,6 +55,7 @@ def open_return_url(ret: str, nonce: str, payload: dict | None, error: str | Non
     if not ret or not is_safe_return_url(ret):
         blob = json.dumps({"nonce": nonce, "data": payload, "error": error}, ensure_ascii=False, indent=2)
         try:
+            from tkinter import messagebox
             messagebox.showinfo("Rezultat CIE", blob)
         except Exception:
             pass
@@ -61,15 +73,21 @@ def open_return_url(ret: str, nonce: str, payload: dict | None, error: str | Non
         ret = ret.split("#", 1)[0]
     url = f"{ret}#{fragment}"
     try:
+        import webbrowser
         # NU mai ridica fereastra: new=0, autoraise=False
         webbrowser.open(url, new=0, autoraise=False)
     except Exception:
         print(url)
 
 # ---------- UI minimală pentru PIN ----------
-def prompt_pin(default_pin: str = "") -> str | None:
-    """Afișează un dialog simplu pentru PIN. Returnează PIN sau None dacă se anulează."""
-    root = tk.Tk()
+def prompt_pin(default_pin: str = "", master=None) -> str | None:
+    """
+    Afișează un dialog simplu pentru PIN. Returnează PIN sau None dacă se anulează.
+    Cu master (Tk-ul ascuns al agentului) dialogul e un Toplevel; altfel un Tk() propriu.
+    """
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+    root = tk.Toplevel(master) if master is not None else tk.Tk()
     root.title("CIE PIN")
     root.resizable(False, False)
     root.geometry("320x140")
@@ -106,7 +124,7 @@ def prompt_pin(default_pin: str = "") -> str | None:
     def on_ok():
         p = (pin_var.get() or "").strip()
         if not p:
-            messagebox.showwarning("PIN lipsă", "Introduceți PIN-ul.")
+            messagebox.showwarning("PIN lipsă", "Introduceți PIN-ul.", parent=root)
             return
         result["pin"] = p
         root.destroy()
@@ -128,24 +146,56 @@ def prompt_pin(default_pin: str = "") -> str | None:
     y = (root.winfo_screenheight() - h) // 2
     root.geometry(f"{w}x{h}+{x}+{y}")
 
-    root.mainloop()
+    if master is not None:
+        # agentul e în fundal: dialogul trebuie adus în față explicit
+        root.attributes("-topmost", True)
+        root.lift()
+        root.focus_force()
+        root.grab_set()
+        root.wait_window()
+    else:
+        root.mainloop()
     return result["pin"]
 
 # ---------- entry point ----------
 def main():
+    # build_exe.py: costul pornirii exe-ului, fără cititor / rețea
+    if "--startup-probe" in sys.argv[1:]:
+        import cie_agent                          # calea unui link cie:// (client subțire)
+        sys.exit(0)
+    if "--startup-probe-agent" in sys.argv[1:]:
+        import tkinter, cie_agent, cie_bridge     # ce încarcă agentul la pornire
+        from cie_reader_core import read_all
+        sys.exit(0)
+    if "--agent" in sys.argv[1:]:
+        from cie_agent import run_agent
+        sys.exit(run_agent())
+    if "--stop-agent" in sys.argv[1:]:
+        from cie_agent import stop_agent
+        sys.exit(0 if stop_agent() else 1)
+
     if len(sys.argv) < 2 or not sys.argv[1].startswith("cie://"):
         print("Se așteaptă URL de forma: cie://read?ret=<url_encoded>&nonce=<id>")
         sys.exit(2)
 
     p = parse_cie_url(sys.argv[1])
-
-    if p["cmd"] not in ("read", "read_all"):
-        print(f"Comandă necunoscută: {p['cmd']}")
-        sys.exit(2)
-    if not p["nonce"]:
-        print("Lipsește nonce.")
+    problem = check_request(p)
+    if problem:
+        print(problem)
         sys.exit(2)
 
+    # 0) agentul rezident (pornit acum dacă nu rula) face citirea -> ieșim imediat
+    if "--no-agent" not in sys.argv[2:]:
+        from cie_agent import forward_or_spawn
+        if forward_or_spawn(sys.argv[1]):
+            return
+
+    if p["cmd"] == "start":
+        sys.exit(1)   # agentul nu a putut fi pornit
+
+    # rezervă: citire în acest proces, ca înainte
+    from cie_reader_core import read_all
+
     # 1) cere PIN în UI (dacă nu a venit doar pentru test)
     pin = p["pin"].strip() if p["pin"] else prompt_pin("")
     if not pin:
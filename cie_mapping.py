@@ -0,0 +1,203 @@
+# cie_mapping.py
+from __future__ import annotations
+import re
+from functools import lru_cache
+from typing import Any, Callable, Iterable
+
+# Maparea unică read_all() -> câmpurile formularului + payload-ul 'date'.
+# Folosită de EditDialog (scanare), de preluarea în lot și de cie_integration.
+
+# --------------- validatori / convertori (compilați o singură dată) ---------------
+
+_RE_DMY = re.compile(r"\s*(\d{2})[.\-/](\d{2})[.\-/](\d{4})\s*")
+_RE_ISO = re.compile(r"\s*(\d{4})-(\d{2})-(\d{2})")
+_RE_ISO_FULL = re.compile(r"\s*(\d{4})-(\d{2})-(\d{2})\s*")
+_RE_DOC_NO = re.compile(r"\s*([A-Za-z]{1,3})?\s*([0-9]{3,})\s*")
+_RE_NON_DIGIT = re.compile(r"\D+")
+_RE_NON_ALPHA = re.compile(r"[^A-Za-z]+")
+
+_SEX = {"M": "H", "F": "F"}
+# prima cifră din CNP -> (secol, sex)
+_CNP_S = {
+    "1": (1900, "H"), "2": (1900, "F"),
+    "3": (1800, "H"), "4": (1800, "F"),
+    "5": (2000, "H"), "6": (2000, "F"),
+    "7": (2000, "H"), "8": (2000, "F"),
+    "9": (2000, ""),
+}
+_NO_PARTS = ("", "", "")
+_DATE_SEP = frozenset(".-/")
+
+
+def only_digits(s: Any) -> str:
+    return _RE_NON_DIGIT.sub("", s) if isinstance(s, str) else _RE_NON_DIGIT.sub("", str(s or ""))
+
+
+def dmy_parts(dmy: Any) -> tuple[str, str, str]:
+    """DD.MM.YYYY (sau deja YYYY-MM-DD) -> (YYYY, MM, DD); ("", "", "") dacă nu se potrivește."""
+    if not dmy or not isinstance(dmy, str):
+        return _NO_PARTS
+    # cazul obișnuit (format_date_dmy): exact DD.MM.YYYY -> fără regex
+    if len(dmy) == 10 and dmy[2] in _DATE_SEP and dmy[5] in _DATE_SEP \
+            and dmy[:2].isdigit() and dmy[3:5].isdigit() and dmy[6:].isdigit():
+        return dmy[6:], dmy[3:5], dmy[:2]
+    m = _RE_DMY.fullmatch(dmy)
+    if m:
+        return m[3], m[2], m[1]
+    m = _RE_ISO_FULL.fullmatch(dmy)
+    return (m[1], m[2], m[3]) if m else _NO_PARTS
+
+
+def dmy_to_iso(dmy: Any) -> str | None:
+    """DD.MM.YYYY -> YYYY-MM-DD (sau valoarea originală dacă formatul nu se potrivește)."""
+    if not dmy:
+        return None
+    m = _RE_DMY.fullmatch(str(dmy))
+    return f"{m[3]}-{m[2]}-{m[1]}" if m else dmy
+
+
+def iso_to_dmy(iso: Any) -> str:
+    """YYYY-MM-DD -> DD.MM.YYYY (sigur)."""
+    if not iso:
+        return ""
+    m = _RE_ISO.match(str(iso))
+    return f"{m[3]}.{m[2]}.{m[1]}" if m else str(iso)
+
+
+def split_series_number(doc_number: Any) -> tuple[str, str]:
+    """VN1007098 -> ('VN','1007098'); 'VN 1007098' -> idem; '123456' -> ('','123456')."""
+    if not doc_number:
+        return "", ""
+    doc_number = str(doc_number)
+    m = _RE_DOC_NO.fullmatch(doc_number)
+    if m:
+        return (m[1] or "").upper(), m[2]
+    return _RE_NON_ALPHA.sub("", doc_number).upper(), only_digits(doc_number)
+
+
+def birth_from_cnp(cnp: Any) -> tuple[str, str, str, str]:
+    """Din CNP -> (sex H/F, YYYY, MM, DD) sau gol."""
+    cnp = only_digits(cnp)
+    if len(cnp) != 13:
+        return "", "", "", ""
+    century, sex = _CNP_S.get(cnp[0], (2000, ""))
+    return sex, str(century + int(cnp[1:3])), cnp[3:5], cnp[5:7]
+
+
+# --------------- schema (declarativă) ---------------
+
+def _text(v: Any) -> str:
+    return v.strip() if isinstance(v, str) else ("" if v is None else str(v).strip())
+
+
+def _upper(v: Any) -> str:
+    return _text(v).upper()
+
+
+# cheile text din read_all, în ordinea în care le despachetează map_raw
+_DIRECT = (
+    "surname",
+    "givenName",
+    "personal_identification_number",
+    "sex",
+    "birthdate",
+    "issuer",
+    "document_number",
+    "issuing_date",
+    "expiration_date",
+)
+
+# adresă: câmp din 'date' -> (convertor, surse în ordinea preferinței)
+_ADDRESS = (
+    ("judet", _upper, (("domiciliu_struct", "judet"), ("domicile", "county"))),
+    ("localitatea", _upper, (("domiciliu_struct", "localitate"), ("domicile", "locality"))),
+    # preferă 'rest' (structurat); dacă lipsește, 'street' sau 'text'
+    ("adresa2", _text, (("domiciliu_struct", "rest"), ("domicile", "street"), ("domicile", "text"))),
+)
+
+
+def _first(raw: dict, sources) -> Any:
+    for group, key in sources:
+        g = raw.get(group)
+        if g:
+            v = g.get(key)
+            if v:
+                return v
+    return ""
+
+
+# --------------- public ---------------
+
+def map_raw(raw: dict) -> dict:
+    """
+    read_all() -> {emis, expira(DMY), serie, numar, data(DMY), observatii,
+                   date_payload: {... schema 'date' ...}}
+    """
+    return _map(raw, dmy_parts, split_series_number)
+
+
+def map_many(raws: Iterable[dict]) -> list[dict]:
+    """
+    map_raw pe un lot de citiri (preluare în lot, import, benchmark), cu același rezultat.
+    Conversiile de dată și de serie/număr sunt memoizate pe durata lotului: cardurile
+    aceluiași ghișeu repetă datele de emitere / expirare și formatele numărului.
+    """
+    dmy = lru_cache(maxsize=None)(dmy_parts)
+    series = lru_cache(maxsize=None)(split_series_number)
+    return [_map(raw, dmy, series) for raw in raws]
+
+
+# --------------- intern ---------------
+
+def _map(raw: dict, dmy: Callable[[Any], tuple[str, str, str]],
+         series: Callable[[Any], tuple[str, str]]) -> dict:
+    if not isinstance(raw, dict):
+        raw = {}
+    get = raw.get
+    surname, given, cnp, sex_raw, birth, issuer, doc_no, issued, expires = [
+        v.strip() if v.__class__ is str else _text(v) for v in map(get, _DIRECT)]
+
+    # CNP / sex / naștere (fallback din CNP)
+    sex = _SEX.get(sex_raw.upper(), "")
+    an, luna, zi = dmy(birth)
+    if not an:
+        sex_cnp, an, luna, zi = birth_from_cnp(cnp)
+        sex = sex or sex_cnp
+
+    # document
+    serie, numar = series(doc_no)
+    iss_y, iss_m, iss_d = dmy(issued)
+    ex_y, ex_m, ex_d = dmy(expires)
+
+    name_line = f"{surname} {given}".strip()
+    date_payload = {
+        "nume": surname,
+        "prenume": given,
+        "cnp": cnp,
+        "sex": sex,        # 'H' / 'F'
+        "an": an,
+        "luna": luna,
+        "zi": zi,
+        "ci": {
+            "seria": serie,
+            "numarul": numar,
+            "id": f"{serie}{numar}",
+            "an_ex": ex_y,
+            "luna_ex": ex_m,
+            "zi_ex": ex_d,
+            "data_emiterii": f"{iss_y}-{iss_m}-{iss_d}" if iss_y else "",   # ISO
+            "eliberat": issuer,
+        },
+    }
+    for field, conv, sources in _ADDRESS:
+        date_payload[field] = conv(_first(raw, sources))
+
+    return {
+        "emis": issuer,
+        "expira": expires,
+        "serie": serie,
+        "numar": numar,
+        "data": issued,
+        "observatii": f"Nume: {name_line}" if name_line else "",
+        "date_payload": date_payload,
+    }
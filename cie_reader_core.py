@@ -4,23 +4,38 @@ from cie_core_common import (
     parse_ef0101, parse_ef0102_or_addr, parse_ef0104,
     read_identity_cert_via_pkcs11
 )
+import metrics
 
-def read_all(pin: str) -> dict:
-    """Rulează citirea și întoarce dict-ul cu toate câmpurile."""
+def read_all(pin: str, with_certificate: bool = True) -> dict:
+    """
+    Rulează citirea și întoarce dict-ul cu toate câmpurile.
+    with_certificate=False sare peste PKCS#11 (lent; datele vin oricum din EF-uri).
+    Durate în metrici: cie.read_all (total), cie.cert (PKCS#11), cie.apdu (EF-uri).
+    """
+    with metrics.span("cie.read_all", cert=with_certificate):
+        return _read_all(pin, with_certificate)
+
+def _read_all(pin: str, with_certificate: bool) -> dict:
     # 1) certificat (opțional)
-    try:
-        identity_from_certificate = read_identity_cert_via_pkcs11(pin)
-    except Exception:
-        identity_from_certificate = None
+    identity_from_certificate = None
+    if with_certificate:
+        try:
+            with metrics.span("cie.cert"):
+                identity_from_certificate = read_identity_cert_via_pkcs11(pin)
+        except Exception:
+            identity_from_certificate = None
 
     # 2) APDU
+    apdu = metrics.span("cie.apdu")
     conn = connect_pcsc()
     try:
         if not select_aid_edata(conn):
             raise RuntimeError("SELECT AID EDATA a eșuat")
 
-        # e ok dacă verify pin eșuează (unele EF-uri se citesc și fără)
-        verify_pin(conn, pin, ref=0x03)
+        # e ok dacă verify pin eșuează (unele EF-uri se citesc și fără);
+        # fără PIN nu trimitem VERIFY deloc (nu consumăm încercări pe cardul altcuiva)
+        if pin:
+            verify_pin(conn, pin, ref=0x03)
 
         raw_0101 = read_ef(conn, 0x0101)
         raw_0104 = read_ef(conn, 0x0104)
@@ -37,6 +52,7 @@ def read_all(pin: str) -> dict:
             conn.disconnect()
         except Exception:
             pass
+        apdu.end()
 
     id1  = parse_ef0101(raw_0101 or b"")
     id4  = parse_ef0104(raw_0104 or b"")
@@ -14,3 +14,25 @@ if not MEDIA_URL.startswith("/"):
     MEDIA_URL = "/" + MEDIA_URL
 if not MEDIA_URL.endswith("/"):
     MEDIA_URL += "/"
+
+# importă în fundal PIL / stiva CIE după ce apare prima fereastră (primul preview / scan mai rapid)
+PREWARM_IMPORTS = os.getenv("WAITDOCS_PREWARM", "1").strip().lower() in ("1", "true", "yes")
+
+# metrici de performanță (durate per operație) în %APPDATA%/WaitDocs/metrics/metrics.jsonl
+METRICS_ENABLED = os.getenv("WAITDOCS_METRICS", "1").strip().lower() in ("1", "true", "yes")
+
+# detector de blocaje ale buclei Tk (raport: python metrics_view.py --stalls)
+UI_WATCHDOG = os.getenv("WAITDOCS_WATCHDOG", "1").strip().lower() in ("1", "true", "yes")
+STALL_THRESHOLD_MS = int(os.getenv("WAITDOCS_STALL_MS", "200"))
+
+# oglindă locală SQLite pentru lista de documente (filtrare/sortare fără server)
+LOCAL_MIRROR = os.getenv("WAITDOCS_LOCAL_MIRROR", "0").strip().lower() in ("1", "true", "yes")
+# la câte minute sync-ul oglinzii parcurge tot (șterge local ce a dispărut de pe server, preia editările)
+MIRROR_RECONCILE_MIN = float(os.getenv("WAITDOCS_MIRROR_RECONCILE_MIN", "15"))
+
+# punte HTTP locală a agentului CIE (pagina web -> fetch pe 127.0.0.1); 0 = dezactivată
+CIE_BRIDGE_PORT = int(os.getenv("CIE_BRIDGE_PORT", "47800") or 0)
+# originile (scheme://host[:port]) care pot folosi puntea; implicit originea API_BASE
+CIE_BRIDGE_ORIGINS = tuple(
+    o.strip().rstrip("/") for o in os.getenv("CIE_BRIDGE_ORIGINS", API_BASE).split(",") if o.strip()
+)
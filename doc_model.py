@@ -0,0 +1,154 @@
+# doc_model.py
+from __future__ import annotations
+import json
+from typing import Any, Optional
+
+# ordinea cheilor = ordinea din schema serverului (păstrată la serializare)
+CI_FIELDS = ("seria", "numarul", "id", "an_ex", "luna_ex", "zi_ex", "data_emiterii", "eliberat")
+DATE_FIELDS = ("nume", "prenume", "cnp", "sex", "an", "luna", "zi", "ci", "judet", "localitatea", "adresa2")
+
+
+def _s(v: Any) -> str:
+    return "" if v is None else str(v)
+
+
+class CIData:
+    """Blocul 'ci' din câmpul 'date' (act de identitate)."""
+
+    __slots__ = CI_FIELDS + ("_extra",)
+
+    def __init__(self, **kw):
+        for f in CI_FIELDS:
+            setattr(self, f, _s(kw.pop(f, "")))
+        self._extra = kw   # chei necunoscute -> păstrate, nu pierdem date de pe server
+
+    @classmethod
+    def from_dict(cls, d: Optional[dict]) -> "CIData":
+        return cls(**(d if isinstance(d, dict) else {}))
+
+    def to_dict(self) -> dict:
+        out = {f: getattr(self, f) for f in CI_FIELDS}
+        out.update(self._extra)
+        return out
+
+    def copy(self) -> "CIData":
+        c = CIData.__new__(CIData)
+        for f in CI_FIELDS:
+            setattr(c, f, getattr(self, f))
+        c._extra = dict(self._extra)
+        return c
+
+
+class DateRecord:
+    """
+    Modelul tipizat al câmpului 'date' din /waitdocument/ (pe server e un string JSON).
+    - from_server(): o singură decodare JSON (acceptă și dict deja decodat);
+    - to_server(): o singură encodare JSON, compactă;
+    - diff(): ce câmpuri s-au schimbat față de versiunea încărcată ("ci.seria": (vechi, nou)).
+    """
+
+    __slots__ = tuple(f for f in DATE_FIELDS) + ("_extra",)
+
+    def __init__(self, **kw):
+        for f in DATE_FIELDS:
+            if f == "ci":
+                self.ci = CIData.from_dict(kw.pop("ci", None))
+            else:
+                setattr(self, f, _s(kw.pop(f, "")))
+        self._extra = kw
+
+    # --------------- conversii ---------------
+
+    @classmethod
+    def from_dict(cls, d: Optional[dict]) -> "DateRecord":
+        return cls(**dict(d)) if isinstance(d, dict) else cls()
+
+    @classmethod
+    def from_server(cls, value: Any) -> "DateRecord":
+        if isinstance(value, (str, bytes)):
+            try:
+                value = json.loads(value or "{}")
+            except ValueError:
+                value = {}
+        return cls.from_dict(value)
+
+    def to_dict(self) -> dict:
+        out = {}
+        for f in DATE_FIELDS:
+            out[f] = self.ci.to_dict() if f == "ci" else getattr(self, f)
+        out.update(self._extra)
+        return out
+
+    def to_server(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+    def copy(self) -> "DateRecord":
+        c = DateRecord.__new__(DateRecord)
+        for f in DATE_FIELDS:
+            setattr(c, f, self.ci.copy() if f == "ci" else getattr(self, f))
+        c._extra = dict(self._extra)
+        return c
+
+    # --------------- comparație ---------------
+
+    def diff(self, other: Optional["DateRecord"]) -> dict[str, tuple[str, str]]:
+        """{cale: (valoare_veche, valoare_nouă)} pentru câmpurile schimbate față de other."""
+        base = other if other is not None else DateRecord()
+        changes = {}
+        for f in DATE_FIELDS:
+            if f == "ci":
+                for g in CI_FIELDS:
+                    old, new = getattr(base.ci, g), getattr(self.ci, g)
+                    if old != new:
+                        changes[f"ci.{g}"] = (old, new)
+            else:
+                old, new = getattr(base, f), getattr(self, f)
+                if old != new:
+                    changes[f] = (old, new)
+        return changes
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, DateRecord) and not self.diff(other) \
+            and self._extra == other._extra and self.ci._extra == other.ci._extra
+
+    def __repr__(self) -> str:
+        return f"DateRecord({self.to_dict()!r})"
+
+
+# --------------- salvare parțială ---------------
+
+# câmpurile top-level pe care le scrie EditDialog
+PAYLOAD_FIELDS = ("emis", "expira", "data", "nr", "observatii", "date")
+
+
+def _norm(v: Any) -> str:
+    return "" if v is None else str(v).strip()
+
+
+def payload_diff(loaded: Optional[dict], payload: dict, *,
+                 date: DateRecord, loaded_date: Optional[DateRecord]) -> Optional[dict]:
+    """
+    Doar câmpurile din payload care diferă de record-ul încărcat de pe server (+ 'id').
+    'date' e comparat semantic pe obiectele DateRecord deja construite de apelant
+    (date = ce se salvează, loaded_date = ce a venit de pe server), fără re-parsare JSON.
+    None = nu avem versiunea de pe server -> trebuie trimis payload-ul complet.
+    Un dict cu doar 'id' = nimic de salvat.
+    """
+    if not loaded:
+        return None
+    patch = {"id": payload.get("id")}
+    for f in PAYLOAD_FIELDS:
+        if f not in payload:
+            continue
+        if f == "date":
+            if date != loaded_date:
+                patch[f] = payload[f]
+        elif _norm(payload[f]) != _norm(loaded.get(f)):
+            patch[f] = payload[f]
+    if "version" in loaded:
+        patch["version"] = loaded["version"]   # precondiție în body, dacă serverul versionează
+    return patch
+
+
+def is_noop(patch: Optional[dict]) -> bool:
+    return patch is not None and not (set(patch) - {"id", "version"})
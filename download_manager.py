@@ -0,0 +1,243 @@
+# download_manager.py
+from __future__ import annotations
+import os, time, hashlib, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import requests
+import urllib3
+
+from previews import auth_headers
+
+MIN_CHUNK = 64 * 1024
+MAX_CHUNK = 4 * 1024 * 1024
+CHUNK_TARGET_SEC = 0.25    # cât ar trebui să dureze citirea unui chunk
+MAX_ATTEMPTS = 5           # reluări (cu Range) după conexiuni căzute
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+class DownloadJob:
+    """Un download în curs; on_progress(done, total) / on_done(path, err) vin din thread-ul worker."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.done_bytes = 0
+        self.total_bytes = 0
+        self.path: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        self._progress: list[Callable[[int, int], None]] = []
+        self._done: list[Callable[[Optional[str], Optional[BaseException]], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout: float | None = None) -> Optional[str]:
+        self._finished.wait(timeout)
+        return self.path
+
+    def subscribe(self, on_progress=None, on_done=None):
+        with self._lock:
+            if on_progress:
+                self._progress.append(on_progress)
+            if on_done and not self.finished:
+                self._done.append(on_done)
+                return
+        if on_done:
+            on_done(self.path, self.error)
+
+    # --------------- intern ---------------
+
+    def _report(self):
+        for cb in list(self._progress):
+            try:
+                cb(self.done_bytes, self.total_bytes)
+            except Exception:
+                pass
+
+    def _finish(self, path: Optional[str], error: Optional[BaseException]):
+        with self._lock:
+            self.path, self.error = path, error
+            self._finished.set()
+            callbacks = list(self._done)
+        for cb in callbacks:
+            try:
+                cb(path, error)
+            except Exception:
+                pass
+
+
+class DownloadManager:
+    """
+    Download-uri în background pentru Deschide / Descarcă:
+    - cel mult max_concurrent simultan (restul așteaptă în coadă);
+    - deduplicare: același URL în curs -> același DownloadJob;
+    - reluare cu HTTP Range (+ If-Range) după o conexiune căzută, din fișierul .part;
+    - chunk adaptiv (64 KiB .. 4 MiB) după viteza observată;
+    - progres + anulare; rezultatul ajunge în FileCache (revalidare condiționată inclusă).
+    """
+
+    def __init__(self, api, files, *, max_concurrent: int = 2, timeout: int = 30):
+        self.api = api
+        self.files = files
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_concurrent), thread_name_prefix="download")
+        self._jobs: dict[str, DownloadJob] = {}
+        self._lock = threading.Lock()
+
+    # --------------- public ---------------
+
+    def start(self, url: str, on_progress: Callable[[int, int], None] | None = None,
+              on_done: Callable[[Optional[str], Optional[BaseException]], None] | None = None) -> DownloadJob:
+        with self._lock:
+            job = self._jobs.get(url)
+            if job is None or job.finished or job.cancelled:
+                job = DownloadJob(url)
+                self._jobs[url] = job
+                self._pool.submit(self._run, job)
+        job.subscribe(on_progress, on_done)
+        return job
+
+    def cancel_all(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # --------------- intern ---------------
+
+    def _run(self, job: DownloadJob):
+        try:
+            if job.cancelled:
+                raise DownloadCancelled()
+            path = self._download(job)
+            job._finish(path, None)
+        except BaseException as e:
+            job._finish(None, e)
+        finally:
+            with self._lock:
+                if self._jobs.get(job.url) is job:
+                    del self._jobs[job.url]
+
+    def _part_path(self, url: str) -> str:
+        return os.path.join(self.files.dir, "dl_" + hashlib.sha1(url.encode("utf-8")).hexdigest() + ".part")
+
+    def _download(self, job: DownloadJob) -> str:
+        url = job.url
+        cached = self.files.validators(url)   # (path, etag, last_modified) sau None
+        part = self._part_path(url)
+        part_etag_file = part + ".etag"
+        etag = None
+        attempt = 0
+
+        while True:
+            headers = auth_headers(self.api)
+            offset = os.path.getsize(part) if os.path.isfile(part) else 0
+            part_etag = _read_text(part_etag_file)
+            if offset and part_etag:
+                headers["Range"] = f"bytes={offset}-"
+                headers["If-Range"] = part_etag
+            elif cached:
+                offset = 0
+                if cached[1]:
+                    headers["If-None-Match"] = cached[1]
+                if cached[2]:
+                    headers["If-Modified-Since"] = cached[2]
+            else:
+                offset = 0
+
+            try:
+                with self.api.session.get(url, headers=headers, timeout=self.timeout, stream=True) as r:
+                    if r.status_code == 304 and cached:
+                        self.files.touch(url)
+                        return cached[0]
+                    if r.status_code == 416:
+                        # .part invalid (ex: deja complet / fișier mai mic) -> de la zero
+                        _remove(part)
+                        _remove(part_etag_file)
+                        continue
+                    r.raise_for_status()
+                    if r.status_code != 206:
+                        offset = 0   # serverul a ignorat Range (sau fișierul s-a schimbat)
+                    etag = r.headers.get("ETag")
+                    if etag:
+                        _write_text(part_etag_file, etag)
+                    length = int(r.headers.get("Content-Length") or 0)
+                    job.total_bytes = offset + length if length else 0
+                    job.done_bytes = offset
+                    job._report()
+                    self._stream(job, r, part, append=offset > 0)
+                    headers_final = {"ETag": etag, "Last-Modified": r.headers.get("Last-Modified")}
+                break
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError, urllib3.exceptions.HTTPError):
+                # conexiune căzută: reluăm din .part (Range) după un backoff scurt
+                attempt += 1
+                if attempt >= MAX_ATTEMPTS or job.cancelled:
+                    raise
+                time.sleep(min(8.0, 0.5 * (2 ** attempt)))
+
+        path = self.files.adopt(url, part, headers_final)
+        _remove(part_etag_file)
+        return path
+
+    def _stream(self, job: DownloadJob, r, part: str, append: bool):
+        chunk = MIN_CHUNK
+        raw = r.raw
+        with open(part, "ab" if append else "wb") as f:
+            while True:
+                if job.cancelled:
+                    raise DownloadCancelled()
+                t0 = time.perf_counter()
+                data = raw.read(chunk, decode_content=True)
+                if not data:
+                    break
+                f.write(data)
+                job.done_bytes += len(data)
+                job._report()
+                # chunk adaptiv: rețea rapidă -> bucăți mai mari, mai puține apeluri
+                dt = time.perf_counter() - t0
+                if dt < CHUNK_TARGET_SEC / 2 and len(data) == chunk:
+                    chunk = min(MAX_CHUNK, chunk * 2)
+                elif dt > CHUNK_TARGET_SEC * 2:
+                    chunk = max(MIN_CHUNK, chunk // 2)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _write_text(path: str, text: str):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    except OSError:
+        pass
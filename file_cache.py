@@ -0,0 +1,246 @@
+# file_cache.py
+from __future__ import annotations
+import os, time, hashlib, sqlite3, threading, urllib.parse
+from typing import Optional
+
+from paths import user_data_dir
+from previews import auth_headers, PreviewCancelled
+
+FILES_CAP_BYTES = 1024 * 1024 * 1024   # ~1 GB de atașamente păstrate local
+CHUNK_SIZE = 256 * 1024
+
+
+def _files_dir() -> str:
+    path = os.path.join(user_data_dir(), "files")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _suffix(url: str) -> str:
+    return os.path.splitext(urllib.parse.urlparse(url).path)[1].lower()
+
+
+class FileCache:
+    """
+    Cache local de fișiere atașate, comun pentru preview / Deschide / Descarcă.
+    - fișierele sunt content-addressed: <sha256(conținut)><ext> (extensia rămâne,
+      ca aplicația externă să știe ce deschide);
+    - index SQLite: url -> fișier, ETag, Last-Modified, mărime, ultima accesare;
+    - fetch() revalidează condiționat (If-None-Match / If-Modified-Since): 304 = zero bytes;
+    - plafon pe bytes cu evicție LRU (fișierele blocate de alt program sunt sărite).
+    """
+
+    def __init__(self, directory: str | None = None, *, cap_bytes: int = FILES_CAP_BYTES):
+        self.dir = directory or _files_dir()
+        os.makedirs(self.dir, exist_ok=True)
+        self.cap_bytes = cap_bytes
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(os.path.join(self.dir, "index.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " url TEXT PRIMARY KEY, fname TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+            " bytes INTEGER NOT NULL, atime REAL NOT NULL, fetched REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_files_atime ON files(atime)")
+        self._db.commit()
+
+    # --------------- public ---------------
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Calea locală dacă fișierul e în cache (fără rețea), altfel None."""
+        with self._lock:
+            row = self._db.execute("SELECT fname FROM files WHERE url=?", (url,)).fetchone()
+        if not row:
+            return None
+        path = os.path.join(self.dir, row[0])
+        if not os.path.isfile(path):
+            self._forget(url)
+            return None
+        self._touch(url)
+        return path
+
+    def read_bytes(self, url: str) -> Optional[bytes]:
+        path = self.lookup(url)
+        if not path:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def fetch(self, api, url: str, *, revalidate: bool = True, timeout: int = 30,
+              cancel: Optional[threading.Event] = None) -> str:
+        """
+        Întoarce calea locală a fișierului. Dacă există în cache și revalidate=True,
+        face GET condiționat; la 304 (sau dacă serverul nu răspunde) folosește copia locală.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fname, etag, last_modified FROM files WHERE url=?", (url,)).fetchone()
+        cached = os.path.join(self.dir, row[0]) if row else None
+        if cached and not os.path.isfile(cached):
+            cached = None
+        if cached and not revalidate:
+            self._touch(url)
+            return cached
+
+        headers = auth_headers(api)
+        if cached:
+            if row[1]:
+                headers["If-None-Match"] = row[1]
+            if row[2]:
+                headers["If-Modified-Since"] = row[2]
+        try:
+            r = api.session.get(url, headers=headers, timeout=timeout, stream=True)
+        except Exception:
+            if cached:
+                self._touch(url)
+                return cached   # offline -> copia locală e mai bună decât nimic
+            raise
+        with r:
+            if r.status_code == 304 and cached:
+                self._touch(url)
+                return cached
+            r.raise_for_status()
+            return self._store_stream(url, r, cancel)
+
+    def validators(self, url: str) -> Optional[tuple[str, Optional[str], Optional[str]]]:
+        """(cale locală, ETag, Last-Modified) pentru GET condiționat, sau None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fname, etag, last_modified FROM files WHERE url=?", (url,)).fetchone()
+        if not row:
+            return None
+        path = os.path.join(self.dir, row[0])
+        if not os.path.isfile(path):
+            self._forget(url)
+            return None
+        return path, row[1], row[2]
+
+    def validator(self, url: str) -> Optional[str]:
+        """ETag (altfel Last-Modified) al versiunii din cache; cu el ThumbCache.get detectează fișiere înlocuite."""
+        with self._lock:
+            row = self._db.execute("SELECT etag, last_modified FROM files WHERE url=?", (url,)).fetchone()
+        return (row[0] or row[1]) if row else None
+
+    def adopt(self, url: str, src_path: str, headers: dict | None = None) -> str:
+        """Mută în cache un fișier deja descărcat pe disc (ex: .part complet al DownloadManager)."""
+        h = hashlib.sha256()
+        size = 0
+        with open(src_path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE * 4), b""):
+                h.update(chunk)
+                size += len(chunk)
+        fname = h.hexdigest() + _suffix(url)
+        path = os.path.join(self.dir, fname)
+        if os.path.isfile(path):
+            os.remove(src_path)
+        else:
+            os.replace(src_path, path)
+        self._index(url, fname, size, headers or {})
+        return path
+
+    def touch(self, url: str):
+        self._touch(url)
+
+    def put_bytes(self, url: str, data: bytes, headers: dict | None = None) -> str:
+        """Salvează bytes deja descărcați (ex: de preview), ca Deschide/Descarcă să nu mai descarce."""
+        digest = hashlib.sha256(data).hexdigest()
+        fname = digest + _suffix(url)
+        path = os.path.join(self.dir, fname)
+        if not os.path.isfile(path):
+            tmp = path + f".{threading.get_ident()}.part"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        self._index(url, fname, len(data), headers or {})
+        return path
+
+    def disk_usage(self) -> int:
+        with self._lock:
+            # același conținut poate fi indexat sub mai multe URL-uri -> numărăm fișierele, nu rândurile
+            return int(self._db.execute(
+                "SELECT COALESCE(SUM(b), 0) FROM (SELECT MAX(bytes) AS b FROM files GROUP BY fname)"
+            ).fetchone()[0])
+
+    # --------------- intern ---------------
+
+    def _store_stream(self, url: str, r, cancel: Optional[threading.Event]) -> str:
+        h = hashlib.sha256()
+        size = 0
+        tmp = os.path.join(self.dir, f"dl_{threading.get_ident()}_{time.time_ns()}.part")
+        try:
+            with open(tmp, "wb") as f:
+                for chunk in r.iter_content(CHUNK_SIZE):
+                    if cancel is not None and cancel.is_set():
+                        raise PreviewCancelled()
+                    f.write(chunk)
+                    h.update(chunk)
+                    size += len(chunk)
+            fname = h.hexdigest() + _suffix(url)
+            path = os.path.join(self.dir, fname)
+            if os.path.isfile(path):
+                os.remove(tmp)   # același conținut deja există (alt URL)
+            else:
+                os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self._index(url, fname, size, r.headers)
+        return path
+
+    def _index(self, url: str, fname: str, size: int, headers):
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT fname FROM files WHERE url=?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT INTO files(url, fname, etag, last_modified, bytes, atime, fetched) "
+                "VALUES (?,?,?,?,?,?,?) ON CONFLICT(url) DO UPDATE SET fname=excluded.fname, "
+                "etag=excluded.etag, last_modified=excluded.last_modified, bytes=excluded.bytes, "
+                "atime=excluded.atime, fetched=excluded.fetched",
+                (url, fname, headers.get("ETag"), headers.get("Last-Modified"), size, now, now),
+            )
+            self._db.commit()
+            if old and old[0] != fname:
+                self._unlink_if_orphan(old[0])
+            self._evict()
+
+    def _touch(self, url: str):
+        with self._lock:
+            self._db.execute("UPDATE files SET atime=? WHERE url=?", (time.time(), url))
+            self._db.commit()
+
+    def _forget(self, url: str):
+        with self._lock:
+            self._db.execute("DELETE FROM files WHERE url=?", (url,))
+            self._db.commit()
+
+    def _evict(self):
+        total = self.disk_usage()
+        if total <= self.cap_bytes:
+            return
+        for url, fname, size in self._db.execute(
+                "SELECT url, fname, bytes FROM files ORDER BY atime ASC").fetchall():
+            self._db.execute("DELETE FROM files WHERE url=?", (url,))
+            if self._unlink_if_orphan(fname):
+                total -= size
+            if total <= self.cap_bytes:
+                break
+        self._db.commit()
+
+    def _unlink_if_orphan(self, fname: str) -> bool:
+        """Șterge fișierul dacă nu-l mai folosește alt URL (content-addressed => poate fi partajat)."""
+        if self._db.execute("SELECT 1 FROM files WHERE fname=? LIMIT 1", (fname,)).fetchone():
+            return False
+        try:
+            os.remove(os.path.join(self.dir, fname))
+            return True
+        except FileNotFoundError:
+            return True
+        except OSError:
+            return False   # ex: deschis în alt program pe Windows
@@ -0,0 +1,257 @@
+# local_mirror.py
+from __future__ import annotations
+import os, re, time, sqlite3, threading
+from typing import Any, Iterable, Optional
+
+from paths import user_data_dir
+from config import MIRROR_RECONCILE_MIN
+
+# coloanele oglindite din documentescanate/cie (aceleași chei ca WaitDocsClient.fetch_page)
+MIRROR_COLS = ("id", "tip", "subtip", "user", "angajat", "file", "denumire")
+# coloane pe care se poate sorta / filtra exact (toate au index)
+SORTABLE = ("id", "tip", "subtip", "user", "angajat", "denumire")
+FILTERABLE = ("tip", "subtip", "user", "angajat")
+
+_FTS_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    "id"       INTEGER PRIMARY KEY,
+    "tip"      TEXT NOT NULL DEFAULT '',
+    "subtip"   TEXT NOT NULL DEFAULT '',
+    "user"     TEXT NOT NULL DEFAULT '',
+    "angajat"  TEXT NOT NULL DEFAULT '',
+    "file"     TEXT NOT NULL DEFAULT '',
+    "denumire" TEXT NOT NULL DEFAULT '',
+    "synced_at" REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_docs_tip      ON docs("tip");
+CREATE INDEX IF NOT EXISTS ix_docs_subtip   ON docs("subtip");
+CREATE INDEX IF NOT EXISTS ix_docs_user     ON docs("user");
+CREATE INDEX IF NOT EXISTS ix_docs_angajat  ON docs("angajat");
+CREATE INDEX IF NOT EXISTS ix_docs_denumire ON docs("denumire");
+CREATE TABLE IF NOT EXISTS meta (
+    "key"   TEXT PRIMARY KEY,
+    "value" TEXT
+);
+"""
+
+# FTS5 pe denumire, ținut la zi prin triggere (external content)
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    denumire, content='docs', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS docs_ai AFTER INSERT ON docs BEGIN
+    INSERT INTO docs_fts(rowid, denumire) VALUES (new."id", new."denumire");
+END;
+CREATE TRIGGER IF NOT EXISTS docs_ad AFTER DELETE ON docs BEGIN
+    INSERT INTO docs_fts(docs_fts, rowid, denumire) VALUES ('delete', old."id", old."denumire");
+END;
+CREATE TRIGGER IF NOT EXISTS docs_au AFTER UPDATE OF "denumire" ON docs BEGIN
+    INSERT INTO docs_fts(docs_fts, rowid, denumire) VALUES ('delete', old."id", old."denumire");
+    INSERT INTO docs_fts(rowid, denumire) VALUES (new."id", new."denumire");
+END;
+"""
+
+
+def _mirror_path() -> str:
+    return os.path.join(user_data_dir(), "waitdocs_mirror.sqlite3")
+
+
+class LocalMirror:
+    """
+    Oglindă locală (SQLite) a listei documentescanate/cie.
+    - sync(): aduce doar rândurile noi (id > ultimul id cunoscut); la prima rulare, cu
+      full=True, la fiecare MIRROR_RECONCILE_MIN minute sau când numărul local diferă de
+      recordsTotal parcurge tot și șterge local ce nu mai există pe server.
+    - query(): filtrare / sortare / paginare locală, aceeași formă ca fetch_page -> (rows, total).
+    Conexiunea e partajată între thread-ul Tk și cel de sync, protejată de un lock.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or _mirror_path()
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        try:
+            self._db.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite fără FTS5 -> căutăm cu LIKE
+            self.has_fts = False
+        self._db.commit()
+
+    # --------------- public ---------------
+
+    def close(self):
+        with self._lock:
+            try:
+                self._db.close()
+            except Exception:
+                pass
+
+    def max_id(self) -> int:
+        with self._lock:
+            row = self._db.execute('SELECT MAX("id") FROM docs').fetchone()
+        return int(row[0] or 0)
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._db.execute("SELECT COUNT(*) FROM docs").fetchone()[0])
+
+    def last_sync(self) -> float:
+        return float(self._get_meta("last_sync") or 0)
+
+    def last_full_sync(self) -> float:
+        return float(self._get_meta("last_full_sync") or 0)
+
+    def upsert(self, rows: Iterable[dict]) -> int:
+        """Inserează / actualizează rânduri (dict-uri ca în fetch_page). Întoarce câte au fost scrise."""
+        now = time.time()
+        batch = [
+            (int(r["id"]), r.get("tip") or "", r.get("subtip") or "", r.get("user") or "",
+             r.get("angajat") or "", r.get("file") or "", r.get("denumire") or "", now)
+            for r in rows if r.get("id") is not None
+        ]
+        if not batch:
+            return 0
+        with self._lock, self._db:
+            self._db.executemany(
+                'INSERT INTO docs("id","tip","subtip","user","angajat","file","denumire","synced_at") '
+                "VALUES (?,?,?,?,?,?,?,?) "
+                'ON CONFLICT("id") DO UPDATE SET '
+                '"tip"=excluded."tip", "subtip"=excluded."subtip", "user"=excluded."user", '
+                '"angajat"=excluded."angajat", "file"=excluded."file", '
+                '"denumire"=excluded."denumire", "synced_at"=excluded."synced_at"',
+                batch,
+            )
+        return len(batch)
+
+    def delete(self, ids: Iterable[Any]) -> int:
+        ids = [(int(i),) for i in ids]
+        if not ids:
+            return 0
+        with self._lock, self._db:
+            self._db.executemany('DELETE FROM docs WHERE "id"=?', ids)
+        return len(ids)
+
+    def sync(self, client, batch_size: int = 200, full: bool = False,
+             reconcile_sec: float = MIRROR_RECONCILE_MIN * 60) -> dict:
+        """
+        Sincronizare incrementală după id (cele mai noi primele).
+        Se oprește la prima pagină care ajunge la un id deja cunoscut.
+        Trece pe parcurgere completă (upsert tot + elimină local id-urile dispărute) când:
+        full=True, baza e goală, ultima parcurgere completă e mai veche de reconcile_sec
+        sau, după pasul incremental, numărul local diferă de recordsTotal (ștergeri /
+        documente procesate pe server). Editările rândurilor deja oglindite se preiau
+        doar la parcurgerea completă.
+        Întoarce {"upserted": n, "deleted": n, "full": bool}.
+        """
+        known_max = self.max_id()
+        full = full or known_max == 0 or time.time() - self.last_full_sync() >= reconcile_sec
+        if full:
+            known_max = 0
+        seen: set[int] = set()
+        upserted = 0
+        server_total = None
+        page = 0
+        while True:
+            rows, total = client.fetch_page(page, batch_size, "", order_col="id", order_dir="desc")
+            if server_total is None:
+                server_total = int(total or 0)
+            if not rows:
+                break
+            upserted += self.upsert(rows)
+            ids = [int(r["id"]) for r in rows if r.get("id") is not None]
+            seen.update(ids)
+            if not full and ids and min(ids) <= known_max:
+                break
+            page += 1
+            if page * batch_size >= int(total or 0):
+                break
+
+        if not full and server_total is not None and server_total != self.count():
+            res = self.sync(client, batch_size, full=True)
+            res["upserted"] += upserted
+            return res
+
+        deleted = 0
+        now = str(time.time())
+        if full:
+            with self._lock:
+                local_ids = {r[0] for r in self._db.execute('SELECT "id" FROM docs')}
+            deleted = self.delete(local_ids - seen)
+            self._set_meta("last_full_sync", now)
+        self._set_meta("last_sync", now)
+        return {"upserted": upserted, "deleted": deleted, "full": full}
+
+    def query(self, search_text: str = "", *,
+              filters: dict | None = None,
+              order_by: str = "id", descending: bool = False,
+              page_index: int = 0, page_size: int = 10) -> tuple[list[dict], int]:
+        """
+        Filtrare/sortare locală. search_text caută full-text în denumire și
+        prefix în tip/subtip/user/angajat; filters = egalitate exactă pe coloane indexate.
+        """
+        where, args = [], []
+
+        for col, val in (filters or {}).items():
+            if col in FILTERABLE and val not in (None, ""):
+                where.append(f'"{col}" = ?')
+                args.append(str(val))
+
+        text = (search_text or "").strip()
+        if text:
+            like = f"%{text}%"
+            cond = ['"tip" LIKE ?', '"subtip" LIKE ?', '"user" LIKE ?', '"angajat" LIKE ?']
+            cond_args: list[Any] = [like, like, like, like]
+            fts_q = self._fts_query(text)
+            if self.has_fts and fts_q:
+                cond.append('"id" IN (SELECT rowid FROM docs_fts WHERE docs_fts MATCH ?)')
+                cond_args.append(fts_q)
+            else:
+                cond.append('"denumire" LIKE ?')
+                cond_args.append(like)
+            if text.isdigit():
+                cond.append('"id" = ?')
+                cond_args.append(int(text))
+            where.append("(" + " OR ".join(cond) + ")")
+            args.extend(cond_args)
+
+        sql_where = (" WHERE " + " AND ".join(where)) if where else ""
+        col = order_by if order_by in SORTABLE else "id"
+        direction = "DESC" if descending else "ASC"
+        # id ca tie-breaker -> ordine stabilă între pagini
+        order = f' ORDER BY "{col}" COLLATE NOCASE {direction}, "id" {direction}' if col != "id" \
+            else f' ORDER BY "id" {direction}'
+
+        with self._lock:
+            total = int(self._db.execute(f"SELECT COUNT(*) FROM docs{sql_where}", args).fetchone()[0])
+            cur = self._db.execute(
+                f'SELECT "id","tip","subtip","user","angajat","file","denumire" FROM docs{sql_where}{order} '
+                "LIMIT ? OFFSET ?",
+                [*args, int(page_size), int(page_index) * int(page_size)],
+            )
+            rows = [{k: r[k] for k in MIRROR_COLS} for r in cur.fetchall()]
+        return rows, total
+
+    # --------------- intern ---------------
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        # fiecare cuvânt devine termen prefix citat -> fără erori de sintaxă FTS
+        terms = _FTS_TOKEN.findall(text)
+        return " ".join(f'"{t}"*' for t in terms)
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute('SELECT "value" FROM meta WHERE "key"=?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        with self._lock, self._db:
+            self._db.execute('INSERT INTO meta("key","value") VALUES (?,?) '
+                             'ON CONFLICT("key") DO UPDATE SET "value"=excluded."value"', (key, value))
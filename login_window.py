@@ -1,4 +1,5 @@
 # login_window.py
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from api import ApiClient, ApiError
@@ -11,6 +12,9 @@ class LoginWindow(tk.Toplevel):
     """
     Fereastră modală de login.
     La succes: setează client.tokens și apelează on_success(client)
+    - conexiunea către server (DNS + TLS) se deschide în fundal imediat ce apare fereastra;
+    - login-ul rulează pe un thread, cu spinner și „Anulează”; un răspuns venit după
+      anulare e ignorat (token-urile se adoptă doar pe thread-ul Tk, cu request_tokens/use_tokens).
     """
     def __init__(self, master, client: ApiClient, on_success):
         super().__init__(master)
@@ -57,27 +61,80 @@ class LoginWindow(tk.Toplevel):
         self.btn = ttk.Button(frm, text="Conectează-te", style="Login.TButton", command=self.do_login)
         self.btn.grid(row=3, column=0, columnspan=2, pady=(12, 0), sticky="ew")
 
+        # spinner + anulare (ascunse cât timp nu rulează login-ul)
+        self.busy = ttk.Frame(frm)
+        self.spinner = ttk.Progressbar(self.busy, mode="indeterminate", length=200)
+        self.spinner.pack(side="left", fill="x", expand=True)
+        ttk.Button(self.busy, text="Anulează", command=self.cancel_login).pack(side="left", padx=(8, 0))
+        self._entries = (ent_user, ent_pass)
+        self._attempt = 0        # crește la fiecare încercare / anulare -> răspunsurile vechi se ignoră
+        self._logging_in = False
+
         self.bind("<Return>", lambda e: self.do_login())
+        self.bind("<Escape>", lambda e: self.cancel_login())
         ent_user.focus_set()
 
+        # speculativ: până tastează utilizatorul, conexiunea e deja stabilită
+        threading.Thread(target=self.client.prewarm, daemon=True, name="login-prewarm").start()
+
     def do_login(self):
+        if self._logging_in:
+            return
         user = self.username.get().strip()
         pwd = self.password.get().strip()
         if not user or not pwd:
             messagebox.showwarning("Date lipsă", "Introdu username și parolă.")
             return
-        self.btn.configure(state="disabled", text="Se conectează...")
-        self.update_idletasks()
-        try:
-            self.client.login(user, pwd)
-        except ApiError as e:
-            messagebox.showerror("Autentificare eșuată", str(e))
-            self.btn.configure(state="normal", text="Conectează-te")
+        self._attempt += 1
+        attempt = self._attempt
+        self._set_busy(True)
+
+        def worker():
+            data, err = None, None
+            try:
+                data = self.client.request_tokens(user, pwd)
+            except Exception as e:
+                err = e
+            try:
+                self.after(0, lambda: self._on_login_done(attempt, data, err))
+            except Exception:
+                pass   # fereastra a fost închisă între timp
+
+        threading.Thread(target=worker, daemon=True, name="login").start()
+
+    def cancel_login(self):
+        if not self._logging_in:
             return
-        except Exception as e:
-            messagebox.showerror("Eroare", str(e))
+        self._attempt += 1
+        self._set_busy(False)
+
+    # --------------- intern ---------------
+
+    def _set_busy(self, busy: bool):
+        self._logging_in = busy
+        state = "disabled" if busy else "normal"
+        for ent in self._entries:
+            ent.configure(state=state)
+        if busy:
+            self.btn.configure(state="disabled", text="Se conectează...")
+            self.busy.grid(row=4, column=0, columnspan=2, pady=(10, 0), sticky="ew")
+            self.spinner.start(12)
+        else:
+            self.spinner.stop()
+            self.busy.grid_remove()
             self.btn.configure(state="normal", text="Conectează-te")
+
+    def _on_login_done(self, attempt: int, data, err):
+        if attempt != self._attempt:
+            return   # anulat sau înlocuit de o încercare nouă
+        self._set_busy(False)
+        if isinstance(err, ApiError):
+            messagebox.showerror("Autentificare eșuată", str(err), parent=self)
+            return
+        if err is not None:
+            messagebox.showerror("Eroare", str(err), parent=self)
             return
         # succes
+        self.client.use_tokens(data)
         self.destroy()
         self.on_success(self.client)
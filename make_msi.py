@@ -11,7 +11,7 @@ def run(cmd):
     subprocess.check_call(cmd, shell=True)
 
 def write_product_wxs(path, *, app_name, manufacturer, version, upgrade_code,
-                      scope, icon_path, exe_name):
+                      scope, icon_path, exe_name, handler_exe=""):
     per_machine = (scope.lower() == "permachine")
 
     dir_block = (f"""
@@ -30,6 +30,19 @@ def write_product_wxs(path, *, app_name, manufacturer, version, upgrade_code,
     <Icon Id="AppIcon.ico" SourceFile="{icon_path}" />
     <Property Id="ARPPRODUCTICON" Value="AppIcon.ico"/>""" if icon_path else "")
 
+    # cie://  -> handler-ul separat (WaitDocsCIE.exe), nu aplicația întreagă
+    handler_ref = '\n      <ComponentRef Id="CieProtocol" />' if handler_exe else ""
+    handler_block = (f"""
+    <Component Id="CieProtocol" Guid="*">
+      <RegistryKey Root="HKMU" Key="Software\\Classes\\cie">
+        <RegistryValue Type="string" Value="URL:CIE Protocol" KeyPath="yes"/>
+        <RegistryValue Name="URL Protocol" Type="string" Value=""/>
+        <RegistryKey Key="shell\\open\\command">
+          <RegistryValue Type="string" Value="&quot;[INSTALLDIR]{handler_exe}&quot; &quot;%1&quot;"/>
+        </RegistryKey>
+      </RegistryKey>
+    </Component>""" if handler_exe else "")
+
     xml = f"""<?xml version="1.0" encoding="UTF-8"?>
 <Wix xmlns="http://wixtoolset.org/schemas/v4/wxs"
      xmlns:ui="http://wixtoolset.org/schemas/v4/wxs/ui">
@@ -56,7 +69,7 @@ def write_product_wxs(path, *, app_name, manufacturer, version, upgrade_code,
     <Feature Id="MainFeature" Title="{app_name}" Level="1">
       <!-- Include toate fișierele din bindpath 'App' -->
       <Files Directory="INSTALLDIR" Include="!(bindpath.App)\\**" />
-      <ComponentRef Id="Shortcuts" />
+      <ComponentRef Id="Shortcuts" />{handler_ref}
     </Feature>
 
     <Component Id="Shortcuts" Guid="*">
@@ -70,6 +83,7 @@ def write_product_wxs(path, *, app_name, manufacturer, version, upgrade_code,
       <RegistryValue Root="HKCU" Key="Software\\{manufacturer}\\{app_name}"
                      Name="installed" Type="integer" Value="1" KeyPath="yes"/>
     </Component>
+{handler_block}
 
     <!-- UI standard pentru alegerea folderului -->
     <ui:WixUI Id="WixUI_InstallDir" />
@@ -81,8 +95,13 @@ def write_product_wxs(path, *, app_name, manufacturer, version, upgrade_code,
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--app-dir", required=True)
-    ap.add_argument("--exe-name", required=True)
+    ap.add_argument("--app-dir", default="")
+    ap.add_argument("--exe-name", default="WaitDocs.exe")
+    ap.add_argument("--handler-exe", default="WaitDocsCIE.exe",
+                    help="handler-ul cie:// din app-dir (înregistrat ca protocol dacă există)")
+    ap.add_argument("--build", action="store_true",
+                    help="rulează întâi build_exe (one-dir, bytecode optimizat, handler separat)")
+    ap.add_argument("--no-report", action="store_true", help="fără raportul de mărime / pornire")
     ap.add_argument("--app-name", required=True)
     ap.add_argument("--manufacturer", required=True)
     ap.add_argument("--version", default="1.0.0")
@@ -97,13 +116,27 @@ def main():
         print("Eroare: nu am găsit wix.exe (dotnet tool). Rulează: dotnet tool install --global wix")
         sys.exit(1)
 
-    app_dir = Path(args.app_dir).resolve()
+    import build_exe
+    if args.build:
+        app_dir = build_exe.build_all()
+    elif args.app_dir:
+        app_dir = Path(args.app_dir).resolve()
+    else:
+        print("Eroare: dă --app-dir <dist/WaitDocs> sau --build")
+        sys.exit(1)
     if not app_dir.is_dir():
         print(f"Eroare: folderul nu există: {app_dir}")
         sys.exit(1)
     if not (app_dir / args.exe_name).is_file():
         print(f"Eroare: executabilul nu există: {app_dir / args.exe_name}")
         sys.exit(1)
+    handler_exe = args.handler_exe if (app_dir / args.handler_exe).is_file() else ""
+    if not handler_exe:
+        print(f"Atenție: {args.handler_exe} lipsește din {app_dir}; protocolul cie:// nu se înregistrează.")
+
+    # mărime + pornire la rece, comparate cu build-ul anterior (regresiile apar în consolă)
+    if not args.no_report:
+        build_exe.report_and_save(app_dir)
 
     work = Path("installer_build").resolve()
     if work.exists():
@@ -126,7 +159,8 @@ def main():
         upgrade_code=upgrade_code,
         scope=args.scope,
         icon_path=args.icon.replace("/", "\\") if args.icon else "",
-        exe_name=args.exe_name
+        exe_name=args.exe_name,
+        handler_exe=handler_exe
     )
 
     # Extensii UI/Util (idempotent)
@@ -0,0 +1,193 @@
+# metrics.py
+from __future__ import annotations
+import os, json, math, time, queue, atexit, threading, logging, logging.handlers
+from collections import deque
+from typing import Iterable, Optional
+
+from config import METRICS_ENABLED
+from paths import user_data_dir
+
+METRICS_FILE = "metrics.jsonl"
+MAX_BYTES = 2 * 1024 * 1024     # rotație la 2 MB
+BACKUP_COUNT = 3                # metrics.jsonl.1 .. .3
+SAMPLES = 1024                  # ultimele N valori per operație, în memorie (pentru snapshot)
+
+
+def metrics_dir() -> str:
+    path = os.path.join(user_data_dir(), "metrics")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Percentila p (0..100) prin rang apropiat, pe o listă deja sortată."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(values: Iterable[float]) -> dict:
+    vals = sorted(values)
+    return {
+        "count": len(vals),
+        "p50": percentile(vals, 50),
+        "p95": percentile(vals, 95),
+        "p99": percentile(vals, 99),
+        "max": vals[-1] if vals else 0.0,
+    }
+
+
+class Span:
+    """
+    Durata unei operații: începe la creare, se termină la primul end() (restul sunt ignorate).
+    Poate trece prin thread-uri / callback-uri (ex: click pe rând -> preview afișat).
+    Ca context manager: ok=False + error=<tip excepție> dacă blocul aruncă.
+    """
+
+    __slots__ = ("_registry", "name", "tags", "t0", "_done")
+
+    def __init__(self, registry: "Registry", name: str, tags: dict):
+        self._registry = registry
+        self.name = name
+        self.tags = tags
+        self.t0 = time.perf_counter()
+        self._done = False
+
+    def end(self, **tags) -> Optional[float]:
+        if self._done:
+            return None
+        self._done = True
+        ms = (time.perf_counter() - self.t0) * 1000.0
+        self._registry.observe(self.name, ms, **{**self.tags, **tags})
+        return ms
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.end()
+        else:
+            self.end(ok=False, error=exc_type.__name__)
+        return False
+
+
+class Registry:
+    """
+    Metrici în proces: contoare + histograme (durate în ms), cu etichete.
+    - fiecare valoare e scrisă ca o linie JSON în metrics.jsonl (rotit), de pe un thread
+      separat (QueueHandler/QueueListener): UI-ul nu face niciodată I/O pentru metrici;
+    - snapshot() = p50/p95/p99 din ultimele SAMPLES valori, per operație;
+    - metrics_view.py citește fișierele pentru rapoarte / tichete de suport.
+    """
+
+    def __init__(self, path: str | None = None):
+        self._lock = threading.Lock()
+        self._hist: dict[str, deque] = {}
+        self._counters: dict[str, int] = {}
+        self._log: logging.Logger | None = None
+        self._listener: logging.handlers.QueueListener | None = None
+        if path:
+            self._open(path)
+
+    # --------------- public ---------------
+
+    def incr(self, name: str, n: int = 1, **tags):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+        self._write({"kind": "count", "name": name, "n": n, **tags})
+
+    def observe(self, name: str, ms: float, **tags):
+        with self._lock:
+            h = self._hist.get(name)
+            if h is None:
+                h = self._hist[name] = deque(maxlen=SAMPLES)
+            h.append(ms)
+        self._write({"kind": "time", "name": name, "ms": round(ms, 2), **tags})
+
+    def span(self, name: str, **tags) -> Span:
+        return Span(self, name, tags)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            hist = {k: list(v) for k, v in self._hist.items()}
+            counters = dict(self._counters)
+        return {"timings": {k: summarize(v) for k, v in hist.items()}, "counters": counters}
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.stop()   # golește coada în fișier
+            self._listener = None
+        self._log = None
+
+    # --------------- intern ---------------
+
+    def _open(self, path: str):
+        try:
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8", delay=True)
+        except OSError:
+            return
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        q: "queue.SimpleQueue" = queue.SimpleQueue()
+        log = logging.getLogger(f"waitdocs.metrics.{id(self)}")
+        log.propagate = False
+        log.setLevel(logging.INFO)
+        log.addHandler(logging.handlers.QueueHandler(q))
+        self._listener = logging.handlers.QueueListener(q, handler)
+        self._listener.start()
+        self._log = log
+
+    def _write(self, event: dict):
+        log = self._log
+        if log is None:
+            return
+        event["ts"] = round(time.time(), 3)
+        try:
+            log.info(json.dumps(event, ensure_ascii=False, default=str, separators=(",", ":")))
+        except Exception:
+            pass
+
+
+class _NullRegistry(Registry):
+    """WAITDOCS_METRICS=0: aceeași interfață, nimic înregistrat."""
+
+    def incr(self, name: str, n: int = 1, **tags):
+        pass
+
+    def observe(self, name: str, ms: float, **tags):
+        pass
+
+
+_registry: Registry | None = None
+_registry_lock = threading.Lock()
+
+
+def registry() -> Registry:
+    """Registrul aplicației (creat la prima folosire)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                if METRICS_ENABLED:
+                    try:
+                        _registry = Registry(os.path.join(metrics_dir(), METRICS_FILE))
+                    except OSError:
+                        _registry = Registry()
+                    atexit.register(_registry.close)
+                else:
+                    _registry = _NullRegistry()
+    return _registry
+
+
+def span(name: str, **tags) -> Span:
+    return registry().span(name, **tags)
+
+
+def observe(name: str, ms: float, **tags):
+    registry().observe(name, ms, **tags)
+
+
+def incr(name: str, n: int = 1, **tags):
+    registry().incr(name, n, **tags)
@@ -0,0 +1,149 @@
+# metrics_view.py — raport p50/p95/p99 per operație din metrics.jsonl (+ export pentru suport)
+# Rulare:
+#   python metrics_view.py                    -> ultimele 7 zile, toate operațiile
+#   python metrics_view.py --hours 4 --name ui.
+#   python metrics_view.py --by status        -> separat pe valorile etichetei 'status'
+#   python metrics_view.py --stalls           -> blocajele buclei Tk, pe handler
+#   python metrics_view.py --export tichet.zip
+from __future__ import annotations
+import os, json, time, zipfile, argparse, platform
+from typing import Iterable, Iterator
+
+from metrics import METRICS_FILE, BACKUP_COUNT, metrics_dir, summarize
+from ui_watchdog import STALLS_FILE
+
+
+def metric_files(folder: str | None = None) -> list[str]:
+    """metrics.jsonl + fișierele rotite, cel mai vechi primul."""
+    folder = folder or metrics_dir()
+    base = os.path.join(folder, METRICS_FILE)
+    paths = [f"{base}.{i}" for i in range(BACKUP_COUNT, 0, -1)] + [base]
+    return [p for p in paths if os.path.isfile(p)]
+
+
+def stall_files(folder: str | None = None) -> list[str]:
+    base = os.path.join(folder or metrics_dir(), STALLS_FILE)
+    return [p for p in (base + ".1", base) if os.path.isfile(p)]
+
+
+def read_events(paths: Iterable[str], *, since: float = 0.0, prefix: str = "") -> Iterator[dict]:
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        ev = json.loads(line)
+                    except ValueError:
+                        continue   # linie trunchiată (ex: aplicația oprită brusc)
+                    if ev.get("ts", 0) >= since and str(ev.get("name", "")).startswith(prefix):
+                        yield ev
+        except OSError:
+            continue
+
+
+def aggregate(events: Iterable[dict], by: str = "") -> tuple[dict, dict]:
+    """({operație: summarize(...)}, {contor: total}); by = etichetă după care se separă."""
+    timings: dict[str, list[float]] = {}
+    counters: dict[str, int] = {}
+    for ev in events:
+        name = ev.get("name", "?")
+        if by and by in ev:
+            name = f"{name} [{by}={ev[by]}]"
+        if ev.get("kind") == "time":
+            timings.setdefault(name, []).append(float(ev.get("ms", 0.0)))
+        elif ev.get("kind") == "count":
+            counters[name] = counters.get(name, 0) + int(ev.get("n", 1))
+    return {k: summarize(v) for k, v in timings.items()}, counters
+
+
+def format_report(timings: dict, counters: dict) -> str:
+    lines = []
+    if timings:
+        width = max(len(k) for k in timings)
+        lines.append(f"{'operație':<{width}}  {'nr':>6}  {'p50 ms':>9}  {'p95 ms':>9}  {'p99 ms':>9}  {'max ms':>9}")
+        for name in sorted(timings):
+            s = timings[name]
+            lines.append(f"{name:<{width}}  {s['count']:>6}  {s['p50']:>9.1f}  {s['p95']:>9.1f}"
+                         f"  {s['p99']:>9.1f}  {s['max']:>9.1f}")
+    else:
+        lines.append("Nicio durată înregistrată în intervalul ales.")
+    if counters:
+        lines.append("")
+        for name in sorted(counters):
+            lines.append(f"{name}: {counters[name]}")
+    return "\n".join(lines)
+
+
+def stall_report(events: Iterable[dict], *, include_modal: bool = False) -> str:
+    """Blocajele Tk grupate pe handler: câte, total, p95, max și locul cel mai des eșantionat."""
+    groups: dict[str, list[dict]] = {}
+    for ev in events:
+        if ev.get("kind", "stall") != "stall" and not include_modal:
+            continue
+        groups.setdefault(ev.get("handler", "?"), []).append(ev)
+    if not groups:
+        return "Niciun blocaj al interfeței în intervalul ales."
+    rows = []
+    for handler, evs in groups.items():
+        s = summarize(float(e.get("ms", 0.0)) for e in evs)
+        spots: dict[str, int] = {}
+        for e in evs:
+            spots[e.get("hotspot", "?")] = spots.get(e.get("hotspot", "?"), 0) + 1
+        rows.append((sum(float(e.get("ms", 0.0)) for e in evs), handler, s, max(spots, key=spots.get)))
+    width = max(len(r[1]) for r in rows)
+    lines = [f"{'handler':<{width}}  {'nr':>5}  {'total ms':>9}  {'p95 ms':>8}  {'max ms':>8}  loc frecvent"]
+    for total, handler, s, spot in sorted(rows, key=lambda r: r[0], reverse=True):
+        lines.append(f"{handler:<{width}}  {s['count']:>5}  {total:>9.0f}  {s['p95']:>8.0f}  {s['max']:>8.0f}  {spot}")
+    return "\n".join(lines)
+
+
+def export_bundle(dest: str, *, hours: float = 24 * 7, extra_files: Iterable[str] = (),
+                  folder: str | None = None) -> str:
+    """ZIP pentru tichetul de suport: fișierele de metrici + raportul + informații de sistem."""
+    paths = metric_files(folder)
+    timings, counters = aggregate(read_events(paths, since=time.time() - hours * 3600))
+    info = {
+        "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "hours": hours,
+    }
+    stalls = stall_files(folder)
+    since = time.time() - hours * 3600
+    with zipfile.ZipFile(dest, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        z.writestr("raport.txt", format_report(timings, counters) + "\n\n"
+                   + stall_report(read_events(stalls, since=since)))
+        z.writestr("sistem.json", json.dumps(info, ensure_ascii=False, indent=2))
+        for p in list(paths) + stalls + [p for p in extra_files if os.path.isfile(p)]:
+            z.write(p, arcname=os.path.basename(p))
+    return dest
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Raport metrici WaitDocs (p50/p95/p99 per operație)")
+    ap.add_argument("--hours", type=float, default=24 * 7, help="fereastra de timp (ore)")
+    ap.add_argument("--name", default="", help="doar operațiile care încep cu acest prefix")
+    ap.add_argument("--by", default="", help="separă după o etichetă (ex: status, source, method)")
+    ap.add_argument("--dir", default="", help="alt folder cu metrics.jsonl (ex: din tichet)")
+    ap.add_argument("--stalls", action="store_true", help="blocajele buclei Tk (ui_watchdog), pe handler")
+    ap.add_argument("--modal", action="store_true", help="cu --stalls: include și dialogurile modale / idle")
+    ap.add_argument("--export", default="", help="scrie un ZIP pentru suport și iese")
+    args = ap.parse_args(argv)
+
+    if args.export:
+        print(f"Export: {export_bundle(args.export, hours=args.hours, folder=args.dir or None)}")
+        return
+    if args.stalls:
+        since = time.time() - args.hours * 3600
+        print(stall_report(read_events(stall_files(args.dir or None), since=since), include_modal=args.modal))
+        return
+    paths = metric_files(args.dir or None)
+    if not paths:
+        print(f"Nu există {METRICS_FILE} în {args.dir or metrics_dir()}")
+        return
+    events = read_events(paths, since=time.time() - args.hours * 3600, prefix=args.name)
+    print(format_report(*aggregate(events, args.by)))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,3 +8,14 @@ def resource_path(relpath: str) -> str:
     """
     base = getattr(sys, "_MEIPASS", os.path.abspath("."))
     return os.path.join(base, relpath)
+
+
+def user_data_dir(app_name: str = "WaitDocs") -> str:
+    """%APPDATA%/WaitDocs pe Windows, ~/.config/WaitDocs în rest (creat dacă lipsește)."""
+    if os.name == "nt":
+        base = os.getenv("APPDATA") or os.path.expanduser("~")
+    else:
+        base = os.getenv("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    path = os.path.join(base, app_name)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,151 @@
+# preview_pool.py
+from __future__ import annotations
+import heapq, itertools, threading
+from typing import Any, Callable, Optional
+
+PRIORITY_SELECTED = 0     # rândul selectat acum
+PRIORITY_PREFETCH = 10    # + distanța față de selecție (vezi prefetch)
+
+
+class PreviewTask:
+    """O lucrare din pool; aceeași cheie (URL) = o singură lucrare, cu mai mulți abonați."""
+
+    __slots__ = ("key", "priority", "cancel_event", "callbacks", "running", "done")
+
+    def __init__(self, key: str, priority: int):
+        self.key = key
+        self.priority = priority
+        self.cancel_event = threading.Event()
+        self.callbacks: list[Callable[[Any, Optional[BaseException]], None]] = []
+        self.running = False
+        self.done = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+
+class PreviewPool:
+    """
+    Pool fix de worker-e cu coadă de priorități pentru preview-uri.
+    - submit(key, priority, cb): deduplicare după key (URL) -> un singur download;
+      dacă lucrarea există deja, primește încă un callback și prioritatea minimă.
+    - cancel(key): scoate lucrarea din coadă sau, dacă rulează, setează cancel_event
+      (download_bytes îl verifică între chunk-uri și închide stream-ul HTTP).
+    - cb(result, error) e apelat pe thread-ul worker-ului; nu se apelează pentru lucrări anulate.
+    """
+
+    def __init__(self, work: Callable[[str, threading.Event], Any], workers: int = 2):
+        self.work = work
+        self._heap: list[tuple[int, int, PreviewTask]] = []
+        self._tasks: dict[str, PreviewTask] = {}
+        self._seq = itertools.count()
+        self._cv = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"preview-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for t in self._threads:
+            t.start()
+
+    # --------------- public ---------------
+
+    def submit(self, key: str, priority: int = PRIORITY_SELECTED,
+               callback: Callable[[Any, Optional[BaseException]], None] | None = None) -> PreviewTask:
+        with self._cv:
+            task = self._tasks.get(key)
+            if task is not None and not task.cancelled:
+                if callback:
+                    task.callbacks.append(callback)
+                if priority < task.priority and not task.running:
+                    task.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._seq), task))
+                    self._cv.notify()
+                return task
+
+            task = PreviewTask(key, priority)
+            if callback:
+                task.callbacks.append(callback)
+            self._tasks[key] = task
+            heapq.heappush(self._heap, (priority, next(self._seq), task))
+            self._cv.notify()
+            return task
+
+    def reprioritize(self, key: str, priority: int) -> bool:
+        """Schimbă prioritatea unei lucrări încă în coadă (în ambele sensuri)."""
+        with self._cv:
+            task = self._tasks.get(key)
+            if task is None or task.running or task.priority == priority:
+                return False
+            task.priority = priority
+            heapq.heappush(self._heap, (priority, next(self._seq), task))
+            self._cv.notify()
+            return True
+
+    def cancel(self, key: str) -> bool:
+        with self._cv:
+            task = self._tasks.pop(key, None)
+        if task is None:
+            return False
+        task.cancel_event.set()
+        return True
+
+    def cancel_where(self, pred: Callable[[PreviewTask], bool]) -> int:
+        with self._cv:
+            victims = [t for t in self._tasks.values() if pred(t)]
+            for t in victims:
+                self._tasks.pop(t.key, None)
+        for t in victims:
+            t.cancel_event.set()
+        return len(victims)
+
+    def shutdown(self):
+        with self._cv:
+            self._closed = True
+            tasks = list(self._tasks.values())
+            self._tasks.clear()
+            self._heap.clear()
+            self._cv.notify_all()
+        for t in tasks:
+            t.cancel_event.set()
+
+    # --------------- intern ---------------
+
+    def _next_task(self) -> Optional[PreviewTask]:
+        with self._cv:
+            while True:
+                if self._closed:
+                    return None
+                while self._heap:
+                    priority, _, task = heapq.heappop(self._heap)
+                    # intrări vechi (anulate / reprioritizate / deja pornite) -> ignorate
+                    if task.cancelled or task.running or task.done or priority != task.priority:
+                        continue
+                    task.running = True
+                    return task
+                self._cv.wait()
+
+    def _run(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            result, error = None, None
+            try:
+                if not task.cancelled:
+                    result = self.work(task.key, task.cancel_event)
+            except Exception as e:   # raportată abonaților
+                error = e
+            with self._cv:
+                task.done = True
+                if self._tasks.get(task.key) is task:
+                    del self._tasks[task.key]
+                callbacks = list(task.callbacks)
+            if task.cancelled:
+                continue
+            for cb in callbacks:
+                try:
+                    cb(result, error)
+                except Exception:
+                    pass
@@ -0,0 +1,135 @@
+# previews.py
+from __future__ import annotations
+import io, threading, importlib.util
+from typing import Optional, TYPE_CHECKING
+
+from thumb_cache import THUMB_SIZE
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp")
+PDF_EXT = ".pdf"
+CHUNK_SIZE = 64 * 1024
+MAX_PREVIEW_BYTES = 64 * 1024 * 1024   # peste asta nu mai facem preview în RAM
+
+# PDFium nu e thread-safe: pool-ul de preview și prefetch-ul nu randează PDF-uri în paralel
+_PDFIUM_LOCK = threading.Lock()
+
+if TYPE_CHECKING:
+    from PIL import Image   # PIL se încarcă abia la primul preview
+
+
+class PreviewError(Exception):
+    pass
+
+
+class PreviewCancelled(PreviewError):
+    pass
+
+
+def auth_headers(api) -> dict:
+    tokens = getattr(api, "tokens", None)
+    if tokens and tokens.access:
+        return {"Authorization": f"Bearer {tokens.access}"}
+    return {}
+
+
+def download_bytes(api, url: str, *, timeout: int = 30,
+                   cancel: Optional[threading.Event] = None,
+                   max_bytes: int = MAX_PREVIEW_BYTES) -> tuple[bytes, dict]:
+    """
+    Citește corpul HTTP direct într-un buffer în RAM (fără fișier temporar).
+    Întoarce (bytes, headers) cu ETag / Last-Modified pentru validare ulterioară.
+    cancel setat -> conexiunea se închide și se ridică PreviewCancelled.
+    """
+    with api.session.get(url, headers=auth_headers(api), timeout=timeout, stream=True) as r:
+        r.raise_for_status()
+        length = int(r.headers.get("Content-Length") or 0)
+        if length > max_bytes:
+            raise PreviewError(f"Fișier prea mare pentru preview ({length // (1024 * 1024)} MB).")
+        buf = io.BytesIO()
+        for chunk in r.iter_content(CHUNK_SIZE):
+            if cancel is not None and cancel.is_set():
+                raise PreviewCancelled()
+            buf.write(chunk)
+            if buf.tell() > max_bytes:
+                raise PreviewError("Fișier prea mare pentru preview.")
+        data = buf.getvalue()
+        headers = {k: r.headers[k] for k in ("ETag", "Last-Modified") if r.headers.get(k)}
+    return data, headers
+
+
+def decode_thumbnail(data: bytes, size: tuple[int, int] = THUMB_SIZE) -> Image.Image:
+    """
+    Decodează direct la rezoluție redusă: pentru JPEG, draft() cere decoderului
+    scalare DCT 1/2..1/8, deci un scan de 20 MP nu mai e decodat complet.
+    """
+    from PIL import Image
+    with Image.open(io.BytesIO(data)) as src:
+        src.draft(src.mode, size)   # no-op pentru formatele care nu suportă draft
+        src.thumbnail(size)
+        img = src.copy() if src.mode in ("RGB", "L", "RGBA", "LA", "P") else src.convert("RGB")
+    return img
+
+
+def pdf_preview_available() -> bool:
+    """Randarea PDF e opțională (pypdfium2); fără ea păstrăm mesajul text."""
+    # doar verificăm că e instalat; importul (greu) se face la primul PDF
+    return importlib.util.find_spec("pypdfium2") is not None
+
+
+def render_pdf_thumbnail(data: bytes, size: tuple[int, int] = THUMB_SIZE) -> Image.Image:
+    """Randează DOAR prima pagină, direct la rezoluția thumbnail-ului (nu la 300 dpi)."""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        raise PreviewError("Preview PDF indisponibil (lipsește pypdfium2).")
+
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(data)
+        try:
+            if len(pdf) == 0:
+                raise PreviewError("PDF fără pagini.")
+            page = pdf[0]
+            try:
+                w, h = page.get_size()   # puncte (1/72")
+                scale = min(size[0] / w, size[1] / h) if w and h else 1.0
+                img = page.render(scale=scale).to_pil()
+            finally:
+                page.close()
+        finally:
+            pdf.close()
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    return img
+
+
+def load_thumbnail(api, url: str, cache=None, *, files=None,
+                   cancel: Optional[threading.Event] = None) -> Image.Image:
+    """
+    Cache (RAM/disc) -> altfel download în RAM + decodare redusă + salvare în cache.
+    Pentru .pdf se randează prima pagină; rezultatul ajunge în același cache.
+    files (FileCache): sursă locală înaintea rețelei; bytes descărcați rămân acolo
+    pentru Deschide / Descarcă.
+    """
+    current = files.validator(url) if files is not None else None
+    if cache is not None:
+        img = cache.get(url, current)
+        if img is not None:
+            return img
+    data = files.read_bytes(url) if files is not None else None
+    if data is not None:
+        validator = current or str(len(data))
+    else:
+        data, headers = download_bytes(api, url, cancel=cancel)
+        if files is not None:
+            try:
+                files.put_bytes(url, data, headers)
+            except OSError:
+                pass
+        validator = headers.get("ETag") or headers.get("Last-Modified") or str(len(data))
+    if url.lower().split("?", 1)[0].endswith(PDF_EXT):
+        img = render_pdf_thumbnail(data)
+    else:
+        img = decode_thumbnail(data)
+    if cache is not None:
+        img = cache.put(url, img, validator)
+    return img
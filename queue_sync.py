@@ -0,0 +1,144 @@
+# queue_sync.py
+from __future__ import annotations
+import random, threading
+from typing import Callable, Optional
+
+# cheile comparate când decidem dacă un rând s-a modificat
+ROW_KEYS = ("tip", "subtip", "user", "angajat", "file", "denumire")
+
+
+def diff_rows(old: list[dict], new: list[dict]) -> dict:
+    """
+    Compară două liste de rânduri (după id) și întoarce doar diferențele:
+      {"inserted": [(index, row)], "updated": [row], "deleted": [id], "order": [id, ...]}
+    'order' = ordinea finală a id-urilor, ca UI-ul să poată muta rândurile existente.
+    """
+    old_by_id = {str(r.get("id")): r for r in old}
+    new_ids = [str(r.get("id")) for r in new]
+    new_set = set(new_ids)
+
+    inserted, updated = [], []
+    for i, r in enumerate(new):
+        rid = str(r.get("id"))
+        prev = old_by_id.get(rid)
+        if prev is None:
+            inserted.append((i, r))
+        elif any((prev.get(k) or "") != (r.get(k) or "") for k in ROW_KEYS):
+            updated.append(r)
+    deleted = [rid for rid in old_by_id if rid not in new_set]
+    return {"inserted": inserted, "updated": updated, "deleted": deleted, "order": new_ids}
+
+
+def has_changes(d: dict) -> bool:
+    return bool(d["inserted"] or d["updated"] or d["deleted"])
+
+
+class QueueSyncer:
+    """
+    Buclă de sincronizare în background pentru pagina vizibilă.
+    - fetch() -> (rows, total) rulează pe thread-ul de sync (nu pe Tk).
+    - on_changes(diff, total) e apelat doar când apare ceva nou/modificat/șters;
+      apelantul îl mută pe thread-ul Tk (after(0, ...)).
+    - Interval adaptiv: revine la min_interval după o schimbare, crește treptat
+      până la max_interval când coada e liniștită; la erori backoff exponențial cu jitter.
+    - reset(rows) stabilește baseline-ul (după load_page) și invalidează un poll în curs;
+      diff-ul poartă "gen", ca UI-ul să ignore rezultate sosite după o schimbare de pagină.
+    """
+
+    def __init__(self, fetch: Callable[[], tuple[list[dict], int]],
+                 on_changes: Callable[[dict, int], None], *,
+                 min_interval: float = 3.0, max_interval: float = 60.0,
+                 growth: float = 1.5, max_backoff: float = 300.0):
+        self.fetch = fetch
+        self.on_changes = on_changes
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.growth = growth
+        self.max_backoff = max_backoff
+
+        self.interval = min_interval
+        self.failures = 0
+        self._rows: list[dict] = []
+        self._total = 0
+        self._gen = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --------------- public ---------------
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="queue-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def poke(self):
+        """Cere un poll imediat (ex: după o salvare reușită)."""
+        self.interval = self.min_interval
+        self._wake.set()
+
+    def reset(self, rows: list[dict], total: int = 0):
+        with self._lock:
+            self._rows = list(rows)
+            self._total = total
+            self._gen += 1
+        self.interval = self.min_interval
+
+    @property
+    def generation(self) -> int:
+        return self._gen
+
+    def next_delay(self) -> float:
+        if self.failures:
+            base = min(self.max_backoff, self.min_interval * (2 ** self.failures))
+            return base * random.uniform(0.8, 1.2)
+        return self.interval
+
+    def poll_once(self) -> Optional[dict]:
+        """Un singur ciclu (folosit de buclă; util și manual). Întoarce diff-ul sau None."""
+        with self._lock:
+            gen = self._gen
+        try:
+            rows, total = self.fetch()
+        except Exception:
+            self.failures += 1
+            return None
+        self.failures = 0
+
+        with self._lock:
+            if gen != self._gen:
+                # între timp s-a schimbat pagina/căutarea -> rezultatul nu mai e relevant
+                return None
+            d = diff_rows(self._rows, rows)
+            d["gen"] = gen
+            changed = has_changes(d) or total != self._total or \
+                [str(r.get("id")) for r in self._rows] != d["order"]
+            self._rows = list(rows)
+            self._total = total
+
+        if changed:
+            self.interval = self.min_interval
+            try:
+                self.on_changes(d, total)
+            except Exception:
+                pass
+            return d
+        self.interval = min(self.max_interval, self.interval * self.growth)
+        return None
+
+    # --------------- intern ---------------
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.next_delay())
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.poll_once()
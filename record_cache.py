@@ -0,0 +1,119 @@
+# record_cache.py
+from __future__ import annotations
+import time, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+RECORD_TTL_SEC = 120     # după cât timp un record e considerat vechi
+RECORD_MAX_ITEMS = 256
+
+
+class RecordCache:
+    """
+    Cache per id pentru GET /waitdocument/?id=<id>.
+    - get(id): record proaspăt din cache sau None (fără rețea);
+    - fetch_async(id, cb): cb(record, err) pe thread-ul worker-ului; cererile
+      simultane pentru același id se unesc într-un singur request;
+    - warm(ids): preîncarcă în background rândurile paginii curente;
+    - etag(id): ETag-ul versiunii din cache (precondiție If-Match la salvare).
+    Fiecare put() primește o generație: un GET pornit înainte de un put() (ex: prefill
+    întârziat peste salvarea optimistă) nu mai suprascrie record-ul / ETag-ul mai nou.
+    """
+
+    def __init__(self, api, *, ttl: float = RECORD_TTL_SEC, max_items: int = RECORD_MAX_ITEMS,
+                 workers: int = 2):
+        self.api = api
+        self.ttl = ttl
+        self.max_items = max_items
+        self._items: "OrderedDict[str, tuple[float, dict, Optional[str], int]]" = OrderedDict()
+        self._gen = 0
+        self._inflight: dict[str, list[Callable[[Optional[dict], Optional[Exception]], None]]] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="records")
+
+    # --------------- public ---------------
+
+    def get(self, doc_id: Any) -> Optional[dict]:
+        key = str(doc_id)
+        with self._lock:
+            item = self._items.get(key)
+            if not item:
+                return None
+            ts, rec = item[0], item[1]
+            if time.time() - ts > self.ttl:
+                return None
+            self._items.move_to_end(key)
+            return rec
+
+    def etag(self, doc_id: Any) -> Optional[str]:
+        with self._lock:
+            item = self._items.get(str(doc_id))
+            return item[2] if item else None
+
+    def put(self, doc_id: Any, record: dict, etag: Optional[str] = None):
+        with self._lock:
+            self._store(str(doc_id), record, etag)
+
+    def invalidate(self, doc_id: Any):
+        with self._lock:
+            self._items.pop(str(doc_id), None)
+
+    def fetch_async(self, doc_id: Any,
+                    callback: Callable[[Optional[dict], Optional[Exception]], None] | None = None,
+                    *, force: bool = False):
+        key = str(doc_id)
+        if not force:
+            rec = self.get(key)
+            if rec is not None:
+                if callback:
+                    callback(rec, None)
+                return
+        with self._lock:
+            waiters = self._inflight.get(key)
+            if waiters is not None:
+                if callback:
+                    waiters.append(callback)
+                return
+            self._inflight[key] = [callback] if callback else []
+        self._pool.submit(self._load, key)
+
+    def warm(self, ids):
+        for doc_id in ids:
+            if doc_id not in (None, "") and self.get(doc_id) is None:
+                self.fetch_async(doc_id)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # --------------- intern ---------------
+
+    def _store(self, key: str, record: dict, etag: Optional[str]):
+        self._gen += 1
+        self._items[key] = (time.time(), record, etag, self._gen)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def _load(self, key: str):
+        rec, err = None, None
+        with self._lock:
+            started = self._gen
+        try:
+            resp, headers = self.api.request_with_headers("GET", "/waitdocument/", params={"id": key})
+            rec = resp if isinstance(resp, dict) else {}
+            with self._lock:
+                item = self._items.get(key)
+                if item is not None and item[3] > started:
+                    rec = item[1]   # put() în timpul GET-ului (salvare): răspunsul e mai vechi
+                else:
+                    self._store(key, rec, headers.get("ETag"))
+        except Exception as e:
+            err = e
+        with self._lock:
+            waiters = self._inflight.pop(key, [])
+        for cb in waiters:
+            try:
+                cb(rec, err)
+            except Exception:
+                pass
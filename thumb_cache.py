@@ -0,0 +1,172 @@
+# thumb_cache.py
+from __future__ import annotations
+import os, io, time, hashlib, sqlite3, threading
+from collections import OrderedDict
+from typing import Optional, TYPE_CHECKING
+
+from paths import user_data_dir
+
+if TYPE_CHECKING:
+    from PIL import Image   # PIL se încarcă abia la primul thumbnail
+
+THUMB_SIZE = (300, 300)
+DISK_CAP_BYTES = 200 * 1024 * 1024   # ~200 MB pe disc
+MEMORY_ITEMS = 64                    # thumbnail-uri ținute în RAM
+
+
+def _thumbs_dir() -> str:
+    path = os.path.join(user_data_dir(), "thumbs")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def thumb_key(url: str, validator: str | int | None) -> str:
+    """Cheie content-addressed: sha256(url | ETag sau dimensiune)."""
+    return hashlib.sha256(f"{url}|{validator or ''}".encode("utf-8")).hexdigest()
+
+
+class ThumbCache:
+    """
+    Cache de thumbnail-uri pe două niveluri:
+      - RAM: LRU mărginit (MEMORY_ITEMS) de imagini PIL deja micșorate;
+      - disc: fișiere <sha256>.jpg/.png în user data dir, cu index SQLite
+        (url -> cheie, validator, mărime, ultima accesare) și plafon LRU pe bytes.
+    get(url) nu face niciun request: la restart preview-ul vine direct de pe disc.
+    Validatorul (ETag / Last-Modified / Content-Length) e păstrat lângă thumbnail;
+    get(url, validator) cu validatorul curent din FileCache ratează (și șterge) thumbnail-ul
+    unui fișier înlocuit pe server sub același URL.
+    Thread-safe (folosit din worker-ele de preview).
+    """
+
+    def __init__(self, directory: str | None = None, *,
+                 disk_cap_bytes: int = DISK_CAP_BYTES, memory_items: int = MEMORY_ITEMS):
+        self.dir = directory or _thumbs_dir()
+        os.makedirs(self.dir, exist_ok=True)
+        self.disk_cap_bytes = disk_cap_bytes
+        self.memory_items = memory_items
+        self._mem: "OrderedDict[str, Image.Image]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(os.path.join(self.dir, "index.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS thumbs ("
+            " url TEXT PRIMARY KEY, key TEXT NOT NULL, validator TEXT, fname TEXT NOT NULL,"
+            " bytes INTEGER NOT NULL, atime REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_thumbs_atime ON thumbs(atime)")
+        self._db.commit()
+
+    # --------------- public ---------------
+
+    def get(self, url: str, validator: str | int | None = None) -> Optional[Image.Image]:
+        """
+        Thumbnail din RAM sau de pe disc (fără rețea); None dacă lipsește.
+        validator = versiunea curentă cunoscută (ex: FileCache.validator); dacă diferă de cea
+        a thumbnail-ului, acesta e învechit -> șters, None.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT fname, validator FROM thumbs WHERE url=?", (url,)).fetchone()
+            stale = row is not None and validator is not None and row[1] != str(validator)
+            img = None if stale else self._mem.get(url)
+            if img is not None:
+                self._mem.move_to_end(url)
+                return img
+        if stale:
+            self.discard(url)
+            return None
+        if not row:
+            return None
+        path = os.path.join(self.dir, row[0])
+        try:
+            from PIL import Image
+            with Image.open(path) as f:
+                img = f.copy()
+        except Exception:
+            self.discard(url)
+            return None
+        with self._lock:
+            self._db.execute("UPDATE thumbs SET atime=? WHERE url=?", (time.time(), url))
+            self._db.commit()
+            self._remember(url, img)
+        return img
+
+    def put(self, url: str, img: Image.Image, validator: str | int | None = None) -> Image.Image:
+        """Micșorează (dacă e nevoie), salvează pe disc + RAM și întoarce thumbnail-ul."""
+        if img.width > THUMB_SIZE[0] or img.height > THUMB_SIZE[1]:
+            img = img.copy()
+            img.thumbnail(THUMB_SIZE)
+        if img.mode not in ("RGB", "L", "RGBA", "LA", "P"):
+            img = img.convert("RGB")   # ex: JPEG CMYK din scanner
+        key = thumb_key(url, validator)
+        buf = io.BytesIO()
+        if img.mode in ("RGB", "L"):
+            img.save(buf, format="JPEG", quality=85, optimize=True)
+            fname = key + ".jpg"
+        else:
+            img.save(buf, format="PNG", optimize=True)
+            fname = key + ".png"
+        data = buf.getvalue()
+
+        path = os.path.join(self.dir, fname)
+        tmp = path + ".part"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            old = self._db.execute("SELECT fname FROM thumbs WHERE url=?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT INTO thumbs(url, key, validator, fname, bytes, atime) VALUES (?,?,?,?,?,?) "
+                "ON CONFLICT(url) DO UPDATE SET key=excluded.key, validator=excluded.validator, "
+                "fname=excluded.fname, bytes=excluded.bytes, atime=excluded.atime",
+                (url, key, None if validator is None else str(validator), fname, len(data), time.time()),
+            )
+            self._db.commit()
+            if old and old[0] != fname:
+                self._unlink(old[0])
+            self._remember(url, img)
+            self._evict_disk()
+        return img
+
+    def discard(self, url: str):
+        with self._lock:
+            self._mem.pop(url, None)
+            row = self._db.execute("SELECT fname FROM thumbs WHERE url=?", (url,)).fetchone()
+            self._db.execute("DELETE FROM thumbs WHERE url=?", (url,))
+            self._db.commit()
+        if row:
+            self._unlink(row[0])
+
+    def disk_usage(self) -> int:
+        with self._lock:
+            return int(self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM thumbs").fetchone()[0])
+
+    # --------------- intern ---------------
+
+    def _remember(self, url: str, img: Image.Image):
+        self._mem[url] = img
+        self._mem.move_to_end(url)
+        while len(self._mem) > self.memory_items:
+            self._mem.popitem(last=False)
+
+    def _evict_disk(self):
+        total = self.disk_usage()
+        if total <= self.disk_cap_bytes:
+            return
+        victims = []
+        for url, fname, size in self._db.execute("SELECT url, fname, bytes FROM thumbs ORDER BY atime ASC"):
+            victims.append((url, fname))
+            total -= size
+            if total <= self.disk_cap_bytes:
+                break
+        self._db.executemany("DELETE FROM thumbs WHERE url=?", [(u,) for u, _ in victims])
+        self._db.commit()
+        for url, fname in victims:
+            self._mem.pop(url, None)
+            self._unlink(fname)
+
+    def _unlink(self, fname: str):
+        try:
+            os.remove(os.path.join(self.dir, fname))
+        except OSError:
+            pass
@@ -0,0 +1,149 @@
+# ui_watchdog.py
+from __future__ import annotations
+import os, sys, json, time, threading, traceback
+from collections import Counter
+from typing import Optional
+
+import metrics
+
+STALLS_FILE = "stalls.jsonl"
+MAX_SAMPLES = 50                 # câte stive păstrăm pentru un singur blocaj
+MAX_FILE_BYTES = 1024 * 1024     # stalls.jsonl -> stalls.jsonl.1 peste 1 MB
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_SELF = os.path.abspath(__file__)
+# blocaje „voite”: dialoguri modale care rulează propria buclă (ex: messagebox nativ pe Windows)
+_MODAL_MARKERS = ("messagebox.py", "simpledialog.py", "filedialog.py", "commondialog.py")
+
+
+def _is_app_frame(filename: str) -> bool:
+    if filename.startswith("<"):
+        return False   # <frozen ...>, <string>
+    path = os.path.abspath(filename)
+    return path.startswith(_APP_DIR) and path != _SELF
+
+
+def _where(fs: traceback.FrameSummary) -> str:
+    return f"{os.path.basename(fs.filename)}:{fs.name}:{fs.lineno}"
+
+
+def _is_tk_dispatch(fs: traceback.FrameSummary) -> bool:
+    """Cadrul prin care Tk apelează un callback Python (command=, bind, after)."""
+    return fs.name in ("__call__", "callit") and \
+        os.path.basename(os.path.dirname(fs.filename)) == "tkinter"
+
+
+def _handler(stack: list[traceback.FrameSummary]) -> str:
+    """Callback-ul Tk care blochează: primul cadru din aplicație după ultimul dispatch Tk."""
+    start = 0
+    for i, fs in enumerate(stack):
+        if _is_tk_dispatch(fs):
+            start = i + 1
+    for fs in stack[start:]:
+        if _is_app_frame(fs.filename):
+            return f"{os.path.basename(fs.filename)}:{fs.name}"
+    return "?"
+
+
+class StallWatchdog:
+    """
+    Detector de blocaje ale buclei Tk:
+    - pe thread-ul Tk, un after() periodic notează ultima „bătaie”;
+    - un thread monitor vede când bătaia întârzie peste prag și eșantionează stiva
+      thread-ului principal (sys._current_frames) cât timp durează blocajul;
+    - la revenire: durata + handler-ul Tk care a blocat (primul cadru din aplicație de sub
+      tkinter) + locul cel mai des întâlnit în eșantioane -> stalls.jsonl și metrica ui.stall.
+    Raportul: python metrics_view.py --stalls
+    """
+
+    def __init__(self, root, *, threshold_ms: int = 200, interval_ms: int = 100,
+                 path: str | None = None):
+        self.root = root
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+        self.path = path or os.path.join(metrics.metrics_dir(), STALLS_FILE)
+        self._beat = time.perf_counter()
+        self._after_id: Optional[str] = None
+        self._stop = threading.Event()
+        self._main_ident = threading.main_thread().ident
+
+    # --------------- public ---------------
+
+    def start(self) -> "StallWatchdog":
+        self._beat = time.perf_counter()
+        self._after_id = self.root.after(int(self.interval * 1000), self._tick)
+        threading.Thread(target=self._monitor, daemon=True, name="ui-watchdog").start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    # --------------- intern ---------------
+
+    def _tick(self):
+        self._beat = time.perf_counter()
+        if not self._stop.is_set():
+            self._after_id = self.root.after(int(self.interval * 1000), self._tick)
+
+    def _monitor(self):
+        poll = self.interval / 2
+        while not self._stop.wait(poll):
+            beat = self._beat
+            due = beat + self.interval
+            if time.perf_counter() - due < self.threshold:
+                continue
+            # blocaj în curs: eșantionăm până la următoarea bătaie
+            samples: list[list[traceback.FrameSummary]] = []
+            while self._beat == beat and not self._stop.is_set():
+                if len(samples) < MAX_SAMPLES:
+                    stack = self._main_stack()
+                    if stack:
+                        samples.append(stack)
+                time.sleep(poll)
+            if self._stop.is_set():
+                return
+            self._report((self._beat - due) * 1000.0, samples)
+
+    def _main_stack(self) -> list[traceback.FrameSummary]:
+        frame = sys._current_frames().get(self._main_ident)
+        return traceback.extract_stack(frame) if frame is not None else []
+
+    def _report(self, ms: float, samples: list[list[traceback.FrameSummary]]):
+        handler, hotspot, modal = "?", "?", False
+        if samples:
+            first = samples[0]
+            modal = any(os.path.basename(fs.filename) in _MODAL_MARKERS for fs in first)
+            handler = _handler(first)
+            spots = Counter()
+            for stack in samples:
+                inner = [fs for fs in stack if _is_app_frame(fs.filename)]
+                spots[_where(inner[-1] if inner else stack[-1])] += 1
+            hotspot = spots.most_common(1)[0][0]
+        # modal = dialog care așteaptă operatorul; idle = bucla Tk stătea (ex: sistem în sleep)
+        kind = "modal" if modal else ("idle" if handler == "?" else "stall")
+        metrics.observe("ui.stall", ms, handler=handler, kind=kind)
+        event = {
+            "ts": round(time.time(), 3),
+            "ms": round(ms, 1),
+            "kind": kind,
+            "handler": handler,
+            "hotspot": hotspot,
+            "samples": len(samples),
+            "stack": [_where(fs) for fs in samples[0]][-25:] if samples else [],
+        }
+        self._write(event)
+
+    def _write(self, event: dict):
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) > MAX_FILE_BYTES:
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
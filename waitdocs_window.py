@@ -3,48 +3,77 @@ import math
 import json
 import os
 import re
-import tempfile
-import urllib.parse
+import shutil
 import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Optional, Callable
 
-from PIL import Image, ImageTk
-
+import metrics
 from api import ApiClient, ApiError
-from config import API_BASE, MEDIA_URL
+from config import API_BASE, MEDIA_URL, LOCAL_MIRROR
+from local_mirror import LocalMirror
+from queue_sync import QueueSyncer
+from thumb_cache import ThumbCache
+from file_cache import FileCache
+from download_manager import DownloadManager, DownloadCancelled
+from bulk_export import export_documents, ExportCancelled
+from record_cache import RecordCache
+from cie_batch import (BatchIntake, DocMatcher, EV_READING, EV_MATCHED, EV_AMBIGUOUS,
+                       EV_UNMATCHED, EV_ERROR, EV_REMOVED)
+from doc_model import DateRecord, payload_diff, is_noop
+from cie_mapping import (map_raw, dmy_parts, dmy_to_iso as _dmy_to_iso, iso_to_dmy as _iso_to_dmy,
+                         only_digits as _only_digits)
+from previews import IMAGE_EXTS, PDF_EXT, load_thumbnail, pdf_preview_available, PreviewCancelled
+from preview_pool import PreviewPool, PRIORITY_SELECTED, PRIORITY_PREFETCH
 from paths import resource_path
 
-# pentru PIN + citire CIE
-from cie_integration import prompt_pin_modal, CIEReadError  # noqa: F401
-from cie_reader_core import read_all
+# PIL și stiva CIE (PyKCS11, cryptography, smartcard) se importă leneș: la primul
+# preview / prima scanare (sau mai devreme, în fundal, vezi app._prewarm_imports)
 
 PAGE_SIZE = 10
 
 
 # ---------------- helpers ----------------
 
-def _dmy_to_iso(dmy: str) -> str | None:
-    """DD.MM.YYYY -> YYYY-MM-DD (or return original if format not matched)."""
-    if not dmy:
-        return None
-    m = re.match(r"^\s*(\d{2})[.\-/](\d{2})[.\-/](\d{4})\s*$", dmy)
-    if not m:
-        return dmy
-    return f"{m.group(3)}-{m.group(2)}-{m.group(1)}"
-
-
-def _iso_to_dmy(iso: str | None) -> str:
-    """YYYY-MM-DD -> DD.MM.YYYY (safe)."""
-    if not iso:
-        return ""
-    m = re.match(r"^\s*(\d{4})-(\d{2})-(\d{2})", str(iso))
-    return f"{m.group(3)}.{m.group(2)}.{m.group(1)}" if m else str(iso or "")
-
-
-def _only_digits(s: str) -> str:
-    return "".join(ch for ch in (s or "") if ch.isdigit())
+def _row_values(r: dict) -> tuple:
+    """Valorile afișate în Treeview pentru un rând din fetch_page."""
+    fname = r.get("denumire") or (r.get("file").split("/")[-1] if r.get("file") else "")
+    return (r["id"], r["tip"], r["subtip"], r["user"], r["angajat"], fname)
+
+
+def _apply_ci_fields(base: DateRecord, *, emis: str, serie: str, numar: str,
+                     expira_dmy: str, data_dmy: str) -> DateRecord:
+    """Scrie în base.ci câmpurile din formular (seria/numărul, expirarea, emiterea, emitentul)."""
+    serie = (serie or "").strip().upper()
+    numar = _only_digits(numar)
+    ex_y, ex_m, ex_d = dmy_parts((expira_dmy or "").strip())
+
+    ci = base.ci
+    ci.seria = serie
+    ci.numarul = numar
+    ci.id = f"{serie}{numar}".strip()
+    ci.an_ex = ex_y
+    ci.luna_ex = ex_m
+    ci.zi_ex = ex_d
+    ci.data_emiterii = (_dmy_to_iso((data_dmy or "").strip()) or "")
+    ci.eliberat = (emis or "").strip()  # IMPORTANT: emis și în 'date'
+    return base
+
+
+def _build_save_payload(doc_id, date_rec: DateRecord, *, emis: str, expira_dmy: str,
+                        data_dmy: str, numar: str, observatii: str) -> dict:
+    """Payload-ul PUT /waitdocument/ (folosit de EditDialog și de preluarea CIE în lot)."""
+    return {
+        "id": int(doc_id),
+        "emis": (emis or "").strip(),                 # top-level
+        "expira": _dmy_to_iso((expira_dmy or "").strip()) or None,
+        "data": _dmy_to_iso((data_dmy or "").strip()) or None,
+        "nr": _only_digits(numar),
+        "observatii": (observatii or "").strip(),
+        "date": date_rec.to_server(),   # singura encodare JSON din salvare
+    }
 
 
 # ---------------- edit dialog ----------------
@@ -55,10 +84,17 @@ class EditDialog(tk.Toplevel):
     - Buton 'Scanează CIE' pornește citirea în background și afișează un loader.
     - La Save: PUT /waitdocument/ cu emis (top-level), expira (ISO), data (ISO),
       nr (doar cifre), observatii și 'date' (JSON string) care include și ci.eliberat.
-    - La deschidere: preumple din GET /waitdocument/?id=<id> (dacă există).
+    - La deschidere: se afișează imediat; câmpurile se preumplu asincron din
+      GET /waitdocument/?id=<id> (sau instant, din RecordCache, dacă e deja încărcat);
+      Salvează rămâne dezactivat până sosesc datele (sau eșuează încărcarea / se scanează un card).
+    - La Save se trimit doar câmpurile schimbate față de versiunea încărcată;
+      fără modificări nu se trimite nimic.
     """
-    def __init__(self, master, row_data: dict, on_saved_reload=None, api: ApiClient | None = None):
+    def __init__(self, master, row_data: dict, on_saved_reload=None, api: ApiClient | None = None,
+                 records: RecordCache | None = None,
+                 on_save: Optional[Callable[..., None]] = None):
         super().__init__(master)
+        self._open_span = metrics.span("ui.dialog_to_prefill")   # deschidere -> câmpuri preumplute
         self.title("Editează document")
         self.resizable(False, False)
         self.configure(bg="#f5f6f8")
@@ -70,7 +106,13 @@ class EditDialog(tk.Toplevel):
         self.row_data = row_data            # din tabel
         self.on_saved_reload = on_saved_reload
         self.api = api                      # pentru apelurile GET/PUT
-        self._date_payload = None           # vine din scanare (date complet structurat)
+        self.records = records              # cache per id pentru GET /waitdocument/
+        self.on_save = on_save              # salvare asincronă (fereastra principală face PUT-ul)
+        self._date_payload: DateRecord | None = None   # 'date' curent (din scanare sau din server)
+        self._date_loaded: DateRecord | None = None    # 'date' așa cum a venit de pe server
+        self._loaded: dict | None = None                # record-ul de pe server (pentru diff la salvare)
+        self._load_failed = False                       # GET-ul de prefill a eșuat (confirmat)
+        self._scanned = False                           # formular completat dintr-un card
         self._loader = None
         self._loader_bar = None
 
@@ -151,12 +193,15 @@ class EditDialog(tk.Toplevel):
 
         ttk.Separator(frm).grid(row=9, column=0, columnspan=2, sticky="ew", pady=(6, 10))
 
+        self.status_lbl = ttk.Label(frm, text="", foreground="#666")
+        self.status_lbl.grid(row=10, column=0, sticky="w")
+
         btns = ttk.Frame(frm)
-        btns.grid(row=10, column=0, columnspan=2, sticky="e")
+        btns.grid(row=10, column=1, sticky="e")
         self.scan_btn = ttk.Button(btns, text="Scanează CIE", command=self.run_scan)
         self.scan_btn.pack(side="left")
-        ttk.Button(btns, text="Salvează", style="Accent.TButton", command=self.save_and_close)\
-            .pack(side="left", padx=(8, 0))
+        self.save_btn = ttk.Button(btns, text="Salvează", style="Accent.TButton", command=self.save_and_close)
+        self.save_btn.pack(side="left", padx=(8, 0))
         ttk.Button(btns, text="Închide", command=self.destroy).pack(side="left", padx=(8, 0))
 
         # Preumple din API, dacă există date
@@ -201,43 +246,82 @@ class EditDialog(tk.Toplevel):
 
     # ---------- prefill din server ----------
     def _prefill_existing(self):
-        """GET /waitdocument/?id=<id> și completează câmpurile dacă există."""
+        """
+        Preumple din cache (instant) sau din GET /waitdocument/?id=<id> în background.
+        Cât se încarcă, Salvează e dezactivat: fără record-ul de pe server salvarea ar fi
+        un PUT complet care golește 'date' și observațiile existente.
+        """
         if not self.api:
             return
         doc_id = self.row_data.get("id")
         if not doc_id:
             return
-        try:
+        if self.records is not None:
+            cached = self.records.get(doc_id)
+            if cached is not None:
+                self._apply_prefill(cached)
+                self._open_span.end(source="cache")
+                return
+
+        self.status_lbl.configure(text="Se încarcă datele…")
+        self.save_btn.state(["disabled"])
+
+        def done(resp, err):
+            def apply():
+                if not self.winfo_exists():
+                    return
+                if err is None and resp:
+                    self.status_lbl.configure(text="")
+                    self._apply_prefill(resp)
+                    self._open_span.end(source="net")
+                else:
+                    self._load_failed = True
+                    self.status_lbl.configure(text="Datele documentului nu s-au putut încărca.")
+                    self._open_span.end(ok=False)
+                self.save_btn.state(["!disabled"])
             try:
-                resp = self.api.request("GET", "/waitdocument/", params={"id": doc_id})
-            except TypeError:
-                resp = self.api.request("GET", f"/waitdocument/?id={doc_id}")
-        except Exception:
-            return  # nu stricăm UI-ul dacă nu vine răspuns
+                self.after(0, apply)
+            except Exception:
+                pass  # dialogul a fost închis între timp
+
+        if self.records is not None:
+            self.records.fetch_async(doc_id, done)
+            return
+
+        def fetch():
+            # fără cache partajat: un singur GET, fără pool propriu
+            try:
+                resp, _headers = self.api.request_with_headers("GET", "/waitdocument/", params={"id": doc_id})
+                done(resp if isinstance(resp, dict) else None, None)
+            except Exception as e:
+                done(None, e)
+
+        threading.Thread(target=fetch, daemon=True).start()
+
+    def _set_if_empty(self, var: tk.StringVar, value: str):
+        """Nu suprascriem ce a apucat operatorul să scrie (sau să scaneze) cât s-a încărcat prefill-ul."""
+        if not (var.get() or "").strip():
+            var.set(value)
 
-        # expira în DD.MM.YYYY
+    def _apply_prefill(self, resp: dict):
+        # 'date' e decodat o singură dată, apoi folosit peste tot
+        date_rec = DateRecord.from_server(resp.get("date"))
+        self._date_loaded = date_rec
+        self._loaded = resp
+        ci = date_rec.ci
+
+        # expira în DD.MM.YYYY (fallback din date.ci)
         exp_dmy = _iso_to_dmy(resp.get("expira"))
-        # fallback din date.ci
-        ci = {}
-        try:
-            date_obj = resp.get("date")
-            if isinstance(date_obj, str):
-                date_obj = json.loads(date_obj or "{}")
-            ci = (date_obj or {}).get("ci") or {}
-            if not exp_dmy and ci:
-                y, m, d = (ci.get("an_ex"), ci.get("luna_ex"), ci.get("zi_ex"))
-                if y and m and d:
-                    exp_dmy = _iso_to_dmy(f"{y}-{str(m).zfill(2)}-{str(d).zfill(2)}")
-        except Exception:
-            pass
-        self.expira_var.set(exp_dmy or "")
+        if not exp_dmy and ci.an_ex and ci.luna_ex and ci.zi_ex:
+            exp_dmy = _iso_to_dmy(f"{ci.an_ex}-{ci.luna_ex.zfill(2)}-{ci.zi_ex.zfill(2)}")
+        self._set_if_empty(self.expira_var, exp_dmy or "")
 
         # emis (top-level)
-        self.emis_var.set(resp.get("emis") or (ci.get("eliberat") if ci else "").strip())
+        self._set_if_empty(self.emis_var, resp.get("emis") or ci.eliberat.strip())
 
         # serie / număr
-        serie_val = ((ci.get("seria") if ci else "") or "").upper()
-        numar_val = _only_digits((ci.get("numarul") if ci else "") or "")
+        serie_val = ci.seria.upper()
+        numar_val = _only_digits(ci.numarul)
         if not numar_val:
             # derivă din nr top-level (ex: "VN175774")
             nr_top = resp.get("nr") or ""
@@ -246,155 +330,66 @@ class EditDialog(tk.Toplevel):
                 if not serie_val:
                     serie_val = (m.group(1) or "").upper()
                 numar_val = m.group(2)
-        self.serie_var.set(serie_val)
-        self.numar_var.set(numar_val)
+        self._set_if_empty(self.serie_var, serie_val)
+        self._set_if_empty(self.numar_var, numar_val)
 
         # data eliberării
-        data_iso = resp.get("data") or (ci.get("data_emiterii") if ci else "")
-        self.data_var.set(_iso_to_dmy(data_iso))
+        data_iso = resp.get("data") or ci.data_emiterii
+        self._set_if_empty(self.data_var, _iso_to_dmy(data_iso))
 
         # observatii
         obs = resp.get("observatii") or ""
-        if obs:
+        if obs and not self.obs_txt.get("1.0", "end").strip():
             self.obs_txt.delete("1.0", "end")
             self.obs_txt.insert("1.0", str(obs))
 
         # păstrează și 'date' pentru eventuale alte câmpuri (nume, adresă etc.)
-        try:
-            self._date_payload = json.loads(resp.get("date")) if isinstance(resp.get("date"), str) else (resp.get("date") or None)
-        except Exception:
-            self._date_payload = None
-
-    # ---------- map raw -> fields ----------
-    def _map_raw_to_fields(self, raw: dict) -> dict:
-        # --- helpers ---
-        def _split_series_number(doc_number: str):
-            if not doc_number:
-                return "", ""
-            m = re.match(r"^\s*([A-Za-z]{1,3})?\s*([0-9]{3,})\s*$", str(doc_number))
-            if m:
-                return (m.group(1) or "").upper(), m.group(2)
-            letters = "".join(ch for ch in str(doc_number) if ch.isalpha()).upper()
-            digits  = "".join(ch for ch in str(doc_number) if ch.isdigit())
-            return letters, digits
-
-        def _birth_from_cnp(cnp: str):
-            cnp = "".join(ch for ch in (cnp or "") if ch.isdigit())
-            if len(cnp) != 13:
-                return "", "", "", ""
-            s = int(cnp[0])
-            yy = int(cnp[1:3]); mm = cnp[3:5]; dd = cnp[5:7]
-            if s in (1,2): century = 1900
-            elif s in (3,4): century = 1800
-            else: century = 2000
-            sex = "H" if s in (1,3,5,7) else "F" if s in (2,4,6,8) else ""
-            return sex, f"{century+yy}", mm, dd
-
-        # --- nume/cnp/sex/naștere (cheile din read_all) ---
-        surname = (raw.get("surname") or "").strip()
-        given   = (raw.get("givenName") or "").strip()
-
-        cnp = (raw.get("personal_identification_number") or "").strip()
-
-        sex_raw  = (raw.get("sex") or "").strip().upper()  # 'M'/'F'
-        sex_conv = {"M": "H", "F": "F"}.get(sex_raw, "")
-
-        birth_dmy = (raw.get("birthdate") or "").strip()   # DD.MM.YYYY
-        an = luna = zi = ""
-        if birth_dmy:
-            birth_iso = _dmy_to_iso(birth_dmy) or ""
-            if birth_iso and len(birth_iso.split("-")) == 3:
-                an, luna, zi = birth_iso.split("-")
-        if not an:
-            sex_cnp, an, luna, zi = _birth_from_cnp(cnp)
-            if not sex_conv and sex_cnp:
-                sex_conv = sex_cnp
-
-        # --- document ---
-        issuer  = (raw.get("issuer") or "").strip()
-        doc_no  = (raw.get("document_number") or "").strip()
-        serie, numar = _split_series_number(doc_no)
-
-        issuing_dmy = (raw.get("issuing_date") or "").strip()      # DD.MM.YYYY
-        expiry_dmy  = (raw.get("expiration_date") or "").strip()   # DD.MM.YYYY
-        issuing_iso = _dmy_to_iso(issuing_dmy) or ""
-        expiry_iso  = _dmy_to_iso(expiry_dmy) or ""
-
-        an_ex = luna_ex = zi_ex = ""
-        if expiry_iso and len(expiry_iso.split("-")) == 3:
-            an_ex, luna_ex, zi_ex = expiry_iso.split("-")
-
-        # --- adresă ---
-        doms = raw.get("domiciliu_struct") or {}
-        dom  = raw.get("domicile") or {}
-
-        judet      = (doms.get("judet") or dom.get("county") or "").strip().upper()
-        localitate = (doms.get("localitate") or dom.get("locality") or "").strip().upper()
-        adresa2    = (doms.get("rest") or dom.get("street") or dom.get("text") or "").strip()
-
-        # --- observatii ---
-        observatii = f"Nume:  {surname}  {given}".strip()
-
-        # --- payload 'date' ---
-        date_payload = {
-            "nume": surname,
-            "prenume": given,
-            "cnp": cnp,
-            "sex": sex_conv,       # 'H' / 'F'
-            "an": an,
-            "luna": luna,
-            "zi": zi,
-            "ci": {
-                "seria": serie,
-                "numarul": numar,
-                "id": f"{serie}{numar}".strip(),
-                "an_ex": an_ex,
-                "luna_ex": luna_ex,
-                "zi_ex": zi_ex,
-                "data_emiterii": issuing_iso or "",
-                "eliberat": issuer,
-            },
-            "judet": judet,
-            "localitatea": localitate,
-            "adresa2": adresa2,
-        }
-
-        # --- valori pentru UI ---
-        return {
-            "emis": issuer,
-            "expira": expiry_dmy or (expiry_iso and _iso_to_dmy(expiry_iso)) or "",
-            "serie": serie,
-            "numar": numar,
-            "data": issuing_dmy or (issuing_iso and _iso_to_dmy(issuing_iso)) or "",
-            "observatii": observatii,
-            "date_payload": date_payload,
-        }
+        if self._date_payload is None:   # altfel între timp a venit o scanare CIE, mai nouă
+            self._date_payload = date_rec.copy()
 
     # ---------- scan (with loader + thread) ----------
     def run_scan(self):
         """Dialog PIN + citire card în background + populare câmpuri."""
+        try:
+            from cie_integration import prompt_pin_modal
+            from cie_reader_core import read_all
+        except ImportError as e:
+            messagebox.showerror("Citire CIE", f"Componentele pentru citirea CIE lipsesc:\n{e}", parent=self)
+            return
+
         pin = prompt_pin_modal(self, "")
         if not pin:
             return
 
         self.scan_btn.configure(state="disabled")
         self._show_loader("Se scanează CIE...")
+        scan = metrics.span("ui.scan_to_fields")   # PIN introdus -> câmpuri completate
 
         def worker():
             try:
                 raw = read_all(pin)                 # citire CIE
-                mapped = self._map_raw_to_fields(raw)
-                self.after(0, lambda: self._on_scan_done(mapped))
+                mapped = map_raw(raw)
+                self.after(0, lambda: self._on_scan_done(mapped, scan))
             except Exception as e:
-                self.after(0, lambda: self._on_scan_fail(e))
+                self.after(0, lambda: self._on_scan_fail(e, scan))
 
         threading.Thread(target=worker, daemon=True).start()
 
-    def _on_scan_done(self, mapped: dict):
+    def _on_scan_done(self, mapped: dict, scan: metrics.Span | None = None):
         self._hide_loader()
         self.scan_btn.configure(state="normal")
+        self._fill_from_scan(mapped)
+        if scan is not None:
+            scan.end()
+        messagebox.showinfo("Scanare reușită",
+                            "Câmpurile au fost completate automat din CIE.",
+                            parent=self)
 
-        self._date_payload = mapped.get("date_payload")
+    def _fill_from_scan(self, mapped: dict):
+        """Completează formularul din datele mapate ale unui card (scanare sau preluare în lot)."""
+        self._date_payload = DateRecord.from_dict(mapped.get("date_payload"))
+        self._scanned = True
+        self.save_btn.state(["!disabled"])   # datele cardului pot fi salvate și fără prefill
         self.emis_var.set(mapped.get("emis", ""))
         self.expira_var.set(mapped.get("expira", ""))
         self.serie_var.set(mapped.get("serie", ""))
@@ -404,75 +399,31 @@ class EditDialog(tk.Toplevel):
         if mapped.get("observatii"):
             self.obs_txt.insert("1.0", mapped["observatii"])
 
-        messagebox.showinfo("Scanare reușită",
-                            "Câmpurile au fost completate automat din CIE.",
-                            parent=self)
-
-    def _on_scan_fail(self, err: Exception):
+    def _on_scan_fail(self, err: Exception, scan: metrics.Span | None = None):
+        if scan is not None:
+            scan.end(ok=False, error=type(err).__name__)
         self._hide_loader()
         self.scan_btn.configure(state="normal")
         messagebox.showerror("Citire CIE", f"Eroare la citire: {err}", parent=self)
 
-    def _build_date_payload_for_save(self) -> dict:
+    def _build_date_payload_for_save(self) -> DateRecord:
         """
         Construiește payload-ul 'date' EXACT ca exemplul tău.
-        Dacă avem unul din scan, îl folosim și suprascriem doar ci.eliberat/seria/numarul și datele.
+        Dacă avem unul din scan/server, îl copiem și suprascriem doar ci.eliberat/seria/numarul și datele.
         """
-        base = json.loads(json.dumps(self._date_payload, ensure_ascii=False)) if self._date_payload else {
-            "nume": "",
-            "prenume": "",
-            "cnp": "",
-            "sex": "",
-            "an": "",
-            "luna": "",
-            "zi": "",
-            "ci": {
-                "seria": "",
-                "numarul": "",
-                "id": "",
-                "an_ex": "",
-                "luna_ex": "",
-                "zi_ex": "",
-                "data_emiterii": "",
-                "eliberat": ""
-            },
-            "judet": "",
-            "localitatea": "",
-            "adresa2": ""
-        }
-
-        emis_txt = (self.emis_var.get() or "").strip()
-        serie = (self.serie_var.get() or "").strip().upper()
-        numar = _only_digits(self.numar_var.get())
-        expira_dmy = (self.expira_var.get() or "").strip()
-        data_dmy = (self.data_var.get() or "").strip()
-
-        # părți din expira
-        def _parts(dmy: str):
-            m = re.match(r"^\s*(\d{2})[.\-/](\d{2})[.\-/](\d{4})\s*$", dmy or "")
-            if not m:
-                return ("", "", "")
-            return (m.group(3), m.group(2), m.group(1))  # (YYYY, MM, DD)
-
-        ex_y, ex_m, ex_d = _parts(expira_dmy)
-
-        base_ci = base.setdefault("ci", {})
-        base_ci["seria"] = serie
-        base_ci["numarul"] = numar
-        base_ci["id"] = f"{serie}{numar}".strip()
-        base_ci["an_ex"] = ex_y
-        base_ci["luna_ex"] = ex_m
-        base_ci["zi_ex"] = ex_d
-        base_ci["data_emiterii"] = (_dmy_to_iso(data_dmy) or "")
-        base_ci["eliberat"] = emis_txt  # IMPORTANT: emis și în 'date'
-
-        return base
+        base = self._date_payload.copy() if self._date_payload else DateRecord()
+        return _apply_ci_fields(base, emis=self.emis_var.get(), serie=self.serie_var.get(),
+                                numar=self.numar_var.get(), expira_dmy=self.expira_var.get(),
+                                data_dmy=self.data_var.get())
 
     def save_and_close(self):
         """
         PUT /waitdocument/ cu:
           id, emis(top-level), expira(ISO), data(ISO), nr(doar cifre), observatii, date(JSON-string).
         """
+        date_rec = self._build_date_payload_for_save()
+        changes = date_rec.diff(self._date_loaded)   # ce s-a schimbat în 'date' față de server
+
         if not self.api:
             # fallback: doar previzualizare payload
             payload_preview = {
@@ -482,24 +433,37 @@ class EditDialog(tk.Toplevel):
                 "data": _dmy_to_iso(self.data_var.get().strip()),
                 "nr": _only_digits(self.numar_var.get()),
                 "observatii": self.obs_txt.get("1.0", "end").strip(),
-                "date": json.dumps(self._build_date_payload_for_save(), ensure_ascii=False),
+                "date": date_rec.to_dict(),
+                "modificari": {k: f"{a!r} -> {b!r}" for k, (a, b) in changes.items()},
             }
             messagebox.showinfo("Preview salvare", json.dumps(payload_preview, ensure_ascii=False, indent=2), parent=self)
             self.destroy()
             return
 
+        if self._loaded is None and not (self._load_failed or self._scanned):
+            # prefill-ul încă nu a sosit: un PUT complet acum ar suprascrie datele de pe server
+            self.status_lbl.configure(text="Așteaptă încărcarea datelor…")
+            return
+
         try:
-            payload_api = {
-                "id": int(self.row_data.get("id")),
-                "emis": (self.emis_var.get() or "").strip(),                 # top-level
-                "expira": _dmy_to_iso(self.expira_var.get().strip()) or None,
-                "data": _dmy_to_iso(self.data_var.get().strip()) or None,
-                "nr": _only_digits(self.numar_var.get()),
-                "observatii": self.obs_txt.get("1.0", "end").strip(),
-                "date": json.dumps(self._build_date_payload_for_save(), ensure_ascii=False),
-            }
+            payload_api = _build_save_payload(
+                self.row_data.get("id"), date_rec, emis=self.emis_var.get(),
+                expira_dmy=self.expira_var.get(), data_dmy=self.data_var.get(),
+                numar=self.numar_var.get(), observatii=self.obs_txt.get("1.0", "end"))
+
+            # doar ce s-a schimbat față de server; None = încărcare eșuată / date din card -> payload complet
+            patch = payload_diff(self._loaded, payload_api, date=date_rec, loaded_date=self._date_loaded)
+            if is_noop(patch):
+                self.destroy()
+                return
+
+            if callable(self.on_save):
+                # optimist: închidem imediat, salvarea rulează în background (cu rollback la eroare)
+                row = self.row_data
+                self.destroy()
+                self.on_save(row, payload_api, changes=changes, patch=patch)
+                return
 
-            print("PUT payload:", payload_api)  # debug
             try:
                 self.api.request("PUT", "/waitdocument/", json=payload_api)
             except TypeError:
@@ -515,6 +479,133 @@ class EditDialog(tk.Toplevel):
             messagebox.showerror("Eroare", str(e), parent=self)
 
 
+# ---------------- preluare CIE în lot ----------------
+
+class BatchIntakeDialog(tk.Toplevel):
+    """
+    Jurnalul sesiunii de preluare în lot: un rând per card citit.
+    Potrivirile unice se salvează automat; dublu-click pe un rând nepotrivit /
+    ambiguu deschide EditDialog (cu datele cardului deja completate).
+    """
+    COLS = (("ora", "Ora", 70), ("titular", "Titular", 220), ("status", "Status", 200),
+            ("document", "Document", 140), ("durata", "Durată", 70))
+    STATUS = {
+        EV_READING: "se citește…",
+        EV_MATCHED: "potrivit",
+        EV_AMBIGUOUS: "mai multe documente",
+        EV_UNMATCHED: "fără document în așteptare",
+        EV_ERROR: "eroare la citire",
+    }
+
+    def __init__(self, master, on_stop: Callable[[], None], on_open: Callable[[dict, dict], None]):
+        super().__init__(master)
+        self.title("Preluare CIE în lot")
+        self.transient(master.winfo_toplevel())
+        try:
+            self.iconbitmap(resource_path("assets/waitdocs.ico"))
+        except Exception:
+            pass
+        self.on_stop = on_stop
+        self.on_open = on_open
+        self._entries: dict[str, dict] = {}   # iid -> info eveniment
+        self._current: Optional[str] = None   # rândul cardului din cititor
+        self._seq = 0
+        self._counts = {EV_MATCHED: 0, EV_AMBIGUOUS: 0, EV_UNMATCHED: 0, EV_ERROR: 0}
+        self._seconds = 0.0
+
+        frm = ttk.Frame(self, padding=14)
+        frm.pack(fill="both", expand=True)
+        self.info_lbl = ttk.Label(frm, text="Se pregătește lista documentelor…")
+        self.info_lbl.pack(anchor="w", pady=(0, 8))
+
+        self.tree = ttk.Treeview(frm, columns=[c for c, _, _ in self.COLS], show="headings", height=14)
+        for c, label, w in self.COLS:
+            self.tree.heading(c, text=label)
+            self.tree.column(c, width=w, anchor="w")
+        self.tree.pack(fill="both", expand=True)
+        self.tree.tag_configure("ok", foreground="#047857")
+        self.tree.tag_configure("warn", foreground="#b45309")
+        self.tree.tag_configure("err", foreground="#b91c1c")
+        self.tree.bind("<Double-1>", self._on_double_click)
+
+        bottom = ttk.Frame(frm)
+        bottom.pack(fill="x", pady=(8, 0))
+        self.stats_lbl = ttk.Label(bottom, text="", foreground="#666")
+        self.stats_lbl.pack(side="left")
+        ttk.Button(bottom, text="Oprește", command=self.stop).pack(side="right")
+        self.protocol("WM_DELETE_WINDOW", self.stop)
+
+    def stop(self):
+        try:
+            self.on_stop()
+        finally:
+            self.destroy()
+
+    def set_ready(self, n_docs: int):
+        self.info_lbl.configure(
+            text=f"{n_docs} documente în așteptare. Introduceți cardurile pe rând în cititor.")
+
+    def handle(self, kind: str, info: dict):
+        """Evenimentele BatchIntake (deja pe thread-ul Tk)."""
+        if kind == EV_REMOVED:
+            self._current = None
+            return
+        if kind == EV_READING or self._current is None:
+            self._seq += 1
+            self._current = iid = str(self._seq)
+            self.tree.insert("", 0, iid=iid, values=(time.strftime("%H:%M:%S"), "", self.STATUS[EV_READING], "", ""))
+            if kind == EV_READING:
+                return
+        iid = self._current
+        self._entries[iid] = info
+        self._counts[kind] = self._counts.get(kind, 0) + 1
+        self._seconds += info.get("seconds") or 0.0
+
+        cands = info.get("candidates") or []
+        doc = ", ".join(f"#{r.get('id')}" for r in cands[:4]) + ("…" if len(cands) > 4 else "")
+        status = self.STATUS.get(kind, kind)
+        if kind == EV_MATCHED:
+            status += f" ({info.get('by')})"
+        elif kind == EV_ERROR:
+            status += f": {info.get('error')}"
+        tag = {EV_MATCHED: "ok", EV_ERROR: "err"}.get(kind, "warn")
+        vals = list(self.tree.item(iid, "values"))
+        vals[1:5] = [info.get("name", ""), status, doc, f"{info.get('seconds', 0):.1f}s"]
+        self.tree.item(iid, values=vals, tags=(tag,))
+        self._update_stats()
+
+    def set_result(self, info: dict, text: str, ok: bool = True):
+        """Rezultatul punerii în coada de salvare pentru un card potrivit."""
+        for iid, e in self._entries.items():
+            if e is info and self.tree.exists(iid):
+                vals = list(self.tree.item(iid, "values"))
+                vals[2] = text
+                self.tree.item(iid, values=vals, tags=("ok" if ok else "err",))
+
+    def _update_stats(self):
+        n = sum(self._counts.values())
+        avg = self._seconds / n if n else 0.0
+        self.stats_lbl.configure(
+            text=f"Citite: {n} · Potrivite: {self._counts[EV_MATCHED]} · "
+                 f"Ambigue: {self._counts[EV_AMBIGUOUS]} · Fără potrivire: {self._counts[EV_UNMATCHED]} · "
+                 f"Erori: {self._counts[EV_ERROR]} · medie {avg:.1f}s/card")
+
+    def _on_double_click(self, event):
+        iid = self.tree.identify_row(event.y)
+        info = self._entries.get(iid)
+        if not info or not info.get("mapped"):
+            return
+        cands = info.get("candidates") or []
+        if len(cands) <= 1:
+            self.on_open(cands[0] if cands else {}, info["mapped"])
+            return
+        menu = tk.Menu(self, tearoff=False)
+        for r in cands:
+            menu.add_command(label=f"#{r.get('id')}  {r.get('angajat', '')}  {r.get('denumire', '')}",
+                             command=lambda row=r: self.on_open(row, info["mapped"]))
+        menu.tk_popup(event.x_root, event.y_root)
+
+
 # ---------------- data client ----------------
 
 class WaitDocsClient:
@@ -524,15 +615,19 @@ class WaitDocsClient:
         # cerem și 'file' + 'denumire' pentru preview
         self.cols = ["id", "tip", "subtip", "user_username", "angajat_username", "file", "denumire"]
 
-    def fetch_page(self, page_index=0, page_size=10, search_text=""):
+    def fetch_page(self, page_index=0, page_size=10, search_text="", order_col="id", order_dir="asc"):
         start = page_index * page_size
+        try:
+            order_idx = self.cols.index(order_col)
+        except ValueError:
+            order_idx = 0
         data = {
             "draw": page_index + 1,
             "start": start,
             "length": page_size,
             "search[value]": search_text,
-            "order[0][column]": "0",
-            "order[0][dir]": "asc",
+            "order[0][column]": str(order_idx),
+            "order[0][dir]": "desc" if order_dir == "desc" else "asc",
         }
         for i, c in enumerate(self.cols):
             data[f"columns[{i}][data]"] = c
@@ -554,12 +649,28 @@ class WaitDocsClient:
             })
         return rows, payload.get("recordsFiltered", 0)
 
+    def iter_rows(self, search_text="", page_size=100):
+        """Toate rândurile care corespund filtrului, paginate leneș (pentru export)."""
+        page = 0
+        while True:
+            rows, total = self.fetch_page(page, page_size, search_text)
+            yield from rows
+            page += 1
+            if not rows or page * page_size >= int(total or 0):
+                break
+
 
 # ---------------- main window ----------------
 
 class WaitDocsWindow(ttk.Frame):
-    """Fereastra principală: tabel + preview + buton Edit + Logout."""
-    def __init__(self, master, api_client: ApiClient, on_logged_out: Optional[Callable[[], None]] = None):
+    """
+    Fereastra principală: tabel + preview + buton Edit + Logout.
+    check_session=True (pornire cu token-uri salvate): interfața apare imediat, iar verificarea
+    sesiunii (try_auto_login) și prima pagină se încarcă în background; dacă refresh-ul e
+    respins, revenim la login prin on_logged_out.
+    """
+    def __init__(self, master, api_client: ApiClient, on_logged_out: Optional[Callable[[], None]] = None,
+                 check_session: bool = False):
         super().__init__(master, padding=16, style="Main.TFrame")
         self.pack(fill="both", expand=True)
         self.api = api_client
@@ -569,6 +680,16 @@ class WaitDocsWindow(ttk.Frame):
         self.search_text = tk.StringVar()
         self._on_logged_out = on_logged_out
 
+        # oglindă locală opțională (WAITDOCS_LOCAL_MIRROR=1): sortare/filtrare fără server
+        self.mirror: Optional[LocalMirror] = None
+        if LOCAL_MIRROR:
+            try:
+                self.mirror = LocalMirror()
+            except Exception:
+                self.mirror = None
+        self.sort_col = "id"
+        self.sort_desc = False
+
         # titlu + căutare + logout
         hdr = ttk.Frame(self, padding=(0, 0, 0, 8), style="Main.TFrame")
         hdr.pack(fill="x")
@@ -602,7 +723,10 @@ class WaitDocsWindow(ttk.Frame):
             ("id", "ID", 60), ("tip", "Tip fișier", 110), ("subtip", "Subtip", 110),
             ("user", "User", 220), ("angajat", "Angajat", 320), ("fisier", "Fișier", 240)
         ]:
-            self.tree.heading(c, text=label)
+            if self.mirror:
+                self.tree.heading(c, text=label, command=lambda col=c: self.sort_by(col))
+            else:
+                self.tree.heading(c, text=label)
             self.tree.column(c, width=w, anchor="w")
         self.tree.grid(row=0, column=0, sticky="nsew")
         vsb = ttk.Scrollbar(left, orient="vertical", command=self.tree.yview)
@@ -627,11 +751,24 @@ class WaitDocsWindow(ttk.Frame):
         ttk.Button(btns_prev, text="Deschide", style="Accent.TButton", command=self.open_selected_file).pack(side="left")
         ttk.Button(btns_prev, text="Descarcă", command=self.save_selected_file_as).pack(side="left", padx=(8, 0))
 
+        # progres download (ascuns cât timp nu rulează nimic)
+        self.dl_frame = ttk.Frame(card, style="Card.TFrame")
+        self.dl_bar = ttk.Progressbar(self.dl_frame, mode="determinate", length=220, maximum=100)
+        self.dl_bar.pack(side="left")
+        ttk.Button(self.dl_frame, text="Anulează", command=self.cancel_download).pack(side="left", padx=(8, 0))
+        self.dl_lbl = ttk.Label(card, text="", style="Subheading.TLabel")
+        self._dl_job = None
+
         # acțiuni
         act = ttk.Frame(self, padding=(0, 10, 0, 0), style="Main.TFrame")
         act.pack(fill="x")
         ttk.Button(act, text="Editare rând selectat", style="Accent.TButton", command=self.edit_selected).pack(side="left")
-        ttk.Button(act, text="Reîncarcă", command=lambda: self.load_page(self.cur_page)).pack(side="left", padx=(8, 0))
+        ttk.Button(act, text="Reîncarcă", command=self.reload).pack(side="left", padx=(8, 0))
+        ttk.Button(act, text="Export…", command=self.export_filtered).pack(side="left", padx=(8, 0))
+        ttk.Button(act, text="Preluare CIE în lot…", command=self.start_batch_intake).pack(side="left", padx=(8, 0))
+        ttk.Button(act, text="Diagnostic…", command=self.export_diagnostics).pack(side="left", padx=(8, 0))
+        self.act_status = ttk.Label(act, text="", style="Subheading.TLabel")
+        self.act_status.pack(side="left", padx=(12, 0))
 
         # paginație (înapoi stânga, înainte dreapta)
         pag = ttk.Frame(self, style="Main.TFrame")
@@ -661,15 +798,102 @@ class WaitDocsWindow(ttk.Frame):
         # zebra rows
         self.tree.tag_configure("odd", background="#ffffff")
         self.tree.tag_configure("even", background="#fafafa")
-
-        # --- preview async: debounce + cache ---
+        # stări de salvare asincronă (vezi save_document_async)
+        self.tree.tag_configure("saving", foreground="#6b7280")
+        self.tree.tag_configure("save_error", foreground="#b91c1c")
+        self._row_marks: dict[str, str] = {}
+        self._patch_supported = True   # devine False dacă serverul răspunde 405 la PATCH
+        self._batch: Optional[BatchIntake] = None
+        self._batch_dlg: Optional[BatchIntakeDialog] = None
+
+        # --- preview async: debounce + cache (RAM mărginit + disc, supraviețuiește restartului) ---
         self._preview_img_ref = None
-        self._thumb_cache: dict[str, ImageTk.PhotoImage] = {}
+        self._thumb_cache = ThumbCache()
+        # fișierele descărcate (preview / Deschide / Descarcă) -> un singur download per conținut
+        self._files = FileCache()
+        # pool fix de worker-e: deduplicare după URL + anulare pentru rândurile deselectate
+        self._preview_pool = PreviewPool(
+            lambda u, cancel: load_thumbnail(self.api, u, self._thumb_cache, files=self._files, cancel=cancel),
+            workers=2)
+        # record-uri /waitdocument/ preîncărcate pentru rândurile paginii -> EditDialog instant
+        self._records = RecordCache(self.api)
+        # Deschide / Descarcă: în background, cu reluare (Range) și progres
+        self._downloads = DownloadManager(self.api, self._files, max_concurrent=2)
+        self._preview_url: Optional[str] = None
+        # extensiile pentru care avem thumbnail (PDF doar dacă e instalat pypdfium2)
+        self._thumb_exts = IMAGE_EXTS + ((PDF_EXT,) if pdf_preview_available() else ())
         self._preview_after_id: Optional[str] = None
         self._preview_seq = 0
+        self._preview_span: Optional[metrics.Span] = None
         self.tree.bind("<<TreeviewSelect>>", self._schedule_preview_for_selected)
 
-        self.load_page(0)
+        # rândurile vizibile, după iid (= id document) -> patch-uri pe loc la sync
+        self._rows_by_iid: dict[str, dict] = {}
+        self._query = ""
+
+        # sync în background: aplică doar inserările/modificările/ștergerile
+        self.syncer = QueueSyncer(self._fetch_current_page,
+                                  lambda d, total: self._post(lambda: self._apply_changes(d, total)))
+        self.bind("<Destroy>", self._on_destroy, add="+")
+
+        if check_session:
+            self.page_lbl.config(text="Se verifică sesiunea…")
+            self._start_session_check()
+        else:
+            self.load_page(0)
+            self._start_background_sync()
+
+    def _start_background_sync(self):
+        if self.mirror:
+            self._start_mirror_sync()
+        self.syncer.start()
+
+    def _start_session_check(self):
+        """try_auto_login + prima pagină pe un thread; UI-ul rămâne responsiv între timp."""
+        query = self.search_text.get().strip()
+
+        def worker():
+            try:
+                ok = self.api.try_auto_login()
+            except Exception:
+                ok = True   # server inaccesibil: păstrăm token-urile, pagina va arăta eroarea
+            if not ok:
+                self._post(self._session_invalid)
+                return
+            # fără refresh în paralel: token-ul de refresh poate fi rotit de server la fiecare folosire
+            try:
+                rows, total = self._fetch_page_for(0, query)
+            except ApiError as e:
+                err = e
+                self._post(lambda: self._session_invalid() if err.status == 401
+                           else self._on_first_page_failed(err))
+                return
+            except Exception as e:
+                err = e
+                self._post(lambda: self._on_first_page_failed(err))
+                return
+            self._post(lambda: self._first_page_loaded(query, rows, total))
+
+        threading.Thread(target=worker, daemon=True, name="session-check").start()
+
+    def _first_page_loaded(self, query: str, rows: list, total: int):
+        if self.search_text.get().strip() == query:
+            self._show_page(0, query, rows, total)
+        else:
+            self.load_page(0)   # utilizatorul a căutat deja altceva între timp
+        self._start_background_sync()
+
+    def _on_first_page_failed(self, err: Exception):
+        self.page_lbl.config(text=f"Lista nu a putut fi încărcată: {err}")
+        self._start_background_sync()   # QueueSyncer reîncearcă periodic
+
+    def _session_invalid(self):
+        """Refresh-ul a fost respins de server -> înapoi la login (fără confirmare)."""
+        try:
+            self.api.logout()
+        except Exception:
+            pass
+        self._return_to_login()
 
     # ------- logout -------
     def do_logout(self):
@@ -679,7 +903,9 @@ class WaitDocsWindow(ttk.Frame):
             self.api.logout()
         except Exception:
             pass
+        self._return_to_login()
 
+    def _return_to_login(self):
         # dacă avem un callback configurat din main, îl folosim
         if callable(self._on_logged_out):
             try:
@@ -701,6 +927,21 @@ class WaitDocsWindow(ttk.Frame):
             top.destroy()
 
     # ------- internal -------
+    def _post(self, fn):
+        """Programează fn pe thread-ul Tk (sigur de apelat din worker-e)."""
+        try:
+            self.after(0, fn)
+        except Exception:
+            pass  # fereastra a fost distrusă
+
+    def _on_destroy(self, e):
+        if e.widget is self:
+            self.syncer.stop()
+            self._preview_pool.shutdown()
+            self._downloads.shutdown()
+            self._records.shutdown()
+            self.stop_batch_intake()
+
     def _absolute_url(self, path: str) -> str:
         """Construiește URL absolut pentru fișierul din API."""
         if not path:
@@ -714,53 +955,99 @@ class WaitDocsWindow(ttk.Frame):
             return API_BASE.rstrip("/") + MEDIA_URL.rstrip("/") + p
         return API_BASE.rstrip("/") + MEDIA_URL + p
 
-    def _download_to_temp(self, url: str, show_message: bool = True) -> str | None:
-        """Descarcă la un fișier temporar. Dacă show_message=False, nu afișează MessageBox (pt. thread)."""
+    def _download_async(self, url: str, on_ready: Callable[[str], None], title: str = "Descărcare"):
+        """Pornește download-ul în background (cache + Range resume) și arată progresul în card."""
         if not url:
-            return None
-        try:
-            headers = {}
-            if getattr(self.api, "tokens", None):
-                headers["Authorization"] = f"Bearer {self.api.tokens.access}"
-            r = self.api.session.get(url, headers=headers, timeout=30, stream=True)
-            r.raise_for_status()
-            suffix = os.path.splitext(urllib.parse.urlparse(url).path)[1] or ""
-            fd, tmp_path = tempfile.mkstemp(prefix="wdl_", suffix=suffix)
-            with os.fdopen(fd, "wb") as f:
-                for chunk in r.iter_content(8192):
-                    f.write(chunk)
-            return tmp_path
-        except Exception as e:
-            if show_message:
-                messagebox.showerror("Descărcare eșuată", str(e))
-            return None
+            return
+        self._dl_job = job = self._downloads.start(
+            url,
+            on_progress=lambda done, total: self._post(lambda: self._show_download_progress(job, done, total)),
+            on_done=lambda path, err: self._post(lambda: self._on_download_done(job, path, err, on_ready, title)),
+        )
+        if not job.finished:
+            self._show_download_progress(job, job.done_bytes, job.total_bytes)
+
+    def _show_download_progress(self, job, done: int, total: int):
+        if job is not self._dl_job or job.finished:
+            return
+        if not self.dl_frame.winfo_ismapped():
+            self.dl_frame.grid(row=4, column=0, sticky="w", pady=(8, 0))
+            self.dl_lbl.grid(row=5, column=0, sticky="w")
+        if total:
+            self.dl_bar.configure(mode="determinate", value=done * 100 / total)
+            self.dl_lbl.configure(text=f"{done / 1048576:.1f} / {total / 1048576:.1f} MB")
+        else:
+            self.dl_bar.configure(mode="indeterminate")
+            self.dl_lbl.configure(text=f"{done / 1048576:.1f} MB")
+
+    def _hide_download_progress(self):
+        self.dl_frame.grid_remove()
+        self.dl_lbl.grid_remove()
+
+    def _on_download_done(self, job, path, err, on_ready, title: str):
+        if job is self._dl_job:
+            self._dl_job = None
+            self._hide_download_progress()
+        if isinstance(err, DownloadCancelled):
+            return
+        if err is not None or not path:
+            messagebox.showerror(f"{title} eșuată", str(err or "Fișierul nu a putut fi descărcat."))
+            return
+        on_ready(path)
+
+    def cancel_download(self):
+        if self._dl_job:
+            self._dl_job.cancel()
 
     # ------- actions -------
     def do_search(self):
         self.cur_page = 0
         self.load_page(0)
 
+    def reload(self):
+        self.load_page(self.cur_page)
+        if self.mirror:
+            self._start_mirror_sync()
+
+    def _fetch_page_for(self, page_index: int, query: str):
+        if self.mirror and self.mirror.count():
+            return self.mirror.query(query, order_by=self.sort_col, descending=self.sort_desc,
+                                     page_index=page_index, page_size=PAGE_SIZE)
+        return self.client.fetch_page(page_index, PAGE_SIZE, query)
+
+    def _fetch_current_page(self):
+        """Rulează pe thread-ul de sync: doar valori simple, fără variabile Tk."""
+        if self.mirror:
+            self.mirror.sync(self.client)
+        return self._fetch_page_for(self.cur_page, self._query)
+
     def load_page(self, page_index):
+        query = self.search_text.get().strip()
+        sp = metrics.span("ui.load_page", source="mirror" if self.mirror and self.mirror.count() else "api")
         try:
-            rows, total = self.client.fetch_page(page_index, PAGE_SIZE, self.search_text.get().strip())
+            rows, total = self._fetch_page_for(page_index, query)
         except ApiError as e:
+            sp.end(ok=False, status=e.status)
             messagebox.showerror("Eroare API", str(e))
             return
+        self._show_page(page_index, query, rows, total)
+        sp.end()
 
+    def _show_page(self, page_index: int, query: str, rows: list, total: int):
         self.tree.delete(*self.tree.get_children())
         self._rows_cache = rows
+        self._rows_by_iid = {}
 
         for i, r in enumerate(rows):
-            fname = r.get("denumire") or (r.get("file").split("/")[-1] if r.get("file") else "")
-            tag = "even" if i % 2 else "odd"
-            self.tree.insert(
-                "",
-                "end",
-                values=(r["id"], r["tip"], r["subtip"], r["user"], r["angajat"], fname),
-                tags=(tag,)
-            )
+            iid = str(r["id"])
+            self.tree.insert("", "end", iid=iid, values=_row_values(r), tags=self._row_tags(iid, i))
+            self._rows_by_iid[iid] = r
 
+        self._query = query
+        self.syncer.reset(rows, total)
         self.cur_page = page_index
+        self._prefetch_page(restart=True)
+        self._records.warm([r.get("id") for r in rows])
         self.total = total
         pages = max(1, math.ceil(self.total / PAGE_SIZE))
         self.page_lbl.config(text=f"Pagina {self.cur_page + 1}/{pages} — {self.total} rezultate")
@@ -771,6 +1058,72 @@ class WaitDocsWindow(ttk.Frame):
         self.preview_info.configure(text="")
         self._preview_img_ref = None
 
+    def _apply_changes(self, d: dict, total: int):
+        """Aplică un diff de la QueueSyncer direct pe Treeview (păstrează selecția și preview-ul)."""
+        if d.get("gen") != self.syncer.generation:
+            return
+        selected = self.tree.selection()
+        sel_iid = selected[0] if selected else None
+        sel_file = self._rows_by_iid.get(sel_iid, {}).get("file") if sel_iid else None
+
+        for iid in d["deleted"]:
+            if self.tree.exists(iid):
+                self.tree.delete(iid)
+            self._rows_by_iid.pop(iid, None)
+        for r in d["updated"]:
+            iid = str(r["id"])
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=_row_values(r))
+            self._rows_by_iid[iid] = r
+        for idx, r in d["inserted"]:
+            iid = str(r["id"])
+            if not self.tree.exists(iid):
+                self.tree.insert("", idx, iid=iid, values=_row_values(r))
+            self._rows_by_iid[iid] = r
+
+        # ordinea finală + zebra
+        for i, iid in enumerate(d["order"]):
+            if self.tree.exists(iid):
+                self.tree.move(iid, "", i)
+                self.tree.item(iid, tags=self._row_tags(iid, i))
+        self._rows_cache = [self._rows_by_iid[iid] for iid in d["order"] if iid in self._rows_by_iid]
+
+        self.total = total
+        pages = max(1, math.ceil(self.total / PAGE_SIZE))
+        self.page_lbl.config(text=f"Pagina {self.cur_page + 1}/{pages} — {self.total} rezultate")
+
+        # fișierul rândului selectat s-a schimbat -> reîmprospătăm preview-ul
+        if sel_iid and sel_iid in self._rows_by_iid and self._rows_by_iid[sel_iid].get("file") != sel_file:
+            self._schedule_preview_for_selected()
+        if d["inserted"] or d["updated"]:
+            self._prefetch_page()
+
+    def sort_by(self, col: str):
+        """Click pe antet: sortare locală din oglindă (fără request)."""
+        key = "denumire" if col == "fisier" else col
+        if self.sort_col == key:
+            self.sort_desc = not self.sort_desc
+        else:
+            self.sort_col, self.sort_desc = key, False
+        self.load_page(0)
+
+    def _start_mirror_sync(self, full: bool = False):
+        """Sincronizează oglinda în background; reîncarcă pagina curentă dacă s-a schimbat ceva."""
+        mirror, client = self.mirror, self.client
+
+        def worker():
+            try:
+                res = mirror.sync(client, full=full)
+            except Exception:
+                return
+            if res.get("upserted") or res.get("deleted"):
+                try:
+                    self.after(0, lambda: self.load_page(self.cur_page))
+                except Exception:
+                    pass
+
+        threading.Thread(target=worker, daemon=True).start()
+
     def next_page(self):
         pages = max(1, math.ceil(self.total / PAGE_SIZE))
         if self.cur_page + 1 < pages:
@@ -784,9 +1137,8 @@ class WaitDocsWindow(ttk.Frame):
         sel = self.tree.selection()
         if not sel:
             return None
-        idx = self.tree.index(sel[0])
-        if full and hasattr(self, "_rows_cache") and 0 <= idx < len(self._rows_cache):
-            return self._rows_cache[idx]
+        if full and sel[0] in self._rows_by_iid:
+            return self._rows_by_iid[sel[0]]
         v = self.tree.item(sel[0], "values")
         return {
             "id": v[0],
@@ -803,10 +1155,229 @@ class WaitDocsWindow(ttk.Frame):
             messagebox.showwarning("Selectează un rând", "Te rog selectează un rând din tabel.")
             return
 
-        def after_save_reload():
-            self.load_page(self.cur_page)
+        EditDialog(self, row, api=self.api, records=self._records, on_save=self.save_document_async)
+
+    # ------- salvare asincronă (optimistă) -------
+    def _row_tags(self, iid: str, index: int) -> tuple:
+        tags = ("even" if index % 2 else "odd",)
+        mark = self._row_marks.get(iid)
+        return tags + (mark,) if mark else tags
+
+    def _mark_row(self, iid: str, mark: str | None):
+        if mark:
+            self._row_marks[iid] = mark
+        else:
+            self._row_marks.pop(iid, None)
+        if self.tree.exists(iid):
+            self.tree.item(iid, tags=self._row_tags(iid, self.tree.index(iid)))
+
+    def save_document_async(self, row: dict, payload: dict, changes: dict | None = None,
+                            patch: dict | None = None):
+        """
+        Salvare în background. Optimist: record-ul din cache e înlocuit imediat,
+        rândul e marcat „se salvează”; la eroare se revine la versiunea anterioară
+        și operatorul poate reîncerca. Fără reîncărcarea paginii.
+        - patch (doar câmpurile schimbate) -> PATCH /waitdocument/ cu If-Match: <ETag>;
+        - fără patch sau server fără PATCH (405/501) -> PUT cu payload-ul complet;
+        - 412 = documentul a fost modificat de altcineva între timp -> nu suprascriem.
+        """
+        doc_id = payload.get("id")
+        iid = str(doc_id)
+        previous = self._records.get(doc_id)
+        etag = self._records.etag(doc_id)
+        optimistic = dict(previous or {})
+        optimistic.update(payload)
+        self._records.put(doc_id, optimistic, etag)
+        self._mark_row(iid, "saving")
+        if patch is not None:
+            what = f" ({len(set(patch) - {'id', 'version'})} câmpuri modificate)"
+        else:
+            what = f" ({len(changes)} câmpuri din CI modificate)" if changes else ""
+        self.act_status.configure(text=f"Se salvează documentul #{doc_id}{what}…")
+        sp = metrics.span("ui.save_to_row")   # click pe Salvează -> rândul confirmat / revenit
+
+        def worker():
+            headers = {"If-Match": etag} if etag else None
+            method = "PATCH"
+            try:
+                resp = None
+                if patch is not None and self._patch_supported:
+                    try:
+                        resp = self.api.request_with_headers("PATCH", "/waitdocument/", json=patch,
+                                                             headers=headers)
+                    except ApiError as e:
+                        if e.status not in (405, 501):
+                            raise
+                        self._patch_supported = False
+                if resp is None:
+                    method = "PUT"
+                    resp = self.api.request_with_headers("PUT", "/waitdocument/", json=payload,
+                                                         headers=headers)
+            except Exception as e:
+                err = e
+                status = e.status if isinstance(e, ApiError) else 0
+                self._post(lambda: (sp.end(ok=False, method=method, status=status),
+                                    self._on_save_failed(row, payload, previous, err, patch)))
+                return
+            data, resp_headers = resp
+            self._post(lambda: (self._on_save_ok(doc_id, optimistic, data, resp_headers.get("ETag")),
+                                sp.end(method=method)))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_save_ok(self, doc_id, optimistic: dict, resp, etag: str | None = None):
+        merged = dict(optimistic)
+        if isinstance(resp, dict) and resp.get("id") is not None:
+            merged.update(resp)
+        # ETag-ul vechi nu mai e valid după scriere; fără unul nou, următoarea salvare pleacă fără If-Match
+        self._records.put(doc_id, merged, etag)
+        self._mark_row(str(doc_id), None)
+        self.act_status.configure(text=f"Documentul #{doc_id} a fost salvat.")
+        # salvarea (din EditDialog sau din preluarea în lot) poate scoate documentul din coadă
+        self.syncer.poke()
+
+    def _on_save_failed(self, row: dict, payload: dict, previous: dict | None, err: Exception,
+                        patch: dict | None = None):
+        doc_id = payload.get("id")
+        self._mark_row(str(doc_id), "save_error")
+        self.act_status.configure(text=f"Salvarea documentului #{doc_id} a eșuat.")
+        if isinstance(err, ApiError) and err.status == 412:
+            # altcineva a salvat între timp: nu ghicim, cerem versiunea nouă
+            self._records.invalidate(doc_id)
+            self._records.fetch_async(doc_id, force=True)
+            messagebox.showwarning(
+                "Document modificat",
+                f"Documentul #{doc_id} a fost modificat între timp de altcineva.\n"
+                "Modificările tale nu au fost salvate; redeschide documentul și reaplică-le.")
+            return
+        # rollback: cache-ul revine la ce era pe server
+        if previous is not None:
+            self._records.put(doc_id, previous, self._records.etag(doc_id))
+        else:
+            self._records.invalidate(doc_id)
+        title = "Eroare API" if isinstance(err, ApiError) else "Eroare"
+        if messagebox.askretrycancel(title, f"Documentul #{doc_id} nu a fost salvat:\n{err}\n\nReîncerc?"):
+            self.save_document_async(row, payload, patch=patch)
+
+    # ------- preluare CIE în lot -------
+    def start_batch_intake(self):
+        """
+        Citire continuă de CIE: fiecare card introdus e potrivit (CNP / nume) cu un document
+        în așteptare și salvarea pleacă automat, fără dialog per card.
+        """
+        if self._batch_dlg is not None and self._batch_dlg.winfo_exists():
+            self._batch_dlg.lift()
+            return
+
+        dlg = self._batch_dlg = BatchIntakeDialog(self, on_stop=self.stop_batch_intake,
+                                                  on_open=self._open_scanned)
+        query = self._query
+
+        def worker():
+            matcher = DocMatcher()
+            try:
+                # oglinda abia creată e goală până termină primul sync -> atunci mergem la server
+                if self.mirror and self.mirror.count():
+                    rows, _ = self.mirror.query(query, page_size=1_000_000)
+                else:
+                    rows = self.client.iter_rows(query)
+                for row in rows:
+                    # CNP-ul îl știm doar din record-urile deja încărcate; altfel potrivim după nume
+                    matcher.add(row, self._records.get(row.get("id")))
+            except Exception as e:
+                err = str(e)
+                self._post(lambda: (dlg.stop(), messagebox.showerror("Preluare CIE în lot", err)))
+                return
+            self._post(lambda: self._run_batch(dlg, matcher))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _run_batch(self, dlg: BatchIntakeDialog, matcher: DocMatcher):
+        if self._batch_dlg is not dlg or not dlg.winfo_exists():
+            return
+
+        def on_event(kind, info):
+            self._post(lambda: self._on_batch_event(dlg, kind, info))
+
+        try:
+            from cie_reader_core import read_all
+        except ImportError as e:
+            dlg.stop()
+            messagebox.showerror("Preluare CIE în lot", f"Componentele pentru citirea CIE lipsesc:\n{e}")
+            return
+        # fără VERIFY: fiecare card are PIN-ul lui, iar un PIN comun greșit ar consuma
+        # încercări (și ar putea bloca) cardurile cetățenilor; datele din lot se citesc fără PIN
+        self._batch = BatchIntake(lambda: read_all("", with_certificate=False),
+                                  map_raw, matcher, on_event)
+        try:
+            self._batch.start()
+        except Exception as e:
+            self._batch = None
+            dlg.stop()
+            messagebox.showerror("Preluare CIE în lot", f"Cititorul de carduri nu poate fi folosit:\n{e}")
+            return
+        dlg.set_ready(len(matcher))
+
+    def stop_batch_intake(self):
+        batch, self._batch = self._batch, None
+        self._batch_dlg = None
+        if batch is not None:
+            batch.stop()
+
+    def _on_batch_event(self, dlg: BatchIntakeDialog, kind: str, info: dict):
+        if not dlg.winfo_exists():
+            return
+        dlg.handle(kind, info)
+        if kind == EV_MATCHED:
+            self._queue_scanned_update(info["candidates"][0], info["mapped"],
+                                       lambda text, ok=True: dlg.winfo_exists() and dlg.set_result(info, text, ok))
+
+    def _queue_scanned_update(self, row: dict, mapped: dict, on_result: Callable[..., None]):
+        """Pornește salvarea documentului cu datele cardului (diff față de record-ul de pe server)."""
+        def done(rec, err):
+            if err is not None or rec is None:
+                # fără record-ul curent nu știm ce e deja pe server: un PUT complet ar
+                # suprascrie observațiile și restul câmpurilor -> nu salvăm, doar notăm în jurnal
+                msg = f"nesalvat: documentul nu s-a putut încărca ({err or 'record gol'})"
+                self._post(lambda: on_result(msg, False))
+                return
+            self._post(lambda: self._save_scanned(row, mapped, rec, on_result))
+
+        self._records.fetch_async(row.get("id"), done)
+
+    def _save_scanned(self, row: dict, mapped: dict, loaded: dict, on_result: Callable[..., None]):
+        date_rec = _apply_ci_fields(DateRecord.from_dict(mapped.get("date_payload")),
+                                    emis=mapped.get("emis", ""), serie=mapped.get("serie", ""),
+                                    numar=mapped.get("numar", ""), expira_dmy=mapped.get("expira", ""),
+                                    data_dmy=mapped.get("data", ""))
+        # observațiile scrise de operator nu se suprascriu fără ca cineva să le vadă
+        obs = loaded.get("observatii") or mapped.get("observatii", "")
+        try:
+            payload = _build_save_payload(row.get("id"), date_rec, emis=mapped.get("emis", ""),
+                                          expira_dmy=mapped.get("expira", ""), data_dmy=mapped.get("data", ""),
+                                          numar=mapped.get("numar", ""), observatii=obs)
+        except (TypeError, ValueError) as e:
+            on_result(f"eroare: {e}", False)
+            return
+        loaded_date = DateRecord.from_server(loaded.get("date"))
+        patch = payload_diff(loaded, payload, date=date_rec, loaded_date=loaded_date)
+        if is_noop(patch):
+            on_result("potrivit – fără modificări")
+            return
+        self.save_document_async(row, payload, changes=date_rec.diff(loaded_date), patch=patch)
+        on_result("trimis la salvare")
 
-        EditDialog(self, row, on_saved_reload=after_save_reload, api=self.api)
+    def _open_scanned(self, row: dict, mapped: dict):
+        """Din jurnalul lotului: EditDialog pentru documentul ales, completat cu datele cardului."""
+        if not row:
+            row = self.get_selected_row(full=True)
+            if not row:
+                messagebox.showwarning("Selectează un rând",
+                                       "Selectează în tabel documentul pentru acest card.",
+                                       parent=self._batch_dlg)
+                return
+        dlg = EditDialog(self, row, api=self.api, records=self._records, on_save=self.save_document_async)
+        dlg._fill_from_scan(mapped)
 
     # ------- preview / open / save -------
     # (ASYNC) debounce + background thread + cache
@@ -818,6 +1389,8 @@ class WaitDocsWindow(ttk.Frame):
                 pass
         self._preview_seq += 1
         seq = self._preview_seq
+        # selecție -> thumbnail afișat (include debounce-ul); spanurile înlocuite nu se raportează
+        self._preview_span = metrics.span("ui.select_to_preview")
         self._preview_after_id = self.after(150, lambda: self._load_preview_async(seq))
 
     def _load_preview_async(self, seq):
@@ -826,6 +1399,7 @@ class WaitDocsWindow(ttk.Frame):
             return
 
         row = self.get_selected_row(full=True)
+        self._cancel_stale_preview(row)
         self._preview_img_ref = None
         self.preview_label.configure(image="", text="")
         self.preview_label.image = None
@@ -843,69 +1417,207 @@ class WaitDocsWindow(ttk.Frame):
         ext = (os.path.splitext(url)[1] or "").lower()
         self.preview_info.configure(text=f"{fname}\n{url}")
 
-        if ext in [".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"]:
-            # cache: dacă avem deja thumbnail, afișăm instant
-            if url in self._thumb_cache:
-                tkimg = self._thumb_cache[url]
-                self.preview_label.configure(image=tkimg, text="")
-                self.preview_label.image = tkimg
-                self._preview_img_ref = tkimg
+        if ext in self._thumb_exts:
+            sp = self._preview_span
+            # cache: dacă avem deja thumbnail (RAM sau disc), afișăm instant, fără rețea
+            cached = self._thumb_cache.get(url, self._files.validator(url))
+            if cached is not None:
+                self._show_thumb(cached)
+                sp.end(source="cache", ext=ext)
+                self._prefetch_page()
                 return
 
-            self.preview_label.configure(text="Se încarcă imaginea…")
+            self.preview_label.configure(text="Se randează PDF-ul…" if ext == PDF_EXT else "Se încarcă imaginea…")
+            self._preview_url = url
 
-            def worker(u=url, seq_local=seq):
-                tmp = self._download_to_temp(u, show_message=False)
-                if not tmp:
-                    self.after(0, lambda: self._apply_preview_error(seq_local, "Descărcare eșuată"))
+            def done(img, err, u=url, seq_local=seq):
+                if isinstance(err, PreviewCancelled):
                     return
-                try:
-                    img = Image.open(tmp)
-                    img.thumbnail((300, 300))
-                except Exception as e:
-                    self.after(0, lambda: self._apply_preview_error(seq_local, f"Nu pot încărca imaginea.\n{e}"))
+                if err is not None:
+                    msg = f"Nu pot încărca preview-ul.\n{err}"
+                    sp.end(ok=False, ext=ext)
+                    self._post(lambda: self._apply_preview_error(seq_local, msg))
                     return
 
                 def apply():
                     if seq_local != self._preview_seq:
                         return
-                    tkimg = ImageTk.PhotoImage(img)
-                    self._thumb_cache[u] = tkimg
-                    self.preview_label.configure(image=tkimg, text="")
-                    self.preview_label.image = tkimg
-                    self._preview_img_ref = tkimg
+                    self._show_thumb(img)
+                    sp.end(source="net", ext=ext)
 
-                self.after(0, apply)
+                self._post(apply)
 
-            threading.Thread(target=worker, daemon=True).start()
+            self._preview_pool.submit(url, PRIORITY_SELECTED, done)
+            self._preview_pool.reprioritize(url, PRIORITY_SELECTED)
+            self._prefetch_page()   # reordonează prefetch-ul în jurul noii selecții
 
         elif ext == ".pdf":
             self.preview_label.configure(text="PDF atașat (apasă „Deschide”).")
         else:
             self.preview_label.configure(text=f"Fișier atașat: {ext or 'necunoscut'}")
 
+    def _page_image_urls(self) -> list[str]:
+        """URL-urile imaginilor de pe pagina curentă, în ordinea din tabel."""
+        urls = []
+        for iid in self.tree.get_children():
+            row = self._rows_by_iid.get(iid) or {}
+            url = self._absolute_url(row.get("file", ""))
+            urls.append(url if url and (os.path.splitext(url)[1] or "").lower() in self._thumb_exts else "")
+        return urls
+
+    def _prefetch_page(self, restart: bool = False):
+        """
+        Preîncarcă în pool (prioritate mică) thumbnail-urile imaginilor de pe pagina curentă,
+        cele mai apropiate de selecție primele. restart=True (pagină nouă) anulează prefetch-ul vechi.
+        """
+        if restart:
+            self._preview_pool.cancel_where(lambda t: t.priority >= PRIORITY_PREFETCH)
+        urls = self._page_image_urls()
+        if not any(urls):
+            return
+        iids = list(self.tree.get_children())
+        sel = self.tree.selection()
+        anchor = iids.index(sel[0]) if sel and sel[0] in iids else 0
+        for i, url in enumerate(urls):
+            if not url or url == self._preview_url:
+                continue
+            prio = PRIORITY_PREFETCH + abs(i - anchor)
+            self._preview_pool.submit(url, prio)
+            self._preview_pool.reprioritize(url, prio)
+
+    def _cancel_stale_preview(self, row: dict | None):
+        """
+        Anulează download-ul preview-ului pentru rândul care nu mai e selectat.
+        Dacă e tot pe pagina curentă nu-l oprim: prefetch-ul îl retrogradează.
+        """
+        new_url = self._absolute_url(row.get("file", "")) if row else ""
+        old_url, self._preview_url = self._preview_url, None
+        if old_url and old_url != new_url and old_url not in self._page_image_urls():
+            self._preview_pool.cancel(old_url)
+
+    def _show_thumb(self, img):
+        from PIL import ImageTk
+        tkimg = ImageTk.PhotoImage(img)
+        self.preview_label.configure(image=tkimg, text="")
+        self.preview_label.image = tkimg
+        self._preview_img_ref = tkimg
+
     def _apply_preview_error(self, seq, msg: str):
         if seq != self._preview_seq:
             return
         self.preview_label.configure(text=msg)
 
+    # ------- diagnostic (pentru tichete de suport) -------
+    def export_diagnostics(self):
+        """ZIP cu metricile locale (durate per operație + raport p50/p95/p99), de atașat la tichet."""
+        from tkinter import filedialog
+        dest = filedialog.asksaveasfilename(
+            title="Salvează diagnosticul", defaultextension=".zip",
+            initialfile=f"waitdocs-diagnostic-{time.strftime('%Y%m%d-%H%M')}.zip",
+            filetypes=[("Arhivă ZIP", "*.zip")])
+        if not dest:
+            return
+
+        def worker():
+            from metrics_view import export_bundle
+            try:
+                export_bundle(dest)
+            except Exception as e:
+                err = str(e)
+                self._post(lambda: messagebox.showerror("Diagnostic", f"Exportul a eșuat:\n{err}"))
+                return
+            self._post(lambda: messagebox.showinfo("Diagnostic", f"Diagnosticul a fost salvat:\n{dest}"))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    # ------- export în masă -------
+    def export_filtered(self):
+        """Exportă toate documentele din filtrul curent într-un ZIP (Da) sau într-un folder (Nu)."""
+        from tkinter import filedialog
+        choice = messagebox.askyesnocancel(
+            "Export documente",
+            f"Se exportă toate cele {self.total} rezultate ale filtrului curent.\n\n"
+            "Da = arhivă ZIP, Nu = folder")
+        if choice is None:
+            return
+        if choice:
+            dest = filedialog.asksaveasfilename(defaultextension=".zip", initialfile="waitdocs_export.zip",
+                                                filetypes=[("Arhivă ZIP", "*.zip")])
+        else:
+            dest = filedialog.askdirectory(mustexist=False)
+        if not dest:
+            return
+
+        query, expected = self._query, self.total
+        cancel = threading.Event()
+        dlg, bar, lbl = self._export_progress_dialog(cancel)
+
+        def fetch_file(row):
+            if cancel.is_set():
+                return None
+            return self._files.fetch(self.api, self._absolute_url(row["file"]), cancel=cancel)
+
+        def progress(done, total, name):
+            self._post(lambda: (bar.configure(maximum=max(total, 1), value=done),
+                                lbl.configure(text=f"{done}/{total}  {name}")))
+
+        def worker():
+            try:
+                stats = export_documents(self.client.iter_rows(query), fetch_file, dest,
+                                         as_zip=bool(choice), total=expected, on_progress=progress, cancel=cancel)
+                msg = (f"Export terminat în:\n{dest}\n\n"
+                       f"{stats['ok']} fișiere, {stats['failed']} erori, {stats['skipped']} fără fișier.")
+                self._post(lambda: (dlg.destroy(), messagebox.showinfo("Export", msg)))
+            except ExportCancelled:
+                self._post(dlg.destroy)
+            except Exception as e:
+                err = str(e)
+                self._post(lambda: (dlg.destroy(), messagebox.showerror("Export eșuat", err)))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _export_progress_dialog(self, cancel: threading.Event):
+        dlg = tk.Toplevel(self)
+        dlg.title("Export")
+        dlg.resizable(False, False)
+        dlg.transient(self.winfo_toplevel())
+        try:
+            dlg.iconbitmap(resource_path("assets/waitdocs.ico"))
+        except Exception:
+            pass
+        frm = ttk.Frame(dlg, padding=16)
+        frm.pack()
+        ttk.Label(frm, text="Se exportă documentele…").pack(anchor="w", pady=(0, 8))
+        bar = ttk.Progressbar(frm, mode="determinate", length=320)
+        bar.pack(fill="x")
+        lbl = ttk.Label(frm, text="Se citește lista…", style="Subheading.TLabel")
+        lbl.pack(anchor="w", pady=(6, 8))
+
+        def do_cancel():
+            cancel.set()
+            lbl.configure(text="Se anulează…")
+
+        ttk.Button(frm, text="Anulează", command=do_cancel).pack(anchor="e")
+        dlg.protocol("WM_DELETE_WINDOW", do_cancel)
+        return dlg, bar, lbl
+
     def open_selected_file(self):
         row = self.get_selected_row(full=True)
         if not row or not row.get("file"):
             messagebox.showinfo("Deschidere fișier", "Nu există fișier.")
             return
-        url = self._absolute_url(row["file"])
-        local = self._download_to_temp(url)
-        if not local:
-            return
-        try:
-            if os.name == "nt":
-                os.startfile(local)  # Windows
-            else:
-                import subprocess
-                subprocess.Popen(["xdg-open", local])
-        except Exception as e:
-            messagebox.showerror("Deschidere eșuată", str(e))
+
+        def launch(local: str):
+            try:
+                if os.name == "nt":
+                    os.startfile(local)  # Windows
+                else:
+                    import subprocess
+                    subprocess.Popen(["xdg-open", local])
+            except Exception as e:
+                messagebox.showerror("Deschidere eșuată", str(e))
+
+        self._download_async(self._absolute_url(row["file"]), launch, "Deschidere")
 
     def save_selected_file_as(self):
         from tkinter import filedialog
@@ -913,17 +1625,18 @@ class WaitDocsWindow(ttk.Frame):
         if not row or not row.get("file"):
             messagebox.showinfo("Descarcă fișier", "Nu există fișier.")
             return
-        url = self._absolute_url(row["file"])
-        local = self._download_to_temp(url)
-        if not local:
-            return
         fname = row.get("denumire") or (row["file"].split("/")[-1])
+        # destinația se alege înainte; descărcarea rulează apoi în background
         dest = filedialog.asksaveasfilename(initialfile=fname)
         if not dest:
             return
-        try:
-            with open(local, "rb") as src, open(dest, "wb") as dst:
-                dst.write(src.read())
-            messagebox.showinfo("Salvat", f"Fișierul a fost salvat:\n{dest}")
-        except Exception as e:
-            messagebox.showerror("Salvare eșuată", str(e))
+
+        def copy_to_dest(local: str):
+            try:
+                # copiere la nivel de OS (sendfile / CopyFile2), fără a ține fișierul în RAM
+                shutil.copyfile(local, dest)
+                messagebox.showinfo("Salvat", f"Fișierul a fost salvat:\n{dest}")
+            except Exception as e:
+                messagebox.showerror("Salvare eșuată", str(e))
+
+        self._download_async(self._absolute_url(row["file"]), copy_to_dest, "Descărcare")